@@ -0,0 +1,524 @@
+"""
+Search benchmark: generates synthetic fundraiser corpora and replays a
+query mix against search_and_rank_fundraisers.
+
+Run from backend/:
+
+    python -m benchmarks.search_bench --sizes 1000 100000
+    python -m benchmarks.search_bench --sizes 1000000 --database-url "postgresql+asyncpg://localhost/zspa_bench_{size}"
+    python -m benchmarks.search_bench --sizes 1000 --compare benchmarks/results/search-20260101-120000.json
+
+Each size runs in its own process (so peak RSS is per corpus) against its
+own database; a database that already holds the requested row count is
+reused unless --regenerate is given. Results go to benchmarks/results/ as
+JSON: p50/p95/p99 latency per query kind, rows scanned (Postgres, from
+EXPLAIN ANALYZE) or VM steps (SQLite), and peak memory.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE_URL = f"sqlite+aiosqlite:///{HERE}/data/fundraisers_{{size}}.db"
+RESULTS_DIR = os.path.join(HERE, "results")
+INSERT_BATCH = 5000
+
+CAUSES = {
+    "education": {
+        "words": "school schools students teachers classroom books library literacy scholarship learning kids children girls tuition",
+        "tags": ["education", "children", "literacy", "girls", "scholarship"],
+    },
+    "health": {
+        "words": "clinic hospital medical surgery medicine vaccines malaria maternal nurses health treatment care patients",
+        "tags": ["health", "medical", "maternal", "vaccines", "malaria"],
+    },
+    "water": {
+        "words": "water well borehole clean sanitation drinking pump village rural hygiene toilets rainwater",
+        "tags": ["water", "sanitation", "rural", "hygiene"],
+    },
+    "food": {
+        "words": "food hunger meals nutrition feeding farm farmers harvest seeds famine kitchen",
+        "tags": ["food", "hunger", "nutrition", "agriculture"],
+    },
+    "privacy": {
+        "words": "privacy security encryption surveillance journalists activists censorship tools open source digital rights",
+        "tags": ["privacy", "security", "opensource", "journalism"],
+    },
+    "energy": {
+        "words": "solar power electricity lights panels energy grid off-grid lamps batteries",
+        "tags": ["solar", "energy", "climate"],
+    },
+    "relief": {
+        "words": "flood earthquake disaster relief shelter refugees displaced emergency rebuilding families",
+        "tags": ["disaster", "refugees", "emergency", "shelter"],
+    },
+    "orphans": {
+        "words": "orphans orphanage children home care shelter foster widows support",
+        "tags": ["orphans", "children", "shelter"],
+    },
+}
+
+LOCATIONS = [
+    # (country, continent, cities, weight)
+    ("nigeria", "africa", ["lagos", "kano", "abuja", "ibadan"], 14),
+    ("kenya", "africa", ["nairobi", "mombasa", "kisumu"], 10),
+    ("ghana", "africa", ["accra", "kumasi"], 6),
+    ("uganda", "africa", ["kampala", "gulu"], 5),
+    ("ethiopia", "africa", ["addis ababa"], 4),
+    ("india", "asia", ["mumbai", "delhi", "chennai", "kolkata"], 12),
+    ("philippines", "asia", ["manila", "cebu"], 5),
+    ("bangladesh", "asia", ["dhaka"], 4),
+    ("united states", "north america", ["new york", "chicago", "houston"], 10),
+    ("mexico", "north america", ["mexico city", "oaxaca"], 4),
+    ("brazil", "south america", ["sao paulo", "recife"], 5),
+    ("peru", "south america", ["lima", "cusco"], 3),
+    ("germany", "europe", ["berlin", "munich"], 4),
+    ("ukraine", "europe", ["kyiv", "kharkiv"], 5),
+    ("united kingdom", "europe", ["london", "manchester"], 4),
+    ("australia", "oceania", ["sydney"], 2),
+]
+
+FILLER = "help us support our community project this year every donation goes directly to the people who need it most".split()
+
+# (name, weight, search params, interests, pages deep)
+QUERY_MIX = [
+    ("browse", 15, {}, [], 1),
+    ("browse_deep_page", 5, {}, [], 5),
+    ("keyword", 20, {"text_query": "clean water"}, [], 1),
+    ("keyword_rare", 5, {"text_query": "encryption journalists"}, [], 1),
+    ("keyword_typo", 5, {"text_query": "scholarsip techers"}, [], 1),
+    ("keyword_location", 15, {"text_query": "school", "location": "nigeria"}, [], 1),
+    ("continent", 8, {"location": "africa"}, [], 1),
+    ("demonym", 3, {"location": "kenyan"}, [], 1),
+    ("city", 5, {"location": "lagos"}, [], 1),
+    ("tags", 7, {"tags": ["health", "maternal"]}, [], 1),
+    ("personalized", 10, {"text_query": "children"}, ["education", "orphans", "girls"], 1),
+    ("semantic", 2, {"text_query": "kids need books to learn"}, [], 1),
+]
+
+
+def _configure_env(database_url: str, size: int):
+    """Point the app settings at the benchmark database before src is imported"""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("VECTOR_INDEX_DIR", os.path.join(HERE, "data", f"vectors_{size}"))
+    for name, value in (
+        ("SECRET_KEY", "bench"), ("CORS_ORIGINS", '["*"]'), ("NEAR_TEE_ENDPOINT", "bench"),
+        ("NEAR_AI_API_KEY", "bench"), ("CLOUDINARY_CLOUD_NAME", "bench"),
+        ("CLOUDINARY_API_SECRET", "bench"), ("CLOUDINARY_API_KEY", "bench"),
+    ):
+        os.environ.setdefault(name, value)
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(p):
+        if not ordered:
+            return 0.0
+        return round(ordered[min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1)], 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(50),
+        "p95_ms": pick(95),
+        "p99_ms": pick(99),
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Corpus generation
+# ---------------------------------------------------------------------------
+
+def _fundraiser_rows(rnd: random.Random, start: int, count: int, user_id: str, now: datetime):
+    causes = list(CAUSES.items())
+    loc_weights = [w for *_, w in LOCATIONS]
+    for i in range(start, start + count):
+        cause, spec = rnd.choice(causes)
+        words = spec["words"].split()
+        country, continent, cities, _ = rnd.choices(LOCATIONS, weights=loc_weights)[0]
+        city = rnd.choice(cities)
+        title_words = rnd.sample(words, 3)
+        goal = round(math.exp(rnd.gauss(8.5, 1.2)), 2)
+        created_at = now - timedelta(days=rnd.random() ** 1.5 * 730)
+        yield {
+            "id": f"bench-{i:08d}",
+            "user_id": user_id,
+            "display_name": f"{city.title()} {cause.title()} Initiative {i}",
+            "title": f"{' '.join(title_words).capitalize()} in {city.title()}",
+            "short_description": " ".join(rnd.sample(words, 5) + rnd.sample(FILLER, 4)),
+            "long_description": " ".join(rnd.choices(words, k=30) + rnd.choices(FILLER, k=30)),
+            "tags": rnd.sample(spec["tags"], rnd.randint(1, min(3, len(spec["tags"])))),
+            "country": country,
+            "continent": continent,
+            "city": city,
+            "trust_score": round(min(100.0, max(0.0, rnd.betavariate(2.5, 2.0) * 100)), 2),
+            "goal_amount": goal,
+            "amount_raised": round(goal * rnd.random() ** 2 * 1.3, 2),
+            "status": "active" if rnd.random() < 0.95 else "completed",
+            "created_at": created_at,
+            "static_rank": 0.0,
+        }
+
+
+async def generate_corpus(size: int, seed: int) -> Dict[str, float]:
+    from sqlalchemy import insert, delete, func, select
+    from src import models
+    from src.database import engine, Base, AsyncSessionLocal
+    from src.search import refresh_static_rank
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as db:
+        existing = (await db.execute(select(func.count(models.Fundraiser.id)))).scalar()
+    if existing == size:
+        return {"reused": True}
+
+    started = time.perf_counter()
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        for table in (models.Donation, models.CauseUpdate, models.FundraiserTag, models.Fundraiser, models.User):
+            await db.execute(delete(table))
+        await db.execute(insert(models.User), [{"id": "bench-user", "email": "bench@example.com", "hashed_password": "x"}])
+
+        for start in range(0, size, INSERT_BATCH):
+            batch = list(_fundraiser_rows(rnd, start, min(INSERT_BATCH, size - start), "bench-user", now))
+            await db.execute(insert(models.Fundraiser), batch)
+            await db.execute(insert(models.FundraiserTag), [
+                {"fundraiser_id": row["id"], "tag": tag} for row in batch for tag in set(row["tags"])
+            ])
+            updates, donations = [], []
+            for row in batch:
+                for u in range(rnd.choice((0, 0, 1, 1, 2, 3, 5))):
+                    updates.append({
+                        "id": f"{row['id']}-u{u}",
+                        "cause_id": row["id"],
+                        "content": " ".join(rnd.choices(FILLER, k=20)),
+                        "created_at": row["created_at"] + timedelta(days=rnd.random() * 60),
+                    })
+                for d in range(rnd.choice((0, 1, 2, 3, 5, 8))):
+                    amount = round(rnd.expovariate(1 / 50), 2)
+                    donations.append({
+                        "id": f"{row['id']}-d{d}",
+                        "fundraiser_id": row["id"],
+                        "amount": amount,
+                        "amount_zec": round(amount / 40, 6),
+                        "status": "confirmed",
+                        "created_at": row["created_at"] + timedelta(days=rnd.random() * 90),
+                    })
+            if updates:
+                await db.execute(insert(models.CauseUpdate), updates)
+            if donations:
+                await db.execute(insert(models.Donation), donations)
+            await db.commit()
+            if start and start % (INSERT_BATCH * 20) == 0:
+                print(f"  generated {start}/{size}", file=sys.stderr)
+
+        await refresh_static_rank(db)
+        await db.commit()
+    return {"reused": False, "seconds": round(time.perf_counter() - started, 2)}
+
+
+async def warm_up(skip_vectors: bool) -> Dict[str, float]:
+    """The same index builds the app runs at startup, timed"""
+    from src.database import engine, AsyncSessionLocal
+    from src.search import search_backend, fuzzy_index, vector_index
+    from src.gazetteer import gazetteer
+    from src.indexes import create_indexes
+
+    timings = {}
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await create_indexes(conn)
+    timings["indexes_seconds"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    try:
+        await search_backend.setup(engine)
+    except Exception as e:
+        print(f"Search backend setup failed, benchmarking LIKE fallback: {e}", file=sys.stderr)
+    timings["search_backend_seconds"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await fuzzy_index.build(db)
+    timings["trigram_index_seconds"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    gazetteer.build()
+    timings["gazetteer_seconds"] = round(time.perf_counter() - started, 3)
+
+    if not skip_vectors:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            await vector_index.build(db)
+        timings["vector_index_seconds"] = round(time.perf_counter() - started, 3)
+    timings["search_backend"] = search_backend.name
+    return timings
+
+
+# ---------------------------------------------------------------------------
+# Query replay
+# ---------------------------------------------------------------------------
+
+class ScanCounter:
+    """
+    Work done by the database per query: rows scanned on Postgres (summed
+    from EXPLAIN ANALYZE of every SELECT the query issued), VM steps on
+    SQLite (progress handler; SQLite keeps no row counters).
+    """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.statements: List[tuple] = []
+        self.vm_steps = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._capture)
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not statement.startswith("EXPLAIN"):
+            self.statements.append((statement, parameters))
+
+    def _tick(self):
+        self.vm_steps += 1000
+        return 0
+
+    async def attach(self, db):
+        if self.dialect == "sqlite":
+            raw = await (await db.connection()).get_raw_connection()
+            await raw.driver_connection.set_progress_handler(self._tick, 1000)
+
+    def reset(self):
+        self.statements = []
+        self.vm_steps = 0
+
+    async def measure(self, db) -> Optional[int]:
+        if self.dialect == "sqlite":
+            return self.vm_steps
+        if self.dialect != "postgresql":
+            return None
+        statements, self.statements = self.statements, []
+        total = 0
+        conn = await db.connection()
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            total += _plan_rows(plan[0]["Plan"])
+        self.statements = []
+        return total
+
+
+def _plan_rows(node: dict) -> int:
+    """Rows read by scan nodes: emitted rows plus those removed by filters"""
+    rows = 0
+    if "Scan" in node.get("Node Type", ""):
+        loops = node.get("Actual Loops", 1)
+        rows += (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+    for child in node.get("Plans", []):
+        rows += _plan_rows(child)
+    return rows
+
+
+async def run_query(db, name: str, params: dict, interests: List[str], pages: int, limit: int):
+    from src import schemas
+    from src.search import search_fundraisers_page
+
+    request = schemas.FundraiserSearchRequest(**params)
+    cursor = None
+    results = []
+    for _ in range(pages):
+        results, cursor = await search_fundraisers_page(db, request, interests, limit, cursor)
+        if not cursor:
+            break
+    return results
+
+
+async def replay(iterations: int, limit: int, seed: int, use_cache: bool) -> Dict:
+    from src.database import engine, AsyncSessionLocal
+    from src.search import search_cache
+
+    rnd = random.Random(seed)
+    weights = [w for _, w, *_ in QUERY_MIX]
+    plan = [rnd.choices(QUERY_MIX, weights=weights)[0] for _ in range(iterations)]
+
+    counter = ScanCounter(engine)
+    latencies: Dict[str, List[float]] = {name: [] for name, *_ in QUERY_MIX}
+    scanned: Dict[str, List[int]] = {name: [] for name, *_ in QUERY_MIX}
+    result_sizes: Dict[str, int] = {}
+
+    async with AsyncSessionLocal() as db:
+        await counter.attach(db)
+        # One untimed pass so every kind starts from warm caches and compiled statements
+        for name, _, params, interests, pages in QUERY_MIX:
+            await run_query(db, name, params, interests, pages, limit)
+
+        for name, _, params, interests, pages in plan:
+            if not use_cache:
+                search_cache.clear()
+            counter.reset()
+            started = time.perf_counter()
+            results = await run_query(db, name, params, interests, pages, limit)
+            latencies[name].append((time.perf_counter() - started) * 1000)
+            result_sizes[name] = len(results)
+            work = await counter.measure(db)
+            if work is not None:
+                scanned[name].append(work)
+
+        # Separate pass under tracemalloc, which would distort the timings above
+        memory = {}
+        for name, _, params, interests, pages in QUERY_MIX:
+            search_cache.clear()
+            tracemalloc.start()
+            await run_query(db, name, params, interests, pages, limit)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory[name] = round(peak / 1024, 1)
+
+    scan_key = "rows_scanned" if counter.dialect == "postgresql" else "vm_steps"
+    kinds = {}
+    for name, *_ in QUERY_MIX:
+        if not latencies[name]:
+            continue
+        stats = _percentiles(latencies[name])
+        if scanned[name]:
+            stats[f"mean_{scan_key}"] = int(sum(scanned[name]) / len(scanned[name]))
+        stats["peak_python_kb"] = memory[name]
+        stats["results"] = result_sizes.get(name, 0)
+        kinds[name] = stats
+    everything = [ms for samples in latencies.values() for ms in samples]
+    return {"overall": _percentiles(everything), "queries": kinds}
+
+
+async def run_size(args) -> Dict:
+    from src.database import engine
+
+    result = {"size": args.size, "dialect": engine.dialect.name}
+    result["generate"] = await generate_corpus(args.size, args.seed)
+    result["startup"] = await warm_up(args.skip_vectors)
+    result.update(await replay(args.iterations, args.limit, args.seed, args.use_cache))
+    result["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    await engine.dispose()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True).strip()
+    except Exception:
+        return None
+
+
+def _compare(current: Dict, previous_path: str):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    before = {str(r["size"]): r for r in previous["runs"]}
+    for run in current["runs"]:
+        old = before.get(str(run["size"]))
+        if not old:
+            continue
+        print(f"\n{run['size']} rows vs {previous_path}")
+        for name, stats in run["queries"].items():
+            prev = old["queries"].get(name)
+            if not prev:
+                continue
+            line = "  ".join(
+                f"{key} {prev[key]:.2f} -> {stats[key]:.2f} ({(stats[key] - prev[key]) / prev[key] * 100 if prev[key] else 0:+.0f}%)"
+                for key in ("p50_ms", "p95_ms", "p99_ms")
+            )
+            print(f"  {name:<18} {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL,
+                        help="SQLAlchemy async URL; {size} is replaced with the corpus size")
+    parser.add_argument("--iterations", type=int, default=500, help="Queries replayed per corpus")
+    parser.add_argument("--limit", type=int, default=20, help="Page size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild corpora even if they exist")
+    parser.add_argument("--skip-vectors", action="store_true", help="Do not build the semantic vector index")
+    parser.add_argument("--use-cache", action="store_true", help="Leave the search cache on between queries")
+    parser.add_argument("--output", help="Result file (default benchmarks/results/search-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file to diff latencies against")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_output:
+        url = args.database_url.format(size=args.size)
+        if args.regenerate and url.startswith("sqlite") and "///" in url:
+            path = url.split("///", 1)[1]
+            if os.path.exists(path):
+                os.remove(path)
+        _configure_env(url, args.size)
+        sys.path.insert(0, os.path.dirname(HERE))
+        result = asyncio.run(run_size(args))
+        with open(args.worker_output, "w") as f:
+            json.dump(result, f)
+        return
+
+    os.makedirs(os.path.join(HERE, "data"), exist_ok=True)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    report = {
+        "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "iterations": args.iterations,
+        "limit": args.limit,
+        "cache": args.use_cache,
+        "runs": [],
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} fundraisers...", file=sys.stderr)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+            out = tmp.name
+        cmd = [
+            sys.executable, "-m", "benchmarks.search_bench",
+            "--size", str(size), "--worker-output", out,
+            "--database-url", args.database_url,
+            "--iterations", str(args.iterations), "--limit", str(args.limit), "--seed", str(args.seed),
+        ]
+        cmd += [flag for flag, on in (
+            ("--regenerate", args.regenerate), ("--skip-vectors", args.skip_vectors), ("--use-cache", args.use_cache)
+        ) if on]
+        subprocess.run(cmd, cwd=os.path.dirname(HERE), check=True)
+        with open(out) as f:
+            run = json.load(f)
+        os.remove(out)
+        report["runs"].append(run)
+        overall = run["overall"]
+        print(f"  p50 {overall['p50_ms']}ms  p95 {overall['p95_ms']}ms  p99 {overall['p99_ms']}ms  "
+              f"max RSS {run['max_rss_kb'] // 1024}MB", file=sys.stderr)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"search-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+    if args.compare:
+        _compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
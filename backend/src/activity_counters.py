@@ -0,0 +1,159 @@
+"""
+Per-fundraiser activity counters kept on the fundraisers row, so trust
+scoring never has to count audit history, updates or donations.
+
+crud bumps them in the same transaction as the row they count. The
+verifier recomputes them from the source tables and fixes any that drift
+(e.g. two updates with the same image posted at the same instant):
+
+    python -m src.activity_counters            # fix
+    python -m src.activity_counters --check    # only report
+"""
+import argparse
+import asyncio
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, case, exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .database import AsyncSessionLocal, engine
+
+# Audited field -> counter column
+AUDIT_COUNTERS = {
+    "goal_amount": "goal_edit_count",
+    "wallet_address": "wallet_edit_count",
+    "title": "title_edit_count",
+    "long_description": "description_edit_count",
+}
+COUNTERS = [*AUDIT_COUNTERS.values(), "update_count", "unique_update_image_count", "donation_count"]
+
+VERIFY_BATCH = 500
+
+F = models.Fundraiser
+
+
+def count_audit(fundraiser: models.Fundraiser, field: str):
+    """Bump the edit counter for an audited field on a loaded fundraiser; flushed with it"""
+    column = AUDIT_COUNTERS.get(field)
+    if column:
+        setattr(fundraiser, column, getattr(F, column) + 1)
+
+
+async def count_update(db: AsyncSession, fundraiser_id: str, image_hash: Optional[str]):
+    """Bump update counters for an update about to be inserted. Does not commit."""
+    values = {"update_count": F.update_count + 1}
+    if image_hash:
+        seen = exists().where(
+            models.CauseUpdate.cause_id == fundraiser_id,
+            models.CauseUpdate.image_hash == image_hash,
+        )
+        values["unique_update_image_count"] = F.unique_update_image_count + case((seen, 0), else_=1)
+    await db.execute(update(F).where(F.id == fundraiser_id).values(**values))
+
+
+async def count_donation(db: AsyncSession, fundraiser_id: str):
+    """Bump donation_count for a confirmed donation. Does not commit."""
+    await db.execute(update(F).where(F.id == fundraiser_id).values(donation_count=F.donation_count + 1))
+
+
+def _actual_counts_query(fundraiser_ids: List[str]):
+    A = models.FundraiserAudit
+    U = models.CauseUpdate
+    D = models.Donation
+    audits = (
+        select(
+            A.fundraiser_id,
+            *(
+                func.sum(case((A.field_changed == field, 1), else_=0)).label(column)
+                for field, column in AUDIT_COUNTERS.items()
+            ),
+        )
+        .where(A.fundraiser_id.in_(fundraiser_ids))
+        .group_by(A.fundraiser_id)
+        .subquery()
+    )
+    updates = (
+        select(
+            U.cause_id,
+            func.count().label("update_count"),
+            func.count(func.distinct(U.image_hash)).label("unique_update_image_count"),
+        )
+        .where(U.cause_id.in_(fundraiser_ids))
+        .group_by(U.cause_id)
+        .subquery()
+    )
+    donations = (
+        select(D.fundraiser_id, func.count().label("donation_count"))
+        .where(D.fundraiser_id.in_(fundraiser_ids), D.status == "confirmed")
+        .group_by(D.fundraiser_id)
+        .subquery()
+    )
+    sources = {column: audits for column in AUDIT_COUNTERS.values()}
+    sources.update(update_count=updates, unique_update_image_count=updates, donation_count=donations)
+    return (
+        select(
+            F.id,
+            *(getattr(F, column).label(f"stored_{column}") for column in COUNTERS),
+            *(func.coalesce(sources[column].c[column], 0).label(column) for column in COUNTERS),
+        )
+        .outerjoin(audits, audits.c.fundraiser_id == F.id)
+        .outerjoin(updates, updates.c.cause_id == F.id)
+        .outerjoin(donations, donations.c.fundraiser_id == F.id)
+        .where(F.id.in_(fundraiser_ids))
+    )
+
+
+async def verify_counters(db: AsyncSession, fix: bool = True, fundraiser_ids: Optional[List[str]] = None) -> Dict[str, dict]:
+    """
+    Compare stored counters with the source tables, VERIFY_BATCH fundraisers
+    at a time. Returns {fundraiser_id: {counter: (stored, actual)}} for every
+    mismatch; with fix=True also writes the actual values and commits.
+    """
+    if fundraiser_ids is None:
+        fundraiser_ids = list((await db.execute(select(F.id).order_by(F.id))).scalars())
+    mismatches: Dict[str, dict] = {}
+    for start in range(0, len(fundraiser_ids), VERIFY_BATCH):
+        result = await db.execute(_actual_counts_query(fundraiser_ids[start:start + VERIFY_BATCH]))
+        fixes = []
+        for row in result.all():
+            wrong = {
+                column: (row._mapping[f"stored_{column}"], row._mapping[column])
+                for column in COUNTERS
+                if row._mapping[f"stored_{column}"] != row._mapping[column]
+            }
+            if wrong:
+                mismatches[row.id] = wrong
+                fixes.append({"fid": row.id, **{f"new_{column}": row._mapping[column] for column in COUNTERS}})
+        if fix and fixes:
+            # Core table update: an executemany with its own WHERE, not ORM bulk-by-PK
+            table = F.__table__
+            stmt = update(table).where(table.c.id == bindparam("fid")).values(
+                **{column: bindparam(f"new_{column}") for column in COUNTERS}
+            )
+            await db.execute(stmt, fixes)
+    if fix:
+        await db.commit()
+    return mismatches
+
+
+async def _main(check: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        mismatches = await verify_counters(db, fix=not check)
+    for fundraiser_id, wrong in mismatches.items():
+        details = ", ".join(f"{column} {stored}->{actual}" for column, (stored, actual) in wrong.items())
+        print(f"  {fundraiser_id}: {details}")
+    print(f"{len(mismatches)} fundraisers with drifted counters{'' if check else ' fixed'}")
+    await engine.dispose()
+    return 1 if check and mismatches else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="Report drift without fixing it")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.check)))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ import operator
 import json
 from langgraph.types import Command, Send
 from .near_inference import NEARInference, verify_inference
-from .search import search_and_rank_fundraisers
+from .search import search_and_rank_fundraisers, search_fundraisers_faceted
 from . import schemas, crud, score_util
 from .database import get_db
 from .config import settings
@@ -47,6 +47,10 @@ class AgentState(MessagesState):
     cause_query: str
     discovered_causes: list
     selected_cause: dict
+    # Keyset cursor for the next page of the last discovery query
+    discovery_query: dict
+    discovery_cursor: str
+    discovery_facets: dict
     
     requires_user_input: bool
     awaiting_cause_selection: bool
@@ -585,14 +589,26 @@ async def cause_discovery_node_async(state: AgentState):
         "tags": state.get("tags"),
     }
     user_interests = state.get("user_interests", [])
+
+    # Repeating the same search ("show me more") continues from the last page
+    cursor = None
+    if state.get("discovery_query") == query:
+        cursor = state.get("discovery_cursor")
     
     async for db in get_db():
-        causes = await search_and_rank_fundraisers(
+        causes, next_cursor, facets = await search_fundraisers_faceted(
             db,
             schemas.FundraiserSearchRequest(**query),
-            interests=user_interests
+            interests=user_interests,
+            cursor=cursor
         )
         break
+    if facets is None:
+        facets = state.get("discovery_facets")
+    state["discovery_facets"] = facets
+
+    state["discovery_query"] = query
+    state["discovery_cursor"] = next_cursor
     
     if not causes:
         no_results_msg = {
@@ -627,13 +643,18 @@ async def cause_discovery_node_async(state: AgentState):
             "short_description": cause.get("short_description", "")[:100]
         })
     
-    summary_prompt = f"""You are a helpful philanthropy advisor. You just searched and found {len(causes)} fundraisers.
+    total_found = facets["total"] if facets else len(causes)
+    where_found = ", ".join(f"{f['value']} ({f['count']})" for f in (facets or {}).get("country", [])[:3])
+
+    summary_prompt = f"""You are a helpful philanthropy advisor. You just searched and found {total_found} fundraisers.
 
 USER'S SEARCH:
 - Query: "{state.get('text_query', 'causes')}"
 - Location: "{state.get('location', 'anywhere')}"
 - Interests: {state.get('user_interests', [])}
 
+MOST MATCHES IN: {where_found or "n/a"}
+
 TOP 3 RESULTS (ranked by trust + relevance):
 {json.dumps(top_3_summary, indent=2)}
 
@@ -660,7 +681,9 @@ Now write YOUR summary based on the actual data above:"""
         "type": "cause_list_with_summary",
         "summary": summary_text,
         "causes": clean_causes,
-        "total_found": len(causes)
+        "total_found": total_found,
+        "facets": facets,
+        "next_cursor": next_cursor
     }
     
     state["messages"].append(AIMessage(content=json.dumps(response_data)))
@@ -0,0 +1,152 @@
+# src/browser_pool.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request types a text scrape never needs
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+class BrowserPool:
+    """
+    One long-lived headless Chromium shared by every scrape.
+
+    At most `max_pages` pages are open at once; callers wait for a slot.
+    Pages come from a shared context that is swapped for a fresh one every
+    `pages_per_context` pages (old one closed once its last page is done),
+    so cookies, cache and leaked memory do not pile up. A browser that
+    crashes or disconnects is relaunched on the next request.
+    """
+
+    def __init__(self, max_pages: int = 4, pages_per_context: int = 50):
+        self.max_pages = max_pages
+        self.pages_per_context = pages_per_context
+        self._slots = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._context_pages = 0
+        self._in_flight = {}
+        self.open_pages = 0
+        self.launches = 0
+        self.pages_served = 0
+
+    async def start(self):
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def stop(self):
+        async with self._lock:
+            try:
+                if self._browser is not None:
+                    await self._browser.close()
+                if self._playwright is not None:
+                    await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Browser pool shutdown: {e}")
+            finally:
+                self._browser = self._playwright = self._context = None
+                self._in_flight = {}
+
+    async def _ensure_browser(self):
+        if self._browser is not None and self._browser.is_connected():
+            return
+        if self._browser is not None:
+            logger.warning("Browser disconnected, relaunching")
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        try:
+            self._browser = await self._playwright.chromium.launch(headless=True)
+        except Exception:
+            # The driver may have died with the browser; start clean next time
+            await self._playwright.stop()
+            self._playwright = self._browser = None
+            raise
+        self._context = None
+        self._in_flight = {}
+        self.launches += 1
+
+    async def _new_context(self) -> BrowserContext:
+        context = await self._browser.new_context(
+            user_agent=USER_AGENT,
+            viewport={"width": 1920, "height": 1080}
+        )
+
+        async def block_heavy(route):
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route("**/*", block_heavy)
+        self._in_flight[context] = 0
+        return context
+
+    async def _checkout(self) -> BrowserContext:
+        async with self._lock:
+            await self._ensure_browser()
+            if self._context is None or self._context_pages >= self.pages_per_context:
+                old = self._context
+                self._context = await self._new_context()
+                self._context_pages = 0
+                if old is not None and self._in_flight.get(old) == 0:
+                    await self._close_context(old)
+            self._context_pages += 1
+            self._in_flight[self._context] += 1
+            return self._context
+
+    async def _checkin(self, context: BrowserContext):
+        async with self._lock:
+            if context not in self._in_flight:
+                return  # browser was relaunched meanwhile
+            self._in_flight[context] -= 1
+            if context is not self._context and self._in_flight[context] == 0:
+                await self._close_context(context)
+
+    async def _close_context(self, context: BrowserContext):
+        self._in_flight.pop(context, None)
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def page(self):
+        """A fresh page from the pool; closed (and its slot released) on exit"""
+        async with self._slots:
+            context = await self._checkout()
+            page = None
+            self.open_pages += 1
+            try:
+                page = await context.new_page()
+                self.pages_served += 1
+                yield page
+            finally:
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                self.open_pages -= 1
+                await self._checkin(context)
+
+    def stats(self) -> dict:
+        return {
+            "connected": bool(self._browser and self._browser.is_connected()),
+            "max_pages": self.max_pages,
+            "open_pages": self.open_pages,
+            "launches": self.launches,
+            "pages_served": self.pages_served,
+        }
+
+
+browser_pool = BrowserPool(settings.BROWSER_POOL_MAX_PAGES, settings.BROWSER_CONTEXT_MAX_PAGES)
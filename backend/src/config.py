@@ -15,6 +15,21 @@ class Settings(BaseSettings):
     CLOUDINARY_CLOUD_NAME:str
     CLOUDINARY_API_SECRET:str
     CLOUDINARY_API_KEY:str
+    # "auto" = database-native full-text search when available, falling back to the
+    # in-process BM25F index if native setup fails; "memory" = always the in-process index
+    SEARCH_BACKEND: str = "auto"
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024
+    SEARCH_CACHE_TTL_SECONDS: float = 60.0
+    VECTOR_INDEX_DIR: str = "state_db/vectors"
+    # Shared headless browser used for website scraping
+    BROWSER_POOL_MAX_PAGES: int = 4
+    BROWSER_CONTEXT_MAX_PAGES: int = 50
+    # Plain-HTTP tier tried before the browser
+    WEB_FETCH_TIMEOUT_SECONDS: float = 15.0
+    WEB_FETCH_MAX_CONNECTIONS: int = 20
+    # Trust-score job queue: enqueues within this window share one recompute
+    SCORING_COALESCE_SECONDS: float = 10.0
+    SCORING_WORKERS: int = 2
     
     class Config:
         env_file = ".env"
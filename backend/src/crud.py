@@ -1,12 +1,16 @@
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func
+from sqlalchemy import func, delete, insert, update
 from . import models, schemas, auth, utils
-from . import score_util
-from typing import Optional
+from . import score_util, scoring_jobs
+from .activity_counters import count_audit, count_update, count_donation
+from typing import List, Optional
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from .utils import country_to_continent
+from .gazetteer import gazetteer
+from .image_index import image_index
+from .pagination import paginate
+from .search import normalize_tags_field, search_backend, fuzzy_index, vector_index, refresh_static_rank, invalidate_search_cache
 
 
 async def get_user_by_email(db: AsyncSession, email: str):
@@ -33,39 +37,104 @@ async def get_user(db: AsyncSession, user_id: str):
 async def create_fundraiser(db: AsyncSession, user_id: str, data: schemas.FundraiserCreate):
     """Create fundraiser and compute initial trust score"""
     clean_data = data.model_dump()
-    if clean_data.get("country"):
-        try:
-            clean_data["continent"] = country_to_continent(clean_data["country"]).lower()
-        except Exception:
-            clean_data["continent"] = None
-        clean_data["country"] = clean_data["country"].lower()
-    else:
-        clean_data["continent"] = None
+    clean_data["country"], clean_data["continent"] = gazetteer.normalize_country(clean_data.get("country"))
     if clean_data.get("city"):
         clean_data["city"] = clean_data["city"].lower()
     obj = models.Fundraiser(**clean_data, user_id=user_id)
     db.add(obj)
+    await db.flush()
+    await set_fundraiser_tags(db, obj.id, obj.tags)
+    await refresh_static_rank(db, [obj.id])
     await db.commit()
     await db.refresh(obj)
+    search_backend.index(obj)
+    fuzzy_index.add(obj)
+    vector_index.add(obj)
+    image_index.set("fundraiser", obj.id, obj.id, obj.image_phash, obj.image_hash)
+    await invalidate_search_cache(db, [obj.id], text_changed=True)
     return obj
 
 async def get_fundraiser(db: AsyncSession, fundraiser_id: str):
     result = await db.execute(select(models.Fundraiser).where(models.Fundraiser.id == fundraiser_id))
     return result.scalar_one_or_none()
 
-async def list_fundraisers(db: AsyncSession, user_id:str=None):
+# Only what FundraiserResponse shows; skips website_snapshot, trust_score_report etc.
+FUNDRAISER_LIST_COLUMNS = models.columns_for(models.Fundraiser, schemas.FundraiserResponse)
+
+async def list_fundraisers(db: AsyncSession, user_id:str=None, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Rows of FUNDRAISER_LIST_COLUMNS (attribute access like the ORM objects)"""
+    stmt = select(*FUNDRAISER_LIST_COLUMNS)
     if user_id:
-        result = await db.execute(
-            select(models.Fundraiser)
-            .where(models.Fundraiser.user_id== user_id)
-            .order_by(models.Fundraiser.created_at.desc())
-        )
-    else:
-            result = await db.execute(
-            select(models.Fundraiser)
-            .order_by(models.Fundraiser.created_at.desc())
+        stmt = stmt.where(models.Fundraiser.user_id== user_id)
+    stmt = paginate(stmt, models.Fundraiser.created_at, models.Fundraiser.id, limit, cursor)
+    result = await db.execute(stmt)
+    return result.all()
+
+async def set_fundraiser_tags(db: AsyncSession, fundraiser_id: str, tags):
+    """Replace a fundraiser's fundraiser_tags rows. Does not commit."""
+    await db.execute(delete(models.FundraiserTag).where(models.FundraiserTag.fundraiser_id == fundraiser_id))
+    rows = [{"fundraiser_id": fundraiser_id, "tag": t} for t in sorted(normalize_tags_field(tags))]
+    if rows:
+        await db.execute(insert(models.FundraiserTag), rows)
+
+
+async def backfill_fundraiser_tags(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Create fundraiser_tags rows for fundraisers that have tags but none indexed yet"""
+    has_rows = select(models.FundraiserTag.fundraiser_id).where(
+        models.FundraiserTag.fundraiser_id == models.Fundraiser.id
+    ).exists()
+    result = await db.execute(
+        select(models.Fundraiser.id, models.Fundraiser.tags)
+        .where(models.Fundraiser.tags.isnot(None), ~has_rows)
+    )
+    rows = [
+        {"fundraiser_id": fid, "tag": t}
+        for fid, tags in result.all()
+        for t in sorted(normalize_tags_field(tags))
+    ]
+    for start in range(0, len(rows), batch_size):
+        await db.execute(insert(models.FundraiserTag), rows[start:start + batch_size])
+    await db.commit()
+    return len(rows)
+
+
+async def normalize_fundraiser_locations(db: AsyncSession) -> int:
+    """Rewrite stored country/continent values to the gazetteer's canonical form"""
+    result = await db.execute(
+        select(models.Fundraiser.country, models.Fundraiser.continent)
+        .where(models.Fundraiser.country.isnot(None))
+        .distinct()
+    )
+    changed = 0
+    for country, continent in result.all():
+        canonical, canonical_continent = gazetteer.normalize_country(country)
+        if canonical_continent is None:
+            canonical_continent = continent
+        if (canonical, canonical_continent) == (country, continent):
+            continue
+        update_result = await db.execute(
+            update(models.Fundraiser)
+            .where(models.Fundraiser.country == country)
+            .values(country=canonical, continent=canonical_continent)
+            .execution_options(synchronize_session=False)
         )
-    return result.scalars().all()
+        changed += update_result.rowcount
+    await db.commit()
+    return changed
+
+
+async def tag_facets(db: AsyncSession, limit: int = 50):
+    """Active fundraisers per tag, most used first"""
+    count = func.count().label("count")
+    result = await db.execute(
+        select(models.FundraiserTag.tag, count)
+        .join(models.Fundraiser, models.Fundraiser.id == models.FundraiserTag.fundraiser_id)
+        .where(models.Fundraiser.status == "active")
+        .group_by(models.FundraiserTag.tag)
+        .order_by(count.desc(), models.FundraiserTag.tag)
+        .limit(limit)
+    )
+    return [{"tag": tag, "count": n} for tag, n in result.all()]
 
 async def update_fundraiser(db: AsyncSession, fundraiser_id: str, data: schemas.FundraiserUpdate):
     """
@@ -99,6 +168,7 @@ async def update_fundraiser(db: AsyncSession, fundraiser_id: str, data: schemas.
                 new_value=str(update_data[field])
             )
             db.add(audit_log)
+            count_audit(fundraiser, field)
     
     # 4. Handle image update (delete old from Cloudinary if changed)
     if "image_url" in update_data and update_data["image_url"] != fundraiser.image_url:
@@ -110,22 +180,33 @@ async def update_fundraiser(db: AsyncSession, fundraiser_id: str, data: schemas.
         if key == "city" and value:
             setattr(fundraiser, key, value.lower())
             continue
-        elif key == "country" and value:
-            setattr(fundraiser, key, value.lower())
-            try:
-                continent= country_to_continent(value).lower()
-            except Exception:
-                continent = None
+        elif key == "country":
+            # Cleared countries clear the continent too
+            country, continent = gazetteer.normalize_country(value)
+            setattr(fundraiser, key, country)
             setattr(fundraiser, "continent", continent)
+            continue
         setattr(fundraiser, key, value)
     
     db.add(fundraiser)
+    await db.flush()
+    if "tags" in update_data:
+        await set_fundraiser_tags(db, fundraiser_id, fundraiser.tags)
+    if "goal_amount" in update_data:
+        await refresh_static_rank(db, [fundraiser_id])
     await db.commit()
     await db.refresh(fundraiser)
+    search_backend.index(fundraiser)
+    fuzzy_index.add(fundraiser)
+    vector_index.add(fundraiser)
+    image_index.set("fundraiser", fundraiser_id, fundraiser_id, fundraiser.image_phash, fundraiser.image_hash)
+    await invalidate_search_cache(
+        db, [fundraiser_id],
+        text_changed=any(f in update_data for f in ("title", "short_description", "long_description", "tags"))
+    )
     
     if any(field in update_data for field in list(critical_fields.keys()) + ["image_url", "image_hash"]):
-        await score_util.update_trust_score(db, fundraiser_id)
-        await db.refresh(fundraiser)
+        await scoring_jobs.enqueue(db, fundraiser_id)
     
     return fundraiser
 
@@ -136,27 +217,29 @@ async def add_update(db: AsyncSession, fundraiser_id: str, data: schemas.UpdateC
     Image hash already computed in utils.process_image_upload().
     Triggers trust score recalculation.
     """
+    # Before the insert, so a repeated image is seen as already counted
+    await count_update(db, fundraiser_id, data.image_hash)
     update = models.CauseUpdate(
         cause_id=fundraiser_id,
         content=data.content,
         image_url=data.image_url,
-        image_hash=data.image_hash  # Passed from process_image_upload
+        image_hash=data.image_hash,  # Passed from process_image_upload
+        image_phash=data.image_phash
     )
     db.add(update)
     await db.commit()
     await db.refresh(update)
+    image_index.set("update", update.id, fundraiser_id, update.image_phash, update.image_hash)
     
     # Recompute trust score (updates affect score, especially unique images)
-    await score_util.update_trust_score(db, fundraiser_id)
+    await scoring_jobs.enqueue(db, fundraiser_id)
     
     return update
 
-async def list_updates(db: AsyncSession, fundraiser_id: str):
-    result = await db.execute(
-        select(models.CauseUpdate)
-        .where(models.CauseUpdate.cause_id == fundraiser_id)
-        .order_by(models.CauseUpdate.created_at.desc())
-    )
+async def list_updates(db: AsyncSession, fundraiser_id: str, limit: Optional[int] = None, cursor: Optional[str] = None):
+    stmt = select(models.CauseUpdate).where(models.CauseUpdate.cause_id == fundraiser_id)
+    stmt = paginate(stmt, models.CauseUpdate.created_at, models.CauseUpdate.id, limit, cursor)
+    result = await db.execute(stmt)
     return result.scalars().all()
 
 
@@ -164,6 +247,7 @@ async def create_donation(db: AsyncSession, data: schemas.DonationCreate):
     """Create donation and update fundraiser amount_raised"""
     obj = models.Donation(**data.dict(), status="confirmed")
     db.add(obj)
+    await count_donation(db, data.fundraiser_id)
     await db.commit()
     await db.refresh(obj)
     
@@ -172,70 +256,27 @@ async def create_donation(db: AsyncSession, data: schemas.DonationCreate):
     
     return obj
 
-async def list_donations_for_fundraiser(db: AsyncSession, fundraiser_id: str):
-    result = await db.execute(
-        select(models.Donation)
-        .where(models.Donation.fundraiser_id == fundraiser_id)
-        .order_by(models.Donation.created_at.desc())
-    )
+async def list_donations_for_fundraiser(db: AsyncSession, fundraiser_id: str, limit: Optional[int] = None, cursor: Optional[str] = None):
+    stmt = select(models.Donation).where(models.Donation.fundraiser_id == fundraiser_id)
+    stmt = paginate(stmt, models.Donation.created_at, models.Donation.id, limit, cursor)
+    result = await db.execute(stmt)
     return result.scalars().all()
 
-async def list_donations(db: AsyncSession):
-    result = await db.execute(
-        select(models.Donation)
-        .order_by(models.Donation.created_at.desc())
-    )
+async def list_donations(db: AsyncSession, limit: Optional[int] = None, cursor: Optional[str] = None):
+    stmt = paginate(select(models.Donation), models.Donation.created_at, models.Donation.id, limit, cursor)
+    result = await db.execute(stmt)
     return result.scalars().all()
 
 
-async def get_fundraiser_with_audit_logs(db: AsyncSession, fundraiser_id: str):
+async def get_fundraisers_for_scoring(db: AsyncSession, fundraiser_ids: List[str]):
     """
-    Get fundraiser with all related data.
-    - Uses selectinload for efficient fetching (1 DB trip).
-    - Sorting is now handled automatically by the Model definitions.
+    Fundraisers with their updates (the text the LLM check reads), keyed by id.
+    Counts and duplicate checks come from trust_signals, not from these rows.
     """
     stmt = (
         select(models.Fundraiser)
-        .where(models.Fundraiser.id == fundraiser_id)
-        .options(
-            selectinload(models.Fundraiser.audit_logs),
-            selectinload(models.Fundraiser.updates)
-        )
+        .where(models.Fundraiser.id.in_(fundraiser_ids))
+        .options(selectinload(models.Fundraiser.updates))
     )
-
     result = await db.execute(stmt)
-    return result.scalar_one_or_none()
-
-async def check_duplicate_images(db: AsyncSession, image_hash: str, exclude_id: Optional[str] = None) -> int:
-    """
-    Check if image hash exists in other fundraisers or updates.
-    Returns count of duplicates found.
-    """
-    # Check fundraiser images
-    query = select(func.count()).where(models.Fundraiser.image_hash == image_hash)
-    if exclude_id:
-        query = query.where(models.Fundraiser.id != exclude_id)
-    
-    result = await db.execute(query)
-    fundraiser_dupes = result.scalar()
-    
-    # Check update images
-    update_query = select(func.count()).where(models.CauseUpdate.image_hash == image_hash)
-    update_result = await db.execute(update_query)
-    update_dupes = update_result.scalar()
-    
-    return fundraiser_dupes + update_dupes
-
-async def get_unique_update_images_count(db: AsyncSession, fundraiser_id: str) -> int:
-    """
-    Count unique update images (no duplicates within this fundraiser).
-    Used for trust scoring bonus - rewards real progress photos.
-    """
-    result = await db.execute(
-        select(func.count(func.distinct(models.CauseUpdate.image_hash)))
-        .where(
-            models.CauseUpdate.cause_id == fundraiser_id,
-            models.CauseUpdate.image_hash.isnot(None)
-        )
-    )
-    return result.scalar()
\ No newline at end of file
+    return {f.id: f for f in result.scalars().all()}
@@ -0,0 +1,131 @@
+# src/gazetteer.py
+from typing import Dict, List, Optional, Set, Tuple
+
+import pycountry_convert as pc
+
+# Lowercase forms that pycountry_convert's name table does not cover
+EXTRA_ALIASES = {
+    "usa": "US", "us": "US", "america": "US", "uk": "GB", "britain": "GB", "great britain": "GB",
+    "england": "GB", "scotland": "GB", "wales": "GB", "uae": "AE", "emirates": "AE",
+    "drc": "CD", "congo-kinshasa": "CD", "congo-brazzaville": "CG", "ivory coast": "CI",
+    "holland": "NL", "czechia": "CZ", "burma": "MM", "eswatini": "SZ", "swaziland": "SZ",
+    "cape verde": "CV", "east timor": "TL", "vatican": "VA", "russia": "RU", "iran": "IR",
+    "syria": "SY", "vietnam": "VN", "laos": "LA", "bolivia": "BO", "venezuela": "VE",
+    "tanzania": "TZ", "moldova": "MD", "palestine": "PS", "taiwan": "TW",
+}
+
+DEMONYMS = {
+    "afghan": "AF", "algerian": "DZ", "american": "US", "angolan": "AO", "argentine": "AR",
+    "argentinian": "AR", "australian": "AU", "austrian": "AT", "bangladeshi": "BD",
+    "belgian": "BE", "beninese": "BJ", "bolivian": "BO", "brazilian": "BR", "british": "GB",
+    "burkinabe": "BF", "burundian": "BI", "cambodian": "KH", "cameroonian": "CM",
+    "canadian": "CA", "chadian": "TD", "chilean": "CL", "chinese": "CN", "colombian": "CO",
+    "congolese": "CD", "cuban": "CU", "danish": "DK", "dutch": "NL", "ecuadorian": "EC",
+    "egyptian": "EG", "english": "GB", "eritrean": "ER", "ethiopian": "ET", "filipino": "PH",
+    "finnish": "FI", "french": "FR", "gambian": "GM", "german": "DE", "ghanaian": "GH",
+    "greek": "GR", "guatemalan": "GT", "guinean": "GN", "haitian": "HT", "honduran": "HN",
+    "indian": "IN", "indonesian": "ID", "iranian": "IR", "iraqi": "IQ", "irish": "IE",
+    "israeli": "IL", "italian": "IT", "ivorian": "CI", "jamaican": "JM", "japanese": "JP",
+    "jordanian": "JO", "kenyan": "KE", "korean": "KR", "lebanese": "LB", "liberian": "LR",
+    "libyan": "LY", "malagasy": "MG", "malawian": "MW", "malaysian": "MY", "malian": "ML",
+    "mexican": "MX", "moroccan": "MA", "mozambican": "MZ", "namibian": "NA", "nepali": "NP",
+    "nepalese": "NP", "nicaraguan": "NI", "nigerian": "NG", "nigerien": "NE", "norwegian": "NO",
+    "pakistani": "PK", "palestinian": "PS", "peruvian": "PE", "polish": "PL",
+    "portuguese": "PT", "romanian": "RO", "russian": "RU", "rwandan": "RW", "salvadoran": "SV",
+    "saudi": "SA", "scottish": "GB", "senegalese": "SN", "sierra leonean": "SL",
+    "somali": "SO", "south african": "ZA", "south sudanese": "SS", "spanish": "ES",
+    "sri lankan": "LK", "sudanese": "SD", "swedish": "SE", "swiss": "CH", "syrian": "SY",
+    "tanzanian": "TZ", "thai": "TH", "togolese": "TG", "tunisian": "TN", "turkish": "TR",
+    "ugandan": "UG", "ukrainian": "UA", "venezuelan": "VE", "vietnamese": "VN",
+    "welsh": "GB", "yemeni": "YE", "zambian": "ZM", "zimbabwean": "ZW",
+}
+
+CONTINENT_ALIASES = {
+    "african": ["africa"], "asian": ["asia"], "european": ["europe"],
+    "oceanian": ["oceania"], "australasia": ["oceania"],
+    "north american": ["north america"], "south american": ["south america"],
+    "latin america": ["south america", "north america"],
+    "americas": ["north america", "south america"],
+}
+
+# pycountry_convert has no continent for these; use the conventional one
+CONTINENT_FALLBACK = {"EH": "AF", "SX": "NA", "TL": "AS", "VA": "EU", "PN": "OC", "TF": "AN", "AQ": "AN", "UM": "OC"}
+
+
+class Gazetteer:
+    """
+    Country/continent lookup tables, built once from pycountry_convert data.
+    Names, official names, ISO codes, aliases and demonyms all resolve to an
+    alpha-2 code in one dict lookup; fundraisers store the canonical
+    lowercase country name and continent.
+    """
+
+    def __init__(self):
+        self.lookup: Dict[str, str] = {}
+        self.names: Dict[str, str] = {}
+        self.continent_of: Dict[str, str] = {}
+        self.members: Dict[str, Set[str]] = {}
+        self.continents: Dict[str, List[str]] = {}
+        self.ready = False
+
+    def build(self):
+        names = pc.map_country_alpha2_to_country_name()
+        for code, name in names.items():
+            self.names[code] = name.lower()
+            continent_code = pc.convert_country_alpha2_to_continent_code.COUNTRY_ALPHA2_TO_CONTINENT_CODE.get(
+                code, CONTINENT_FALLBACK.get(code)
+            )
+            if continent_code:
+                continent = pc.convert_continent_code_to_continent_name(continent_code).lower()
+                self.continent_of[code] = continent
+                self.members.setdefault(continent, set()).add(self.names[code])
+
+        for name, code in pc.map_country_name_to_country_alpha2().items():
+            self.lookup[name.lower()] = code
+        for alpha3, code in pc.map_country_alpha3_to_country_alpha2().items():
+            self.lookup.setdefault(alpha3.lower(), code)
+        for table in (EXTRA_ALIASES, DEMONYMS):
+            for alias, code in table.items():
+                if code in self.names:
+                    self.lookup.setdefault(alias, code)
+
+        self.continents = {c: [c] for c in self.members}
+        self.continents.update(CONTINENT_ALIASES)
+        self.ready = True
+
+    def _ensure(self):
+        if not self.ready:
+            self.build()
+
+    def normalize_country(self, value: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """(canonical country, continent) for any known spelling; unknown input is just lowercased"""
+        if not value or not value.strip():
+            return None, None
+        self._ensure()
+        key = " ".join(value.lower().split())
+        code = self.lookup.get(key)
+        if code is None:
+            return key, None
+        return self.names[code], self.continent_of.get(code)
+
+    def expand(self, location: Optional[str]) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        (countries, continents) a location query stands for, or None if it
+        is not a known country or continent (e.g. a city).
+        "africa" -> every African country plus continent "africa".
+        """
+        if not location or not location.strip():
+            return None
+        self._ensure()
+        key = " ".join(location.lower().split())
+        continents = self.continents.get(key)
+        if continents:
+            countries = sorted(set().union(*(self.members.get(c, ()) for c in continents)))
+            return countries, list(continents)
+        code = self.lookup.get(key)
+        if code is not None:
+            return [self.names[code]], []
+        return None
+
+
+gazetteer = Gazetteer()
@@ -0,0 +1,221 @@
+# src/image_index.py
+import asyncio
+import io
+import logging
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional, Set, Tuple
+
+import aiohttp
+from PIL import Image, ImageOps
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# dHash bits that may differ between a photo and its re-encoded, resized or
+# slightly (~2%) cropped copy; unrelated images average 32
+NEAR_DUPLICATE_DISTANCE = 10
+BACKFILL_BATCH = 100
+BACKFILL_CONCURRENCY = 4
+
+# (kind, row id, owning fundraiser id); kind is "fundraiser" or "update"
+ImageKey = Tuple[str, str, str]
+
+
+def dhash(content: bytes, size: int = 8) -> Optional[str]:
+    """64-bit difference hash of an image as 16 hex chars, None if it cannot be decoded"""
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            image = ImageOps.exif_transpose(image).convert("L").resize((size + 1, size), Image.LANCZOS)
+            pixels = image.tobytes()
+    except Exception as e:
+        logger.warning(f"Could not hash image: {type(e).__name__}: {e}")
+        return None
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            bits = (bits << 1) | (left > pixels[row * (size + 1) + col + 1])
+    return f"{bits:0{size * size // 4}x}"
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _flip_masks(bits: int, max_flips: int) -> List[int]:
+    """Every `bits`-wide mask with at most max_flips bits set"""
+    masks = [0]
+    for flips in range(1, max_flips + 1):
+        for positions in combinations(range(bits), flips):
+            masks.append(sum(1 << p for p in positions))
+    return masks
+
+
+class MultiIndexHash:
+    """
+    Multi-index hashing over 64-bit hashes: four 16-bit substrings, one
+    table each. By pigeonhole, two hashes within r bits differ by at most
+    r // 4 bits in some substring, so a lookup probes each table only at
+    the substrings that close to the query's and verifies those candidates
+    (a BK-tree degrades to a near-full scan at this radius).
+    """
+
+    CHUNKS = 4
+    CHUNK_BITS = 16
+
+    def __init__(self):
+        self.tables: List[Dict[int, Set[int]]] = [defaultdict(set) for _ in range(self.CHUNKS)]
+        self.keys: Dict[int, Set] = defaultdict(set)
+        self._masks: Dict[int, List[int]] = {}
+
+    def _chunks(self, value: int):
+        mask = (1 << self.CHUNK_BITS) - 1
+        return [(value >> (i * self.CHUNK_BITS)) & mask for i in range(self.CHUNKS)]
+
+    def add(self, value: int, key):
+        if not self.keys[value]:
+            for table, chunk in zip(self.tables, self._chunks(value)):
+                table[chunk].add(value)
+        self.keys[value].add(key)
+
+    def discard(self, value: int, key):
+        keys = self.keys.get(value)
+        if not keys:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.keys[value]
+            for table, chunk in zip(self.tables, self._chunks(value)):
+                table[chunk].discard(value)
+                if not table[chunk]:
+                    del table[chunk]
+
+    def search(self, value: int, radius: int) -> List[Tuple[object, int]]:
+        """(key, distance) for every key within `radius` of value"""
+        sub_radius = radius // self.CHUNKS
+        masks = self._masks.get(sub_radius)
+        if masks is None:
+            masks = self._masks[sub_radius] = _flip_masks(self.CHUNK_BITS, sub_radius)
+        candidates = set()
+        for table, chunk in zip(self.tables, self._chunks(value)):
+            for mask in masks:
+                found = table.get(chunk ^ mask)
+                if found:
+                    candidates.update(found)
+        out = []
+        for candidate in candidates:
+            d = hamming(value, candidate)
+            if d <= radius:
+                out.extend((key, d) for key in self.keys[candidate])
+        return out
+
+
+class ImageIndex:
+    """Perceptual hashes of every fundraiser and update image, for near-duplicate lookups"""
+
+    def __init__(self):
+        self.tree = MultiIndexHash()
+        self.hashes: Dict[ImageKey, int] = {}
+        # SHA-256 per image, so near matches can be told apart from exact ones
+        self.shas: Dict[ImageKey, Optional[str]] = {}
+
+    def __len__(self):
+        return len(self.hashes)
+
+    async def build(self, db: AsyncSession):
+        self.tree = MultiIndexHash()
+        self.hashes = {}
+        self.shas = {}
+        fundraisers = await db.execute(
+            select(models.Fundraiser.id, models.Fundraiser.image_phash, models.Fundraiser.image_hash)
+            .where(models.Fundraiser.image_phash.isnot(None))
+        )
+        for fid, phash, sha in fundraisers.all():
+            self.set("fundraiser", fid, fid, phash, sha)
+        updates = await db.execute(
+            select(models.CauseUpdate.id, models.CauseUpdate.cause_id, models.CauseUpdate.image_phash, models.CauseUpdate.image_hash)
+            .where(models.CauseUpdate.image_phash.isnot(None))
+        )
+        for uid, fid, phash, sha in updates.all():
+            self.set("update", uid, fid, phash, sha)
+
+    def set(self, kind: str, row_id: str, fundraiser_id: str, phash: Optional[str], sha: Optional[str] = None):
+        key = (kind, row_id, fundraiser_id)
+        old = self.hashes.pop(key, None)
+        self.shas.pop(key, None)
+        if old is not None:
+            self.tree.discard(old, key)
+        if phash:
+            value = int(phash, 16)
+            self.hashes[key] = value
+            self.shas[key] = sha
+            self.tree.add(value, key)
+
+    def near(
+        self, phash: str, radius: int = NEAR_DUPLICATE_DISTANCE, exclude_fundraiser: Optional[str] = None
+    ) -> List[ImageKey]:
+        """Images within `radius` bits of phash, leaving out those belonging to exclude_fundraiser"""
+        return [
+            key for key, _ in self.tree.search(int(phash, 16), radius)
+            if key[2] != exclude_fundraiser
+        ]
+
+
+    def near_not_exact(self, phash: str, sha: Optional[str], exclude_fundraiser: Optional[str] = None) -> int:
+        """Near duplicates of another fundraiser's images that an image_hash == sha match would miss"""
+        return sum(
+            1 for key in self.near(phash, exclude_fundraiser=exclude_fundraiser)
+            if sha is None or self.shas.get(key) != sha
+        )
+
+
+image_index = ImageIndex()
+
+
+async def _download(session: aiohttp.ClientSession, url: str) -> Optional[bytes]:
+    try:
+        async with session.get(url) as response:
+            if response.status != 200:
+                return None
+            return await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+
+
+async def backfill_phashes(db: AsyncSession) -> int:
+    """Download and hash images stored before perceptual hashing existed"""
+    done = 0
+    skip: Set[str] = set()
+    slots = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+        for model, owner in ((models.Fundraiser, models.Fundraiser.id), (models.CauseUpdate, models.CauseUpdate.cause_id)):
+            kind = "fundraiser" if model is models.Fundraiser else "update"
+            while True:
+                stmt = (
+                    select(model.id, owner, model.image_url, model.image_hash)
+                    .where(model.image_url.isnot(None), model.image_phash.is_(None))
+                    .limit(BACKFILL_BATCH + len(skip))
+                )
+                rows = [r for r in (await db.execute(stmt)).all() if r[0] not in skip][:BACKFILL_BATCH]
+                if not rows:
+                    break
+
+                async def hash_one(url):
+                    async with slots:
+                        content = await _download(session, url)
+                    return await asyncio.to_thread(dhash, content) if content else None
+
+                phashes = await asyncio.gather(*(hash_one(url) for _, _, url, _ in rows))
+                for (row_id, fid, _, sha), phash in zip(rows, phashes):
+                    if phash is None:
+                        skip.add(row_id)
+                        continue
+                    await db.execute(update(model).where(model.id == row_id).values(image_phash=phash))
+                    image_index.set(kind, row_id, fid, phash, sha)
+                    done += 1
+                await db.commit()
+    return done
@@ -0,0 +1,45 @@
+# src/indexes.py
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .search_filters import FILTER_INDEXES
+
+# Performance indexes for search and user operations, created at startup
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_status ON fundraisers(status)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_trust_score ON fundraisers(trust_score DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_created_at ON fundraisers(created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_country ON fundraisers(country)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_continent ON fundraisers(continent)",
+    "CREATE INDEX IF NOT EXISTS idx_cause_updates_cause_id ON cause_updates(cause_id)",
+    "CREATE INDEX IF NOT EXISTS idx_cause_updates_image_hash ON cause_updates(image_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraiser_audit_fundraiser ON fundraiser_audit(fundraiser_id)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_trust ON fundraisers(status, trust_score DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_created ON fundraisers(status, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_static_rank ON fundraisers(status, static_rank DESC, id)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_created_id ON fundraisers(created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_user_created ON fundraisers(user_id, created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_cause_updates_cause_created ON cause_updates(cause_id, created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_donations_created_id ON donations(created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_donations_fundraiser_created ON donations(fundraiser_id, created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_user_id ON fundraisers(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_donations_fundraiser_id ON donations(fundraiser_id)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraiser_tags_tag ON fundraiser_tags(tag, fundraiser_id)",
+    *FILTER_INDEXES,
+]
+
+
+async def create_indexes(conn: AsyncConnection) -> List[str]:
+    """Create INDEXES and refresh planner statistics; returns the names that failed"""
+    failed = []
+    for idx_sql in INDEXES:
+        try:
+            await conn.execute(text(idx_sql))
+        except Exception as e:
+            print(f"Index creation failed (may already exist): {e}")
+            failed.append(idx_sql.split("idx_")[1].split(" ")[0])
+    # Planner statistics, so range filters pick the right (status, column) index
+    await conn.execute(text("ANALYZE"))
+    return failed
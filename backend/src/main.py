@@ -1,10 +1,10 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from .import auth
+from .import auth, crud
 import uvicorn
 
-from .database import engine, Base
+from .database import engine, Base, AsyncSessionLocal
 from .routers import users, fundraisers, donations
 from .config import settings
 from typing import Optional
@@ -23,6 +23,19 @@ from .database import get_db
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine
 from .tee_client import *
+from .search import search_backend, search_cache, fuzzy_index, vector_index, refresh_static_rank, RECENCY_WINDOW_DAYS
+from .pagination import NEXT_CURSOR_HEADER
+from .gazetteer import gazetteer
+from .search_filters import filter_stats
+from .indexes import INDEXES, create_indexes
+from .browser_pool import browser_pool
+from .web_fetcher import web_fetcher
+from .scoring_jobs import scoring_worker
+from .image_index import image_index, backfill_phashes
+from .activity_counters import COUNTERS, verify_counters
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import inspect
 
 
 
@@ -39,33 +52,96 @@ async def setup_memory():
     memory = AsyncSqliteSaver(conn)
     return memory
 
+# Columns added after the first release; create_all() does not alter existing tables
+NEW_COLUMNS = [
+    ("fundraisers", "static_rank", "FLOAT NOT NULL DEFAULT 0"),
+    ("fundraisers", "progress", "FLOAT NOT NULL DEFAULT 0"),
+    ("fundraisers", "image_phash", "VARCHAR"),
+    ("cause_updates", "image_phash", "VARCHAR"),
+    *(("fundraisers", column, "INTEGER NOT NULL DEFAULT 0") for column in COUNTERS),
+]
+
+STATIC_RANK_SWEEP_INTERVAL = 60 * 60  # seconds
+
+
+async def add_missing_columns(engine: AsyncEngine):
+    """Add any NEW_COLUMNS that an older database is missing; returns the added column names"""
+    def existing_columns(sync_conn, table):
+        return {c["name"] for c in inspect(sync_conn).get_columns(table)}
+
+    added = []
+    async with engine.begin() as conn:
+        for table, column, ddl in NEW_COLUMNS:
+            if column not in await conn.run_sync(existing_columns, table):
+                await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                print(f"Added column: {table}.{column}")
+                added.append(column)
+    return added
+
+
+async def backfill_image_phashes():
+    """Perceptual-hash images uploaded before image_phash existed (downloads them, so off the startup path)"""
+    try:
+        async with AsyncSessionLocal() as session:
+            count = await backfill_phashes(session)
+        if count:
+            print(f"Backfilled {count} image perceptual hashes")
+    except Exception as e:
+        print(f"Image hash backfill failed: {e}")
+
+
+async def static_rank_sweeper(interval: int = STATIC_RANK_SWEEP_INTERVAL):
+    """
+    Periodically re-rank fundraisers whose created_at just crossed the
+    recency boundary, so the materialized static_rank stays correct.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        boundary = datetime.utcnow() - timedelta(days=RECENCY_WINDOW_DAYS)
+        try:
+            async with AsyncSessionLocal() as session:
+                count = await refresh_static_rank(
+                    session,
+                    created_after=boundary - timedelta(seconds=2 * interval),
+                    created_before=boundary
+                )
+                await session.commit()
+            if count:
+                search_cache.clear()
+                print(f"Static rank sweep: {count} fundraisers left the recency window")
+            async with AsyncSessionLocal() as session:
+                await filter_stats.refresh(session)
+        except Exception as e:
+            print(f"Static rank sweep failed: {e}")
+
+
 async def create_all_indexes(engine: AsyncEngine):
     """
     Create all performance indexes for search and user operations.
     Run this once after initial migration.
     """
-    
-    indexes = [
-        "CREATE INDEX IF NOT EXISTS idx_fundraisers_status ON fundraisers(status)",
-        "CREATE INDEX IF NOT EXISTS idx_fundraisers_trust_score ON fundraisers(trust_score DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_fundraisers_created_at ON fundraisers(created_at DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_fundraisers_country ON fundraisers(country)",
-        "CREATE INDEX IF NOT EXISTS idx_cause_updates_cause_id ON cause_updates(cause_id)",
-        "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_trust ON fundraisers(status, trust_score DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_created ON fundraisers(status, created_at DESC)",
-        "CREATE INDEX IF NOT EXISTS idx_fundraisers_user_id ON fundraisers(user_id)",
-        "CREATE INDEX IF NOT EXISTS idx_donations_fundraiser_id ON donations(fundraiser_id)",
-    ]
-    
+
     async with engine.begin() as conn:
-        for idx_sql in indexes:
-            try:
-                await conn.execute(text(idx_sql))
-                print(f"Created index: {idx_sql.split('idx_')[1].split(' ')[0]}")
-            except Exception as e:
-                print(f"Index creation failed (may already exist): {e}")
-    
-        print("All indexes created successfully")
+        failed = await create_indexes(conn)
+    print(f"Created {len(INDEXES) - len(failed)} of {len(INDEXES)} indexes")
+
+    try:
+        await search_backend.setup(engine)
+        print(f"Search backend ready: {search_backend.name}")
+    except Exception as e:
+        print(f"Search backend setup failed, falling back to LIKE search: {e}")
+
+    async with AsyncSessionLocal() as session:
+        await fuzzy_index.build(session)
+    print(f"Typo index built ({len(fuzzy_index.words.refs)} words, {len(fuzzy_index.locations.refs)} places)")
+
+    async with AsyncSessionLocal() as session:
+        await vector_index.build(session)
+    print(f"Vector index built ({len(vector_index)} fundraisers)")
+
+    async with AsyncSessionLocal() as session:
+        await image_index.build(session)
+    print(f"Image index built ({len(image_index)} images)")
 
 
 
@@ -76,9 +152,38 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(Base.metadata.create_all)
     print("Database tables created/verified")
 
-
+    added = await add_missing_columns(engine)
+    if set(added) & set(COUNTERS):
+        # New counter columns start at 0; fill them from the source tables once
+        async with AsyncSessionLocal() as session:
+            rebuilt = await verify_counters(session)
+        print(f"Activity counters built for {len(rebuilt)} fundraisers")
+    async with AsyncSessionLocal() as session:
+        tagged = await crud.backfill_fundraiser_tags(session)
+    if tagged:
+        print(f"Backfilled {tagged} fundraiser tags")
+
+    gazetteer.build()
+    async with AsyncSessionLocal() as session:
+        relocated = await crud.normalize_fundraiser_locations(session)
+    print(f"Gazetteer built ({len(gazetteer.lookup)} names), {relocated} fundraiser locations normalized")
     await create_all_indexes(engine)
 
+    # Full refresh doubles as backfill and catches boundaries crossed while down
+    async with AsyncSessionLocal() as session:
+        await refresh_static_rank(session)
+        await session.commit()
+        await filter_stats.refresh(session)
+    sweeper = asyncio.create_task(static_rank_sweeper())
+    scoring_worker.start()
+    phash_backfill = asyncio.create_task(backfill_image_phashes())
+
+    try:
+        await browser_pool.start()
+        print("Browser pool ready")
+    except Exception as e:
+        print(f"Browser pool not started, will launch on first scrape: {e}")
+
     global graph
     checkpointer = InMemorySaver()
     graph = workflow.compile(checkpointer=checkpointer)
@@ -93,6 +198,11 @@ async def lifespan(app: FastAPI):
 
     yield
     # Shutdown
+    sweeper.cancel()
+    phash_backfill.cancel()
+    await scoring_worker.stop()
+    await web_fetcher.close()
+    await browser_pool.stop()
     print("👋 Shutting down...")
 
 app = FastAPI(
@@ -108,6 +218,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 @app.get("/")
@@ -128,6 +239,23 @@ async def get_privacy_status():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/browser-pool")
+async def browser_pool_stats():
+    return browser_pool.stats()
+
+@app.get("/health/scoring-queue")
+async def scoring_queue_stats():
+    return await scoring_worker.stats()
+
+@app.get("/health/web-fetcher")
+async def web_fetcher_stats():
+    return web_fetcher.stats()
+
+@app.get("/health/search-cache")
+async def search_cache_stats():
+    """Hit rate and memory use of the in-process search cache (per worker)"""
+    return search_cache.stats()
+
 # Routes
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(fundraisers.router, prefix="/api/v1")
@@ -1,5 +1,5 @@
 # src/models.py
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, JSON, ForeignKey, Boolean, LargeBinary
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -8,6 +8,11 @@ from .database import Base
 def gen_uuid():
     return str(uuid.uuid4())
 
+def columns_for(model, schema):
+    """Table columns behind a response schema's fields, for column-projected selects"""
+    table_columns = model.__table__.c
+    return [table_columns[name] for name in schema.model_fields if name in table_columns]
+
 class User(Base):
     __tablename__ = "users"
 
@@ -35,7 +40,19 @@ class Fundraiser(Base):
 
     trust_score= Column(Float, nullable=False, default=0.0)
     trust_score_report=Column(JSON, nullable=True)
+    # trust + recency + progress part of the search score, see search.refresh_static_rank
+    static_rank = Column(Float, nullable=False, default=0.0)
+    # amount_raised / goal_amount, refreshed alongside static_rank so it can be range-filtered
+    progress = Column(Float, nullable=False, default=0.0)
     last_score_update= Column(DateTime(timezone=True))
+    # Activity counters, bumped by crud and rebuilt by activity_counters.verify_counters
+    goal_edit_count = Column(Integer, nullable=False, default=0)
+    wallet_edit_count = Column(Integer, nullable=False, default=0)
+    title_edit_count = Column(Integer, nullable=False, default=0)
+    description_edit_count = Column(Integer, nullable=False, default=0)
+    update_count = Column(Integer, nullable=False, default=0)
+    unique_update_image_count = Column(Integer, nullable=False, default=0)
+    donation_count = Column(Integer, nullable=False, default=0)
     country = Column(String, nullable=True)
     city = Column(String, nullable=True)
     continent =  Column(String, nullable=True)
@@ -55,12 +72,15 @@ class Fundraiser(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Superseded by WebsiteSnapshot; kept so older databases still load
     website_snapshot= Column(Text, nullable=True)
     last_website_fetch= Column(DateTime, nullable=True)
 
     user = relationship("User", back_populates="fundraisers")
     donations = relationship("Donation", back_populates="fundraiser")
     image_hash = Column(String, index=True, nullable=True) 
+    # dHash for near-duplicate lookups, see image_index
+    image_phash = Column(String, nullable=True)
     updates = relationship(
         "CauseUpdate", 
         back_populates="cause",
@@ -74,6 +94,70 @@ class Fundraiser(Base):
     )
 
 
+class FundraiserTag(Base):
+    """One row per (fundraiser, tag); the indexed mirror of Fundraiser.tags"""
+    __tablename__ = "fundraiser_tags"
+
+    fundraiser_id = Column(String, ForeignKey("fundraisers.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String, primary_key=True)
+
+
+class WebsiteSnapshot(Base):
+    """Last scraped text of a website, zlib-compressed, with HTTP validators for conditional GETs"""
+    __tablename__ = "website_snapshots"
+
+    url = Column(String, primary_key=True)
+    content = Column(LargeBinary, nullable=False)
+    content_hash = Column(String, nullable=False)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    # When the content last changed vs. when it was last confirmed current
+    fetched_at = Column(DateTime, nullable=False)
+    checked_at = Column(DateTime, nullable=False)
+
+
+class ScoringJob(Base):
+    """
+    A pending trust-score recompute. One row per fundraiser, so repeated
+    enqueues coalesce; `rerun` marks a request that came in while the job
+    was already running.
+    """
+    __tablename__ = "scoring_jobs"
+
+    fundraiser_id = Column(String, ForeignKey("fundraisers.id", ondelete="CASCADE"), primary_key=True)
+    run_after = Column(DateTime, nullable=False, index=True)
+    requested_at = Column(DateTime, nullable=False)
+    rerun = Column(Boolean, nullable=False, default=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+
+
+class TrustSignalRow(Base):
+    """
+    Raw check outcomes of a fundraiser's last trust scoring, one row of the
+    what-if matrix (see trust_matrix). NULL where the check did not run.
+    """
+    __tablename__ = "trust_signal_rows"
+
+    fundraiser_id = Column(String, ForeignKey("fundraisers.id", ondelete="CASCADE"), primary_key=True)
+    has_image = Column(Float, nullable=True)
+    duplicate_images = Column(Float, nullable=True)
+    wallet_edits = Column(Float, nullable=True)
+    goal_edits = Column(Float, nullable=True)
+    title_edits = Column(Float, nullable=True)
+    update_count = Column(Float, nullable=True)
+    unique_update_images = Column(Float, nullable=True)
+    loaded_updates = Column(Float, nullable=True)
+    social_valid = Column(Float, nullable=True)
+    website_ok = Column(Float, nullable=True)
+    llm_website_consistent = Column(Float, nullable=True)
+    llm_title_consistent = Column(Float, nullable=True)
+    llm_updates_quality = Column(Float, nullable=True)
+    scored_at = Column(DateTime, nullable=False)
+
+
 class FundraiserAudit(Base):
     """
     Tracks historical changes to critical fields.
@@ -100,6 +184,7 @@ class CauseUpdate(Base):
     content = Column(Text, nullable=False)
     image_url = Column(String, nullable=True)
     image_hash = Column(String, nullable=True)
+    image_phash = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     cause = relationship("Fundraiser", back_populates="updates")
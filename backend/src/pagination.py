@@ -0,0 +1,96 @@
+# src/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import String, and_, case, func, literal, or_, type_coerce
+
+from .database import engine
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque token for the last row of a page, e.g. (created_at, id) or (score, id)"""
+    payload = [
+        {"dt": v.isoformat()} if isinstance(v, datetime) else v
+        for v in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Inverse of encode_cursor. Raises 400 on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("wrong cursor size")
+        return [
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v
+            for v in values
+        ]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def _sqlite_datetime_text(value: datetime) -> str:
+    """`value` as SQLAlchemy stores DateTime on SQLite"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def keyset_after(sort_col, id_col, cursor: Optional[str]):
+    """
+    WHERE clause for the rows after `cursor` when ordering by
+    (sort_col DESC, id_col DESC). Returns None for the first page.
+    """
+    if not cursor:
+        return None
+    last_value, last_id = decode_cursor(cursor, 2)
+    if isinstance(last_value, datetime) and engine.dialect.name == "sqlite":
+        # SQLite compares the stored text: server_default rows hold
+        # "YYYY-MM-DD HH:MM:SS", rows written from Python add ".ffffff".
+        # Pad the former so both sides of the comparison share one format;
+        # the bare bound keeps the (created_at DESC, id DESC) index usable.
+        last_text = literal(_sqlite_datetime_text(last_value), String)
+        stored = type_coerce(sort_col, String)
+        padded = case((func.length(stored) == 19, stored.concat(".000000")), else_=stored)
+        return and_(
+            stored <= last_text,
+            or_(padded < last_text, and_(padded == last_text, id_col < last_id)),
+        )
+    return or_(
+        sort_col < last_value,
+        and_(sort_col == last_value, id_col < last_id)
+    )
+
+
+def paginate(stmt, sort_col, id_col, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """Apply keyset ordering, the cursor predicate and the page limit to a select()"""
+    after = keyset_after(sort_col, id_col, cursor)
+    if after is not None:
+        stmt = stmt.where(after)
+    stmt = stmt.order_by(sort_col.desc(), id_col.desc())
+    if limit:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def next_cursor(items: Sequence, limit: Optional[int], sort_attr: str) -> Optional[str]:
+    """Cursor for the page after `items`, or None if this page was not full"""
+    if not limit or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(getattr(last, sort_attr), last.id)
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: Optional[int], sort_attr: str = "created_at"):
+    """Expose the next-page cursor as a header so list responses keep their shape"""
+    cursor = next_cursor(items, limit, sort_attr)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
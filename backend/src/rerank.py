@@ -0,0 +1,59 @@
+# src/rerank.py
+from typing import List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+
+from . import models
+
+
+def _tag_set(tags: Optional[List[str]]) -> List[str]:
+    """Query-side tags normalized like fundraiser_tags rows"""
+    return sorted({t.strip().lower() for t in (tags or []) if t and t.strip()})
+
+
+class CandidateReranker:
+    """
+    Second ranking stage: personalization (interest overlap) and explicit tag
+    matches, computed for a whole candidate batch at once. Each candidate's
+    match counts come from the fundraiser_tags index as correlated counts in
+    the stage-one select (see `columns`), so no tag list is parsed per row.
+    """
+
+    def __init__(self, weights: dict, interests: Optional[List[str]], search_tags: Optional[List[str]]):
+        self.weights = weights
+        self.interests = _tag_set(interests)
+        self.search_tags = _tag_set(search_tags)
+
+    @property
+    def max_bonus(self) -> float:
+        """Largest amount stage two can add to any candidate"""
+        bonus = 0.0
+        if self.interests:
+            bonus += self.weights["interest_overlap"] + len(self.interests) * self.weights["per_tag_match"]
+        bonus += len(self.search_tags) * self.weights["tag_point"]
+        return bonus
+
+    def columns(self) -> list:
+        """Per-candidate match counts (interest_hits, tag_hits) to add to the stage-one select"""
+        T = models.FundraiserTag
+        columns = []
+        for label, tags in (("interest_hits", self.interests), ("tag_hits", self.search_tags)):
+            if tags:
+                hits = select(func.count()).where(T.fundraiser_id == models.Fundraiser.id, T.tag.in_(tags))
+                columns.append(hits.scalar_subquery().label(label))
+        return columns
+
+    def bonuses(self, rows: Sequence) -> np.ndarray:
+        """Stage-two bonus per row of a select that included `columns()`"""
+        n = len(rows)
+        scores = np.zeros(n)
+        if not n:
+            return scores
+        if self.interests:
+            hits = np.fromiter((r.interest_hits for r in rows), dtype=np.float64, count=n)
+            scores += (hits > 0) * self.weights["interest_overlap"] + hits * self.weights["per_tag_match"]
+        if self.search_tags:
+            hits = np.fromiter((r.tag_hits for r in rows), dtype=np.float64, count=n)
+            scores += hits * self.weights["tag_point"]
+        return scores
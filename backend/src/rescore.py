@@ -0,0 +1,244 @@
+"""
+Bulk trust-score recomputation, stalest scores first.
+
+Run from backend/:
+
+    python -m src.rescore                                  # every fundraiser
+    python -m src.rescore --status active --older-than-hours 24
+    python -m src.rescore --ids f1 f2 f3 --llm-concurrency 2
+    python -m src.rescore --resume                         # pick up an interrupted run
+
+DB, website-scrape and LLM work have separate concurrency caps. Progress
+is checkpointed to --checkpoint: a resumed run only takes fundraisers last
+scored before the original run started, so finished ones are skipped and
+failed ones retried.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_, select
+
+from . import crud, models
+from .browser_pool import browser_pool
+from .database import AsyncSessionLocal, Base, engine
+from .score_util import ScoringLimits, update_trust_score
+from .image_index import image_index
+from .trust_signals import extract_db_signals
+from .web_fetcher import web_fetcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = "state_db/rescore_checkpoint.json"
+CHECKPOINT_EVERY = 25  # completions
+PREFETCH_BATCH = 100  # fundraisers loaded (rows + DB signals) per round of queries
+
+
+async def select_targets(
+    cutoff: datetime,
+    status: Optional[str] = None,
+    ids: Optional[List[str]] = None,
+    older_than: Optional[timedelta] = None,
+    limit: Optional[int] = None,
+) -> List[str]:
+    """Ids to rescore, never-scored first, then by last_score_update ascending"""
+    last = models.Fundraiser.last_score_update
+    if older_than is not None:
+        cutoff = min(cutoff, datetime.utcnow() - older_than)
+    stmt = (
+        select(models.Fundraiser.id)
+        .where(or_(last.is_(None), last < cutoff))
+        .order_by(last.is_(None).desc(), last.asc(), models.Fundraiser.id)
+    )
+    if status:
+        stmt = stmt.where(models.Fundraiser.status == status)
+    if ids:
+        stmt = stmt.where(models.Fundraiser.id.in_(ids))
+    if limit:
+        stmt = stmt.limit(limit)
+    async with AsyncSessionLocal() as db:
+        return list((await db.execute(stmt)).scalars())
+
+
+class Checkpoint:
+    """Run parameters and counters, rewritten atomically as the run goes"""
+
+    def __init__(self, path: str, state: dict):
+        self.path = path
+        self.state = state
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return cls(path, json.load(f))
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def report(self) -> str:
+        finished = self.done + self.failed
+        elapsed = time.monotonic() - self.started
+        rate = finished / elapsed if elapsed else 0.0
+        eta = (self.total - finished) / rate if rate else float("inf")
+        eta_text = str(timedelta(seconds=int(eta))) if rate else "?"
+        return (
+            f"{finished}/{self.total} rescored ({self.failed} failed) "
+            f"{rate:.2f}/s elapsed {timedelta(seconds=int(elapsed))} eta {eta_text}"
+        )
+
+
+async def rescore(
+    targets: List[str],
+    limits: ScoringLimits,
+    workers: int,
+    checkpoint: Checkpoint,
+    report_every: float = 10.0,
+) -> Progress:
+    workers = max(1, workers)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * PREFETCH_BATCH)
+    progress = Progress(len(targets))
+
+    async def prefetch():
+        # Fundraiser rows and DB signals for a whole batch in a few round trips
+        try:
+            for start in range(0, len(targets), PREFETCH_BATCH):
+                batch = targets[start:start + PREFETCH_BATCH]
+                async with limits.db:
+                    async with AsyncSessionLocal() as db:
+                        fundraisers = await crud.get_fundraisers_for_scoring(db, batch)
+                        signals = await extract_db_signals(db, batch)
+                for fid in batch:
+                    await queue.put((fid, fundraisers.get(fid), signals.get(fid)))
+        finally:
+            for _ in range(workers):
+                await queue.put(None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            fid, fundraiser, signals = item
+            try:
+                if fundraiser is None:
+                    raise LookupError("fundraiser not found")
+                async with AsyncSessionLocal() as db:
+                    await update_trust_score(db, fid, limits, fundraiser=fundraiser, signals=signals)
+                progress.done += 1
+            except Exception as e:
+                logger.error(f"Rescore of {fid} failed: {type(e).__name__}: {e}")
+                progress.failed += 1
+                checkpoint.state["failed"].append(fid)
+            checkpoint.state["done"] += 1
+            if checkpoint.state["done"] % CHECKPOINT_EVERY == 0:
+                checkpoint.save()
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(report_every)
+            print(progress.report(), flush=True)
+
+    reporting = asyncio.create_task(reporter())
+    try:
+        await asyncio.gather(prefetch(), *(worker() for _ in range(workers)))
+    finally:
+        reporting.cancel()
+        checkpoint.save()
+    return progress
+
+
+async def run(args) -> int:
+    checkpoint = Checkpoint.load(args.checkpoint) if args.resume else None
+    if args.resume and checkpoint is None:
+        print(f"No checkpoint at {args.checkpoint}")
+        return 1
+
+    if checkpoint is not None:
+        params = checkpoint.state["params"]
+        print(f"Resuming run started {checkpoint.state['started_at']}")
+    else:
+        params = {
+            "status": args.status,
+            "ids": args.ids,
+            "older_than_hours": args.older_than_hours,
+            "limit": args.limit,
+        }
+        checkpoint = Checkpoint(args.checkpoint, {
+            "started_at": datetime.utcnow().isoformat(),
+            "params": params,
+            "done": 0,
+            "failed": [],
+        })
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    cutoff = datetime.fromisoformat(checkpoint.state["started_at"])
+    older_than = timedelta(hours=params["older_than_hours"]) if params["older_than_hours"] else None
+    targets = await select_targets(cutoff, params["status"], params["ids"], older_than, params["limit"])
+    print(f"{len(targets)} fundraisers to rescore")
+    if args.dry_run:
+        for fid in targets[:20]:
+            print(f"  {fid}")
+        await engine.dispose()
+        return 0
+
+    checkpoint.state["failed"] = []
+    checkpoint.save()
+    async with AsyncSessionLocal() as db:
+        # Near-duplicate image checks read the in-memory index
+        await image_index.build(db)
+    limits = ScoringLimits.create(args.db_concurrency, args.scrape_concurrency, args.llm_concurrency)
+    workers = args.workers or args.scrape_concurrency + args.llm_concurrency
+    progress = await rescore(targets, limits, workers, checkpoint, args.report_every)
+    print(progress.report())
+    if progress.failed:
+        print(f"{progress.failed} failed; run again with --resume to retry them")
+    else:
+        os.remove(args.checkpoint)
+    await web_fetcher.close()
+    await browser_pool.stop()
+    await engine.dispose()
+    return 1 if progress.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", help="Only fundraisers with this status (e.g. active)")
+    parser.add_argument("--ids", nargs="+", help="Only these fundraiser ids")
+    parser.add_argument("--older-than-hours", type=float, help="Only scores older than this")
+    parser.add_argument("--limit", type=int, help="Rescore at most this many")
+    parser.add_argument("--db-concurrency", type=int, default=4)
+    parser.add_argument("--scrape-concurrency", type=int, default=8)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, help="Fundraisers in flight (default scrape + llm concurrency)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--resume", action="store_true", help="Continue the run recorded in --checkpoint")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between progress lines")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be rescored")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    raise SystemExit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import json
 
 from ..database import get_db
 from .. import crud, schemas
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
 
 router = APIRouter(prefix="/donations", tags=["Donations"])
 
 
 
 @router.get("/", response_model=List[schemas.DonationResponse])
-async def list_donationss(db: AsyncSession = Depends(get_db)):
-    return await crud.list_donations(db)
+async def list_donationss(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    donations = await crud.list_donations(db, limit=limit, cursor=cursor)
+    set_next_cursor(response, donations, limit)
+    return donations
 
@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import json
 
 from ..database import get_db
 from .. import crud, schemas, auth, models, utils
-from .. import score_util
+from .. import scoring_jobs
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
+from ..search import search_fundraisers_faceted
 
 router = APIRouter(prefix="/fundraisers", tags=["Fundraisers"])
 
 @router.post("/", response_model=schemas.FundraiserResponse)
 async def create_fundraiser(
-    background_tasks: BackgroundTasks,
     title: str = Form(...),
     display_name: str = Form(...),
     short_description: str = Form(None),
@@ -31,7 +32,7 @@ async def create_fundraiser(
     
 ):
 
-    image_url, image_hash = await utils.process_image_upload(image, folder="fundraisers")
+    image_url, image_hash, image_phash = await utils.process_image_upload(image, folder="fundraisers")
     social_links = json.loads(social_links_json) if social_links_json else []
     tags = json.loads(tags_json) if tags_json else []
 
@@ -50,11 +51,12 @@ async def create_fundraiser(
         social_links=social_links,
         tags=tags,
         image_url=image_url,
-        image_hash=image_hash 
+        image_hash=image_hash,
+        image_phash=image_phash
     )
 
     result= await crud.create_fundraiser(db, current_user.id, fundraiser_data)
-    background_tasks.add_task(score_util.update_trust_score, db, result.id)
+    await scoring_jobs.enqueue(db, result.id, delay=0)
     return result
 
 @router.patch("/{fundraiser_id}", response_model=schemas.FundraiserResponse)
@@ -80,10 +82,11 @@ async def update_fundraiser(
 
     image_url = fundraiser.image_url 
     image_hash = fundraiser.image_hash
+    image_phash = fundraiser.image_phash
     
     
     if image:
-        image_url, image_hash = await utils.process_image_upload(image, folder="fundraisers")
+        image_url, image_hash, image_phash = await utils.process_image_upload(image, folder="fundraisers")
     
     social_links = json.loads(social_links_json) if social_links_json else None
     tags = json.loads(tags_json) if tags_json else None
@@ -97,7 +100,8 @@ async def update_fundraiser(
         social_links=social_links,
         tags=tags,
         image_url=image_url,
-        image_hash=image_hash
+        image_hash=image_hash,
+        image_phash=image_phash
     )
     return await crud.update_fundraiser(db, fundraiser_id, update_data)
 
@@ -116,20 +120,47 @@ async def add_update(
     if fundraiser.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    image_url, image_hash = await utils.process_image_upload(image, folder="updates")
+    image_url, image_hash, image_phash = await utils.process_image_upload(image, folder="updates")
     
     data = schemas.UpdateCreate(
         content=content,
         image_url=image_url,
-        image_hash=image_hash  
+        image_hash=image_hash,
+        image_phash=image_phash
     )
     
     return await crud.add_update(db, fundraiser_id, data)
 
 
 @router.get("/", response_model=List[schemas.FundraiserResponse])
-async def list_fundraisers(db: AsyncSession = Depends(get_db)):
-    return await crud.list_fundraisers(db)
+async def list_fundraisers(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    fundraisers = await crud.list_fundraisers(db, limit=limit, cursor=cursor)
+    set_next_cursor(response, fundraisers, limit)
+    return fundraisers
+
+@router.post("/search", response_model=schemas.FundraiserSearchPage)
+async def search_fundraisers(
+    search: schemas.FacetedSearchRequest,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    results, next_cursor, facets = await search_fundraisers_faceted(
+        db, search, interests=search.interests or [], limit=limit, cursor=cursor
+    )
+    return {"results": results, "next_cursor": next_cursor, "facets": facets}
+
+@router.get("/tags", response_model=List[schemas.TagFacet])
+async def list_tag_facets(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    return await crud.tag_facets(db, limit=limit)
 
 @router.get("/{fundraiser_id}", response_model=schemas.FundraiserResponse)
 async def get_fundraiser(fundraiser_id: str, db: AsyncSession = Depends(get_db)):
@@ -139,12 +170,28 @@ async def get_fundraiser(fundraiser_id: str, db: AsyncSession = Depends(get_db))
     return fundraiser
 
 @router.get("/{fundraiser_id}/updates", response_model=List[schemas.UpdateResponse])
-async def get_updates(fundraiser_id: str, db: AsyncSession = Depends(get_db)):
-    return await crud.list_updates(db, fundraiser_id)
+async def get_updates(
+    fundraiser_id: str,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    updates = await crud.list_updates(db, fundraiser_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, updates, limit)
+    return updates
 
 @router.get("/{fundraiser_id}/donations", response_model=List[schemas.DonationResponse])
-async def list_donations(fundraiser_id: str, db: AsyncSession = Depends(get_db)):
-    return await crud.list_donations_for_fundraiser(db, fundraiser_id)
+async def list_donations(
+    fundraiser_id: str,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    donations = await crud.list_donations_for_fundraiser(db, fundraiser_id, limit=limit, cursor=cursor)
+    set_next_cursor(response, donations, limit)
+    return donations
 
 @router.get("/{fundraiser_id}/trust-report")
 async def get_trust_report(fundraiser_id: str, db: AsyncSession = Depends(get_db)):
@@ -50,6 +50,7 @@ class FundraiserBase(BaseModel):
 
 class FundraiserCreate(FundraiserBase):
     image_hash: Optional[str] = None
+    image_phash: Optional[str] = None
     wallet_address: Optional[str] = None
 
 class FundraiserResponse(FundraiserBase):
@@ -67,6 +68,7 @@ class UpdateCreate(BaseModel):
     content: str
     image_url: Optional[str] = None
     image_hash: Optional[str] = None
+    image_phash: Optional[str] = None
 
 class UpdateResponse(UpdateCreate):
     id: str
@@ -96,6 +98,22 @@ class FundraiserSearchRequest(BaseModel):
     location: Optional[str] = None
     tags: Optional[List[str]] = None
     min_trust_score: Optional[float] = 0.0 
+    max_trust_score: Optional[float] = None
+    # Fraction of the goal raised, e.g. 0.5 = half funded
+    min_progress: Optional[float] = None
+    max_progress: Optional[float] = None
+    min_goal: Optional[float] = None
+    max_goal: Optional[float] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    continents: Optional[List[str]] = None
+
+class FacetedSearchRequest(FundraiserSearchRequest):
+    interests: Optional[List[str]] = None
+
+class TagFacet(BaseModel):
+    tag: str
+    count: int
 
 class FundraiserUpdate(BaseModel):
     display_name: Optional[str] = None
@@ -112,6 +130,8 @@ class FundraiserUpdate(BaseModel):
     tags: Optional[List[str]] = None
     goal_amount: Optional[float] = None
     image_url: Optional[str] = None
+    image_hash: Optional[str] = None
+    image_phash: Optional[str] = None
     country: Optional[str] = None
     city: Optional[str] = None
 
@@ -127,3 +147,21 @@ class FundraiserAuditorResponse(BaseModel):
       is_website_consistent:bool
       are_updates_high_quality:bool
       is_title_consistent:bool
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class SearchFacets(BaseModel):
+    total: int
+    continent: List[FacetCount]
+    country: List[FacetCount]
+    tag: List[FacetCount]
+    trust: List[FacetCount]
+
+class FundraiserSearchPage(BaseModel):
+    results: List[FundraiserScoreResponse]
+    next_cursor: Optional[str] = None
+    # Only on the first page
+    facets: Optional[SearchFacets] = None
@@ -1,109 +1,122 @@
-from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+from contextlib import nullcontext
+from datetime import datetime
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, func
 from . import models, crud
-from playwright.async_api import async_playwright
+from .website_snapshots import WebsiteText, get_website_text
+from .trust_signals import DbSignals, extract_db_signals
+from .signal_graph import Signal, run_signals
+from . import trust_matrix
+from .trust_rules import llm_score, rule_score
+from .database import AsyncSessionLocal
 from dataclasses import dataclass, field
 from typing import List
 import re
 from .near_inference import NEARInference
 from .schemas import FundraiserAuditorResponse
+from .search import refresh_static_rank, invalidate_search_cache
 import logging
 
 logger = logging.getLogger(__name__)
 near_llm = NEARInference(model="openai/gpt-oss-120b")
 
-WEIGHTS = {
-    "base_score": 0.5, 
-    "social_verified_bonus": 0.15,
-    "website_match_bonus": 0.15, 
-    "update_quality_bonus": 0.10,
-    "unique_update_images_bonus": 0.05,
-    "title_desc_match_bonus": 0.05, 
-    "zero_updates_penalty": -0.05,
-    "no_website_content_penalty": -0.05,
-    "duplicate_image_penalty": -0.40, 
-    "wallet_swap_penalty": -0.30,
-    "instability_penalty_minor": -0.10,
-    "instability_penalty_major": -0.20,
+# Seconds each check may run (not counting waits for a ScoringLimits slot)
+SIGNAL_TIMEOUTS = {
+    "db": 15.0,
+    "website": 60.0,
+    "llm": 90.0,
 }
+# Checks that carry the big penalties (duplicate image, wallet swaps); a
+# score without them would be too generous to persist
+PENALTY_SIGNALS = ("db",)
 
-MAX_ACCEPTABLE_GOAL_EDITS = 2
-MAX_ACCEPTABLE_DESC_EDITS = 3
-MAX_ACCEPTABLE_WALLET_EDITS = 1
-MAX_ACCEPTABLE_TITLE_EDITS = 2
+
+class IncompleteScoreError(RuntimeError):
+    """A penalty-bearing check did not finish, so the score was not saved"""
 
 @dataclass
 class TrustReport:
     score: float
     flags: List[str] = field(default_factory=list)
+    # name -> {"fingerprint", "result"}, see SignalMemo
+    signals: dict = field(default_factory=dict)
+    # Checks that timed out or failed and were left out of the score
+    missing: List[str] = field(default_factory=list)
+    # Raw outcomes for the what-if matrix, see trust_matrix.signal_row
+    features: dict = field(default_factory=dict)
+
+@dataclass
+class ScoringLimits:
+    """Caps on concurrent DB, website-scrape and LLM work shared by parallel scoring runs"""
+    db: asyncio.Semaphore
+    scrape: asyncio.Semaphore
+    llm: asyncio.Semaphore
+
+    @classmethod
+    def create(cls, db: int = 4, scrape: int = 8, llm: int = 4) -> "ScoringLimits":
+        return cls(asyncio.Semaphore(db), asyncio.Semaphore(scrape), asyncio.Semaphore(llm))
+
+
+def _slot(limits: Optional[ScoringLimits], kind: str):
+    return getattr(limits, kind) if limits is not None else nullcontext()
 
-async def fetch_website_content(fundraiser) -> tuple[str, bool]:
+async def fetch_website_content(db: AsyncSession, fundraiser) -> WebsiteText:
     """
-    Fetch website content with caching
-    Returns: (content, success_flag)
+    Fetch website content through the snapshot store
+    Returns: WebsiteText (text is the failure reason when not ok)
     """
     url = fundraiser.website_url
     if not url:
-        return "No website provided.", False
-    
-    # Use cached snapshot if recent (within 7 days)
-    if (fundraiser.website_snapshot and 
-        fundraiser.last_website_fetch and
-        datetime.utcnow() - fundraiser.last_website_fetch < timedelta(days=7)):
-        logger.info(f"Using cached website content for {url}")
-        return fundraiser.website_snapshot, True
-    
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-                viewport={"width": 1920, "height": 1080}
-            )
-            page = await context.new_page()
-            
-            # Increased timeout to 30s and wait for network idle
-            response = await page.goto(
-                url, 
-                timeout=60000, 
-                wait_until="networkidle"
-            )
+        return WebsiteText("No website provided.", False)
+
+    website = await get_website_text(db, url)
+    if not website.ok:
+        return website
+
+    # Validate content
+    if len(website.text) < 50:
+        logger.warning(f"Website {url} has minimal content ({len(website.text)} chars)")
+        return WebsiteText(website.text, False)
 
-            if not response:
-                await browser.close()
-                logger.warning(f"No response from {url}")
-                return "Website did not respond.", False
-                
-            if response.status >= 400:
-                await browser.close()
-                logger.warning(f"Website {url} returned status {response.status}")
-                return f"Website returned error {response.status}.", False
-            
-            # Wait for JS rendering
-            await page.wait_for_timeout(2000)
-            
-            text = await page.locator("body").inner_text()
-            await browser.close()
-            
-            clean_text = " ".join(text.split()).strip()
-            
-            # Validate content
-            if len(clean_text) < 50:
-                logger.warning(f"Website {url} has minimal content ({len(clean_text)} chars)")
-                return clean_text, False
-            
-            # Cache successful fetch
-            fundraiser.website_snapshot = clean_text[:2000]
-            fundraiser.last_website_fetch = datetime.utcnow()
-            
-            logger.info(f"Successfully fetched {len(clean_text)} chars from {url}")
-            return clean_text[:2000], True
-            
-    except Exception as e:
-        logger.error(f"Website scrape failed for {url}: {type(e).__name__}: {str(e)}")
-        return f"Failed to scrape: {type(e).__name__}", False
+    logger.info(f"Got {len(website.text)} chars from {url}{' (unchanged)' if website.unchanged else ''}")
+    return website
+
+def fingerprint(*parts) -> str:
+    """Hash of a signal's inputs, to tell when a stored result still applies"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(("" if part is None else str(part)).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class SignalMemo:
+    """
+    Signal results from the previous trust report, reused when the inputs
+    fingerprint matches. Results are raw observations (counts, verdicts),
+    not score contributions, so changing WEIGHTS needs no recompute.
+    """
+
+    def __init__(self, previous_report: Optional[dict]):
+        self.previous = (previous_report or {}).get("signals") or {}
+        # Signals skipped this run (e.g. no LLM on a low score) keep their old entry
+        self.current = dict(self.previous)
+        self.reused = []
+
+    async def get(self, name: str, inputs: tuple, compute):
+        key = fingerprint(*inputs)
+        cached = self.previous.get(name)
+        if cached and cached.get("fingerprint") == key and cached.get("result") is not None:
+            result = cached["result"]
+            self.reused.append(name)
+        else:
+            result = await compute()
+        self.current[name] = {"fingerprint": key, "result": result}
+        return result
 
 def validate_social_links(socials: list) -> bool:
     """Validate social media profile links"""
@@ -151,170 +164,151 @@ RETURN JSON ONLY:
     
     return result["parsed"].model_dump()
 
-async def compute_trust_score(session: AsyncSession, fundraiser) -> TrustReport:
+async def compute_trust_score(
+    fundraiser,
+    limits: Optional[ScoringLimits] = None,
+    signals: Optional[DbSignals] = None
+) -> TrustReport:
     """
     Calculate comprehensive trust score with ALL checks.
+    The checks run as a signal graph (see SIGNAL_TIMEOUTS): DB signals,
+    socials and the website scrape concurrently, the LLM audit once they
+    are done. DB signals and the scrape open their own sessions. Signals
+    that time out or fail are left out of the score and flagged. `limits`
+    throttles each kind of I/O when many scores run at once; `signals`
+    lets bulk callers pass DB signals extracted for a whole batch.
     """
-    score = WEIGHTS["base_score"]
-    flags = []
-    
-    logger.info(f"Computing trust score for fundraiser {fundraiser.id}")
-    
+    memo = SignalMemo(fundraiser.trust_score_report)
+    updates_list = fundraiser.updates if fundraiser.updates else []
+    updates_text = "\n".join([
+        f"Update {i+1}: {u.content}"
+        for i, u in enumerate(updates_list)
+    ])
 
-    # CHECK 1: Duplicate Main Image
-    if fundraiser.image_hash:
-        dupes = await crud.check_duplicate_images(
-            session, 
-            fundraiser.image_hash, 
-            exclude_id=fundraiser.id
-        )
-        logger.info(f"Image hash {fundraiser.image_hash}: {dupes} duplicates found")
-        
-        if dupes > 0:
-            score += WEIGHTS["duplicate_image_penalty"]
-            flags.append(f"CRITICAL: Image used in {dupes} other fundraiser(s)")
-    else:
-        flags.append("Warning: No image available for duplicate check")
-    
+    logger.info(f"Computing trust score for fundraiser {fundraiser.id}")
 
-    # CHECK 2: Audit Log Analysis (Wallet/Goal changes)
-    if hasattr(fundraiser, "audit_logs") and fundraiser.audit_logs:
-        audit_counts = {"goal": 0, "wallet": 0, "title": 0}
-        
-        for log in fundraiser.audit_logs:
-            if log.field_changed == "goal_amount":
-                audit_counts["goal"] += 1
-            elif log.field_changed == "wallet_address":
-                audit_counts["wallet"] += 1
-            elif log.field_changed == "title":
-                audit_counts["title"] += 1
-        
-        # Wallet swapping (CRITICAL)
-        if audit_counts["wallet"] > MAX_ACCEPTABLE_WALLET_EDITS:
-            score += WEIGHTS["wallet_swap_penalty"]
-            flags.append(f"CRITICAL: Wallet changed {audit_counts['wallet']} times")
-        
-        # Goal instability
-        if audit_counts["goal"] > MAX_ACCEPTABLE_GOAL_EDITS:
-            score += WEIGHTS["instability_penalty_minor"]
-            flags.append(f"Penalty: Goal changed {audit_counts['goal']} times")
-        
-        # Title changes
-        if audit_counts["title"] > MAX_ACCEPTABLE_TITLE_EDITS:
-            score += WEIGHTS["instability_penalty_major"]
-            flags.append(f"Warning: Title changed {audit_counts['title']} times")
-    
+    # Duplicates, audit and update counts in one query.
+    # Not memoized: duplicate counts depend on every other fundraiser's images.
+    # Own session, so the caller's transaction is left alone.
+    async def db_signals(_):
+        if signals is not None:
+            return signals
+        async with AsyncSessionLocal() as signals_db:
+            found = (await extract_db_signals(signals_db, [fundraiser.id]))[fundraiser.id]
+        logger.info(f"Image hash {fundraiser.image_hash} / {fundraiser.image_phash}: {found.duplicate_images} duplicates found")
+        return found
 
-    # CHECK 3: Social Verification
-    if validate_social_links(fundraiser.social_links):
-        score += WEIGHTS["social_verified_bonus"]
-        flags.append(" Verified: Valid social profiles")
-    else:
-        flags.append("No valid social media links found")
-    
+    async def socials(_):
+        async def check_socials():
+            return {"valid": validate_social_links(fundraiser.social_links)}
 
-    # CHECK 5: Update Image Uniqueness
-    unique_images = await crud.get_unique_update_images_count(session, fundraiser.id)
-    if unique_images >= 3:
-        bonus = min(unique_images, 5) * WEIGHTS["unique_update_images_bonus"]
-        score += bonus
-        flags.append(f"Bonus: {unique_images} unique update images (+{bonus:.2f})")
-    
+        return await memo.get("social", (json.dumps(fundraiser.social_links, sort_keys=True),), check_socials)
 
-    # CHECK 6: Missing Updates
-    updates_list = fundraiser.updates if fundraiser.updates else []
-    if len(updates_list) == 0:
-        score += WEIGHTS["zero_updates_penalty"]
-        flags.append("Penalty: No updates posted")
-    
+    # Memoized by the snapshot store, which revalidates with conditional GETs.
+    # Own session so the scrape overlaps the DB signals.
+    async def website(_):
+        async with AsyncSessionLocal() as website_db:
+            return await fetch_website_content(website_db, fundraiser)
 
-    # CHECK 7: Website Issues
-    website_content, website_success = await fetch_website_content(fundraiser)
-    
-    if not website_success:
-        score += WEIGHTS["no_website_content_penalty"]
-        flags.append(f"Penalty: {website_content}")
-        # Don't proceed with LLM if website failed
-        website_content = ""
-    
+    async def llm(done):
+        if rule_score(fundraiser, done, []) <= 0.0:
+            return None
+        fetched = done["website"]
+        # Don't show the LLM a failed fetch's error text
+        website_content = fetched.text if fetched.ok else ""
 
-    if score > 0.0:
-        try:
-            updates_text = "\n".join([
-                f"Update {i+1}: {u.content}" 
-                for i, u in enumerate(updates_list)
-            ])
-            
+        async def run_llm():
             logger.info("Running LLM analysis...")
-            analysis = await analyze_text_with_llm(
+            result = await analyze_text_with_llm(
                 title=fundraiser.title,
                 desc=fundraiser.long_description or "",
-                website_text=website_content,
+                website_text=website_content[:2000],
                 updates_text=updates_text
             )
-            logger.info(f"LLM analysis result: {analysis}")
-            
-            # Website consistency (only if website was successfully fetched)
-            if website_success and analysis.get("is_website_consistent"):
-                score += WEIGHTS["website_match_bonus"]
-                flags.append("Verified: Website matches description")
-            elif website_success:
-                flags.append("Warning: Website content inconsistent with description")
-            
-            # Title-description alignment
-            if analysis.get("is_title_consistent"):
-                score += WEIGHTS["title_desc_match_bonus"]
-                flags.append("Verified: Title and description consistent")
-            else:
-                flags.append("Warning: Title doesn't match description")
-            
-            # Update quality
-            if analysis.get("are_updates_high_quality") and len(updates_list) > 0:
-                valid_updates = min(len(updates_list), 4)
-                bonus = valid_updates * WEIGHTS["update_quality_bonus"]
-                score += bonus
-                flags.append(f"Verified: {valid_updates} quality updates (+{bonus:.2f})")
-            elif len(updates_list) > 0:
-                flags.append("Warning: Updates flagged as low quality")
-                
-        except Exception as e:
-            logger.error(f"LLM analysis failed: {type(e).__name__}: {str(e)}")
-            flags.append(f"analysis unavailable: {type(e).__name__}")
-    else:
-        flags.append("ℹLLM analysis skipped due to low initial score")
-    
+            logger.info(f"LLM analysis result: {result}")
+            return result
+
+        return await memo.get(
+            "llm",
+            (
+                fundraiser.title or "",
+                fundraiser.long_description or "",
+                fetched.content_hash if fetched.ok else "",
+                updates_text,
+            ),
+            run_llm
+        )
+
+    graph = await run_signals([
+        Signal("db", db_signals, timeout=SIGNAL_TIMEOUTS["db"], slot="db"),
+        Signal("social", socials),
+        Signal("website", website, timeout=SIGNAL_TIMEOUTS["website"], slot="scrape"),
+        Signal("llm", llm, deps=("db", "social", "website"), timeout=SIGNAL_TIMEOUTS["llm"], slot="llm"),
+    ], limits)
+    results = graph.results
+
+    flags = []
+    score = rule_score(fundraiser, results, flags) + llm_score(fundraiser, results, flags)
+
+    for name, reason in graph.missing.items():
+        flags.append(f"Incomplete: {name} check {reason}, scored without it")
 
 
     final_score = max(0.0, min(score, 1.0))
+    if memo.reused:
+        logger.info(f"Reused signals: {', '.join(memo.reused)}")
     logger.info(f"Final trust score: {final_score:.2f} ({final_score * 100:.0f}/100)")
     logger.info(f"Flags: {flags}")
-    
-    return TrustReport(final_score, flags)
 
-async def update_trust_score(db: AsyncSession, fundraiser_id: str) -> float:
+    return TrustReport(final_score, flags, memo.current, sorted(graph.missing), trust_matrix.signal_row(fundraiser, results))
+
+async def update_trust_score(
+    db: AsyncSession,
+    fundraiser_id: str,
+    limits: Optional[ScoringLimits] = None,
+    fundraiser=None,
+    signals: Optional[DbSignals] = None
+) -> float:
     """
     Compute and persist trust score.
+    Bulk callers may pass the fundraiser (with updates loaded) and its signals.
+    Raises IncompleteScoreError, leaving the stored score as it was, when a
+    PENALTY_SIGNALS check timed out or failed; the caller retries later.
     """
-    fundraiser = await crud.get_fundraiser_with_audit_logs(db, fundraiser_id)
+    if fundraiser is None:
+        async with _slot(limits, "db"):
+            fundraiser = (await crud.get_fundraisers_for_scoring(db, [fundraiser_id])).get(fundraiser_id)
     
     if not fundraiser:
         logger.error(f"Fundraiser {fundraiser_id} not found")
         return 0.0
     
-    trust_report = await compute_trust_score(db, fundraiser)
+    trust_report = await compute_trust_score(fundraiser, limits, signals)
+    lost = [name for name in PENALTY_SIGNALS if name in trust_report.missing]
+    if lost:
+        raise IncompleteScoreError(f"{', '.join(lost)} check did not finish; score not saved")
     trust_score = trust_report.score * 100  # Convert to 0-100 scale
     
-    await db.execute(
-        update(models.Fundraiser)
-        .where(models.Fundraiser.id == fundraiser_id)
-        .values(
-            trust_score=trust_score,
-            trust_score_report={"score": trust_score, "flags": trust_report.flags},
-            last_score_update=datetime.utcnow(),
-            activated=True
+    async with _slot(limits, "db"):
+        await db.execute(
+            update(models.Fundraiser)
+            .where(models.Fundraiser.id == fundraiser_id)
+            .values(
+                trust_score=trust_score,
+                trust_score_report={
+                    "score": trust_score,
+                    "flags": trust_report.flags,
+                    "signals": trust_report.signals,
+                    "missing": trust_report.missing,
+                },
+                last_score_update=datetime.utcnow(),
+                activated=True
+            )
         )
-    )
-    await db.commit()
+        await trust_matrix.save_signal_row(db, fundraiser_id, trust_report.features)
+        await refresh_static_rank(db, [fundraiser_id])
+        await db.commit()
+        await invalidate_search_cache(db, [fundraiser_id])
     
     logger.info(f"Trust score updated: {trust_score:.2f}/100")
     return trust_score
@@ -340,6 +334,9 @@ async def recompute_fundraiser_amount_raised(db: AsyncSession, fundraiser_id: st
     )
     
     update_result = await db.execute(update_stmt)
+    amount_raised = update_result.scalar_one()
+    await refresh_static_rank(db, [fundraiser_id])
     await db.commit()
+    await invalidate_search_cache(db, [fundraiser_id])
     
-    return update_result.scalar_one()
\ No newline at end of file
+    return amount_raised
\ No newline at end of file
@@ -0,0 +1,198 @@
+# src/scoring_jobs.py
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, score_util
+from .config import settings
+from .database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+# A job locked longer than this belongs to a worker that died; anyone may take it
+LEASE = timedelta(minutes=10)
+POLL_INTERVAL = 2.0  # seconds
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+
+Job = models.ScoringJob
+
+
+def _upsert(db: AsyncSession):
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+async def enqueue(db: AsyncSession, fundraiser_id: str, delay: Optional[float] = None):
+    """
+    Ask for a trust-score recompute. Requests for a fundraiser that already
+    has a pending job fold into it; one that arrives while the job runs
+    schedules exactly one more run. Commits.
+    """
+    now = datetime.utcnow()
+    run_after = now + timedelta(seconds=settings.SCORING_COALESCE_SECONDS if delay is None else delay)
+    insert = _upsert(db)
+    stmt = insert(Job).values(
+        fundraiser_id=fundraiser_id, run_after=run_after, requested_at=now, rerun=False, attempts=0
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Job.fundraiser_id],
+        set_={
+            "requested_at": now,
+            "attempts": 0,
+            "rerun": case((Job.locked_at.isnot(None), True), else_=Job.rerun),
+            # Never push a pending job later; pull a backed-off one forward
+            "run_after": case((Job.run_after > run_after, run_after), else_=Job.run_after),
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+class ScoringWorker:
+    """
+    Polls scoring_jobs and runs due jobs, up to `concurrency` at once, each
+    in its own session. Claims are a conditional UPDATE, so several app
+    processes can share one queue; failures back off exponentially and
+    stop after MAX_ATTEMPTS until the fundraiser is enqueued again.
+    """
+
+    def __init__(self, concurrency: int = 2):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._running: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+        # Hand unfinished jobs back now rather than after LEASE; a failed release still expires
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Job).where(Job.locked_by == self.worker_id).values(locked_by=None, locked_at=None)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Releasing scoring jobs failed: {type(e).__name__}: {e}")
+
+    async def _loop(self):
+        while True:
+            try:
+                free = self.concurrency - len(self._running)
+                if free > 0:
+                    for fundraiser_id in await self.claim(free):
+                        task = asyncio.create_task(self.run(fundraiser_id))
+                        self._running.add(task)
+                        task.add_done_callback(self._running.discard)
+            except Exception as e:
+                logger.error(f"Scoring queue poll failed: {type(e).__name__}: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def claim(self, n: int) -> List[str]:
+        now = datetime.utcnow()
+        claimable = (Job.locked_at.is_(None)) | (Job.locked_at < now - LEASE)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Job.fundraiser_id)
+                .where(Job.run_after <= now, Job.attempts < MAX_ATTEMPTS, claimable)
+                .order_by(Job.run_after)
+                .limit(n)
+            )
+            claimed = []
+            for fundraiser_id in result.scalars().all():
+                taken = await db.execute(
+                    update(Job)
+                    .where(Job.fundraiser_id == fundraiser_id, claimable)
+                    .values(locked_by=self.worker_id, locked_at=now)
+                )
+                if taken.rowcount == 1:
+                    claimed.append(fundraiser_id)
+            await db.commit()
+        return claimed
+
+    async def run(self, fundraiser_id: str):
+        mine = (Job.fundraiser_id == fundraiser_id) & (Job.locked_by == self.worker_id)
+        try:
+            async with AsyncSessionLocal() as db:
+                await score_util.update_trust_score(db, fundraiser_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scoring job {fundraiser_id} failed: {type(e).__name__}: {e}")
+            self.failed += 1
+            async with AsyncSessionLocal() as db:
+                job = await db.scalar(select(Job).where(mine))
+                if job is not None:
+                    backoff = min(BACKOFF_BASE * (2 ** job.attempts), BACKOFF_MAX)
+                    await db.execute(
+                        update(Job).where(mine).values(
+                            attempts=Job.attempts + 1,
+                            last_error=f"{type(e).__name__}: {e}"[:1000],
+                            # The retry covers any request that came in while this run failed
+                            rerun=False,
+                            locked_by=None,
+                            locked_at=None,
+                            run_after=datetime.utcnow() + backoff,
+                        )
+                    )
+                    await db.commit()
+            return
+
+        self.completed += 1
+        async with AsyncSessionLocal() as db:
+            done = await db.execute(delete(Job).where(mine, Job.rerun.is_(False)))
+            if done.rowcount == 0:
+                # Re-requested while running; the data may have changed under us
+                await db.execute(
+                    update(Job).where(mine).values(
+                        rerun=False,
+                        locked_by=None,
+                        locked_at=None,
+                        run_after=datetime.utcnow() + timedelta(seconds=settings.SCORING_COALESCE_SECONDS),
+                    )
+                )
+            await db.commit()
+
+    async def stats(self) -> dict:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(
+                    func.count(),
+                    func.count(Job.locked_at),
+                    func.sum(case((Job.attempts >= MAX_ATTEMPTS, 1), else_=0)),
+                ).select_from(Job)
+            )
+            total, locked, dead = result.one()
+        return {
+            "queued": total - locked - (dead or 0),
+            "running_anywhere": locked,
+            "running_here": len(self._running),
+            "dead": dead or 0,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+scoring_worker = ScoringWorker(settings.SCORING_WORKERS)
@@ -1,23 +1,50 @@
 # src/search_engine.py
 import json
-from typing import List, Optional, Set
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import (
-    select, func, case, or_, desc, literal_column, and_
+    select, update, func, case, or_, desc, literal_column, and_, literal, union_all
 )
 
 from . import models, schemas
+from .config import settings
+from .database import engine
+from .search_backends import get_search_backend
+from .pagination import encode_cursor, decode_cursor
+from .search_cache import SearchCache
+from .trigram_index import TrigramIndex
+from .vector_index import MIN_SIMILARITY, VectorIndex
+from .rerank import CandidateReranker
+from .gazetteer import gazetteer
+from .search_filters import compile_filters, SELECTIVE_ENOUGH
 
 
 DEFAULT_LIMIT = 20
 DEFAULT_OFFSET = 0
+# Max fundraisers pulled from the text / vector indexes per query
+TEXT_CANDIDATE_LIMIT = 500
+SEMANTIC_CANDIDATE_LIMIT = 100
+RECENCY_WINDOW_DAYS = 60
+# Stage-one candidate pool per requested row when the re-ranker can reorder results
+RERANK_POOL_FACTOR = 5
+# Values returned per facet, and trust-score buckets (lower bound, label), highest first
+FACET_LIMIT = 20
+TRUST_BUCKETS = [(80, "80-100"), (60, "60-80"), (40, "40-60"), (20, "20-40"), (0, "0-20")]
+# What a search result carries (FundraiserScoreResponse), read for the final page only
+RESULT_COLUMNS = models.columns_for(models.Fundraiser, schemas.FundraiserScoreResponse)
+# Slack for float round-off when re-applying a score cursor in SQL
+SCORE_EPSILON = 1e-6
 
 WEIGHTS = {           
     "text_match_title": 50,
     "text_match_desc": 20,
     "text_match_tags": 15,
+    "text_match_long_desc": 10,
+    "semantic_match": 60,
     "location_match": 60,
     "recency_bonus": 25,
     "progress_bonus": 20,
@@ -28,17 +55,30 @@ WEIGHTS = {
     "trust_weight": 1.5
 }
 
+# Per-column weights handed to the text backend (BM25F boosts / bm25() / ts_rank)
+FIELD_WEIGHTS = {
+    "title": WEIGHTS["text_match_title"],
+    "short_description": WEIGHTS["text_match_desc"],
+    "long_description": WEIGHTS["text_match_long_desc"],
+    "tags": WEIGHTS["text_match_tags"],
+}
+
+search_backend = get_search_backend(engine, FIELD_WEIGHTS, settings.SEARCH_BACKEND)
+fuzzy_index = TrigramIndex()
+vector_index = VectorIndex(settings.VECTOR_INDEX_DIR)
+search_cache = SearchCache(settings.SEARCH_CACHE_MAX_ENTRIES, settings.SEARCH_CACHE_TTL_SECONDS)
+
 
 def normalize_tags_field(tags_field) -> Set[str]:
     """Normalize tags to lowercase set"""
     if not tags_field: return set()
     if isinstance(tags_field, (list, tuple)): 
-        return set(t.lower() for t in tags_field)
+        return set(str(t).strip().lower() for t in tags_field if str(t).strip())
     if isinstance(tags_field, str):
         try:
             parsed = json.loads(tags_field)
             if isinstance(parsed, list): 
-                return set(t.lower() for t in parsed)
+                return normalize_tags_field(parsed)
         except:
             return set(t.strip().lower() for t in tags_field.split(",") if t.strip())
     return set()
@@ -51,163 +91,464 @@ async def search_and_rank_fundraisers(
     limit: int = DEFAULT_LIMIT,
     offset: int = DEFAULT_OFFSET,
 ) -> List[schemas.FundraiserScoreResponse]:
+    results, _ = await search_fundraisers_page(db, search_params, interests, limit, offset=offset)
+    return results
 
-    # 1. PARSE QUERY INTO KEYWORDS
-    text_query = (search_params.text_query or "").strip()
-    keywords = []
-    if text_query:
-        keywords = [k.lower() for k in text_query.split() if k.strip() and len(k) > 2]
 
-    # 2. DEFINING THE BASE SCORE (The Trust Score)
-    base_score_expr = func.coalesce(models.Fundraiser.trust_score, 0.0) * WEIGHTS["trust_weight"]
+async def search_fundraisers_page(
+    db: AsyncSession,
+    search_params: schemas.FundraiserSearchRequest,
+    interests: List[str] = [],
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+    offset: int = DEFAULT_OFFSET,
+) -> Tuple[List[schemas.FundraiserScoreResponse], Optional[str]]:
+    """
+    Ranked search page plus an opaque cursor for the next one (None on the last page).
+    Pages are keyset-paginated on (sort score, id), so page N costs the same as page 1.
+    Served from search_cache when an equivalent request is still valid.
+    """
+    key = SearchCache.make_key(search_params, interests, limit, offset, cursor)
+    cached = search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    results, next_page = await _search_fundraisers_page(db, search_params, interests, limit, cursor, offset)
+    keyword_count = len(_keywords(search_params.text_query))
+    search_cache.put(
+        key, results, next_page, limit,
+        headroom=_score_headroom(search_params, interests, keyword_count),
+        keyword_query=keyword_count > 0,
+        offset=offset
+    )
+    return results, next_page
 
-    # 3. RELEVANCE SCORE (Multi-Keyword)
+
+async def search_fundraisers_faceted(
+    db: AsyncSession,
+    search_params: schemas.FundraiserSearchRequest,
+    interests: List[str] = [],
+    limit: int = DEFAULT_LIMIT,
+    cursor: Optional[str] = None,
+) -> Tuple[List[schemas.FundraiserScoreResponse], Optional[str], Optional[dict]]:
+    """
+    search_fundraisers_page plus facet counts over everything that matches.
+    Facets do not change from page to page, so they come with the first page only.
+    """
+    results, next_page = await search_fundraisers_page(db, search_params, interests, limit, cursor)
+    facets = await search_facets(db, search_params) if cursor is None else None
+    return results, next_page, facets
+
+
+async def search_facets(db: AsyncSession, search_params: schemas.FundraiserSearchRequest, facet_limit: int = FACET_LIMIT) -> dict:
+    """
+    Matching fundraisers per continent, country, tag and trust bucket, in one
+    statement: the filtered rows are a CTE (materialized once since it is
+    referenced several times) and every facet is a GROUP BY over it.
+    """
+    facets = {"total": 0, "continent": [], "country": [], "tag": [], "trust": []}
+    plan = await _compile_search(db, search_params)
+    if plan is None:
+        return facets
+
+    matched = (
+        select(
+            models.Fundraiser.id,
+            models.Fundraiser.continent,
+            models.Fundraiser.country,
+            models.Fundraiser.trust_score,
+        )
+        .where(*plan.filters)
+        .cte("matched")
+    )
+    # Inlined constants: Postgres only matches the SELECT and GROUP BY copies
+    # of this expression if they contain no bind parameters
+    bucket = case(
+        *[(matched.c.trust_score >= literal_column(str(low)), literal_column(f"'{label}'"))
+          for low, label in TRUST_BUCKETS[:-1]],
+        else_=literal_column(f"'{TRUST_BUCKETS[-1][1]}'")
+    )
+    tags = models.FundraiserTag
+    stmt = union_all(
+        select(literal("continent").label("facet"), matched.c.continent.label("value"), func.count().label("n"))
+        .group_by(matched.c.continent),
+        select(literal("country"), matched.c.country, func.count())
+        .group_by(matched.c.country),
+        select(literal("trust"), bucket, func.count())
+        .group_by(bucket),
+        select(literal("tag"), tags.tag, func.count())
+        .select_from(matched.join(tags, tags.fundraiser_id == matched.c.id))
+        .group_by(tags.tag),
+    )
+    result = await db.execute(stmt)
+
+    for facet, value, count in result.all():
+        if facet == "trust":
+            facets["total"] += count
+        if value is not None:
+            facets[facet].append({"value": value, "count": count})
+    order = {label: i for i, (_, label) in enumerate(TRUST_BUCKETS)}
+    facets["trust"].sort(key=lambda f: order[f["value"]])
+    for facet in ("continent", "country", "tag"):
+        facets[facet] = sorted(facets[facet], key=lambda f: (-f["count"], f["value"]))[:facet_limit]
+    return facets
+
+
+@dataclass
+class SearchPlan:
+    """A search request compiled to SQL: the row filters and the db-side score"""
+    filters: list
+    total_score: Any
+    # ORDER BY column; total_score == sort_expr + sort_offset for every matching row
+    sort_expr: Any
+    sort_offset: float
+    keyword_query: bool
+
+
+async def _compile_search(db: AsyncSession, search_params: schemas.FundraiserSearchRequest) -> Optional[SearchPlan]:
+    """None when the text backend found nothing, i.e. the result is empty"""
+
+    # 1. PARSE QUERY INTO KEYWORDS
+    text_query = (search_params.text_query or "").strip()
+    keywords = _keywords(text_query)
+    keyword_count = len(keywords)
+
+    # 1b. TYPO TOLERANCE: unknown words also search for their closest indexed words.
+    #     Corrections are extra OR terms; keyword_count stays what the user typed.
+    corrections = fuzzy_index.correct_keywords(keywords) if keywords else {}
+    alternatives = [[k, *corrections.get(k, [])] for k in keywords]
+    if corrections:
+        text_query = " ".join([text_query, *(c for extra in corrections.values() for c in extra)])
+    # 1c. LOCATION: countries, demonyms and continents resolve through the gazetteer;
+    #     anything else (cities, typos) goes through the typo index and substring match
+    location = search_params.location
+    places = gazetteer.expand(location)
+    if places is None and location:
+        location = fuzzy_index.correct_location(location)
+        places = gazetteer.expand(location)
+
+    # 2. BASE SCORE: trust + recency + progress, materialized by refresh_static_rank()
+    static_rank_expr = func.coalesce(models.Fundraiser.static_rank, 0.0)
+
+    # 3. RELEVANCE SCORE: lexical (text backend, LIKE fallback if it is unavailable)
+    #    blended with semantic similarity from the vector index
     relevance_expr = literal_column("0")
+    text_hits = None
+    semantic_hits = {}
     if keywords:
-        keyword_scores = []
-        for k in keywords:
-            k_pat = f"%{k}%"
-            # Add up matches in Title (High value) vs Desc (Low value)
-            k_score = (
-                case((models.Fundraiser.title.ilike(k_pat), WEIGHTS["text_match_title"]), else_=0) + 
-                case((models.Fundraiser.short_description.ilike(k_pat), WEIGHTS["text_match_desc"]), else_=0) +
-                case((models.Fundraiser.tags.ilike(k_pat), WEIGHTS["text_match_tags"]), else_=0)
-            )
-            keyword_scores.append(k_score)
-        
-        relevance_expr = sum(keyword_scores, literal_column("0"))
-
-    # 4. LOCATION & RECENCY
+        text_hits = await search_backend.candidates(db, text_query, TEXT_CANDIDATE_LIMIT)
+        semantic_hits = vector_index.search(text_query, SEMANTIC_CANDIDATE_LIMIT)
+    if text_hits is not None:
+        relevance = _scale_relevance(text_hits, keyword_count) if text_hits else {}
+        for fid, points in _scale_semantic(semantic_hits).items():
+            relevance[fid] = relevance.get(fid, 0) + points
+        if not relevance:
+            return None
+        relevance_expr = case(relevance, value=models.Fundraiser.id, else_=0)
+    elif keywords:
+        relevance_expr = _like_relevance_expr(alternatives)
+        if semantic_hits:
+            relevance_expr = relevance_expr + case(_scale_semantic(semantic_hits), value=models.Fundraiser.id, else_=0)
+
+    # 4. LOCATION
     location_expr = literal_column("0")
-    if getattr(search_params, "location", None):
-        loc_q = f"%{search_params.location.strip().lower()}%"
-        location_expr = case((or_(
-            models.Fundraiser.country.ilike(loc_q),
-            models.Fundraiser.city.ilike(loc_q)
-        ), WEIGHTS["location_match"]), else_=0)
-
-    recent_cutoff = datetime.utcnow() - timedelta(days=60)
+    if location:
+        location_expr = case((_location_filter(location, places), WEIGHTS["location_match"]), else_=0)
+
+    # 5. TOTAL DB SCORE CALCULATION
+    total_score_expr = static_rank_expr + relevance_expr + location_expr
+
+    filters = [models.Fundraiser.status == "active"]
+
+    # A. Text Search
+    if text_hits is not None:
+        filters.append(models.Fundraiser.id.in_(list(relevance)))
+    elif keywords:
+        text_filter = _like_filter(alternatives)
+        if semantic_hits:
+            text_filter = or_(text_filter, models.Fundraiser.id.in_(list(semantic_hits)))
+        filters.append(text_filter)
+
+    # A2. Structured filters (trust, progress, goal, creation window, continent)
+    structured = compile_filters(search_params)
+    filters.extend(f.predicate for f in structured)
+
+    # B. Tag Filter: any of the requested tags, resolved through the fundraiser_tags index
+    search_tags = normalize_tags_field(search_params.tags)
+    if search_tags:
+        filters.append(models.Fundraiser.id.in_(_tagged(*search_tags)))
+
+    # C. Location Filter
+    if location:
+        filters.append(_location_filter(location, places))
+
+    # Order by total_score desc. Without keywords every matching row gets the same
+    # location bonus, so the order is plain static_rank and the
+    # (status, static_rank DESC, id) index can serve it without sorting.
+    # When a structured filter keeps only a small slice of the table, range-scanning
+    # its index and sorting that slice is cheaper; "+ 0" keeps the planner off the
+    # static_rank index so it takes the filter's index instead.
+    sort_expr = total_score_expr if keywords else models.Fundraiser.static_rank
+    if not keywords and structured and min(f.selectivity for f in structured) < SELECTIVE_ENOUGH:
+        sort_expr = models.Fundraiser.static_rank + 0
+    return SearchPlan(
+        filters=filters,
+        total_score=total_score_expr,
+        sort_expr=sort_expr,
+        sort_offset=WEIGHTS["location_match"] if (location and not keywords) else 0,
+        keyword_query=bool(keywords),
+    )
+
+
+async def _search_fundraisers_page(
+    db: AsyncSession,
+    search_params: schemas.FundraiserSearchRequest,
+    interests: List[str],
+    limit: int,
+    cursor: Optional[str],
+    offset: int,
+) -> Tuple[List[schemas.FundraiserScoreResponse], Optional[str]]:
+
+    plan = await _compile_search(db, search_params)
+    if plan is None:
+        return [], None
+    sort_expr, sort_offset = plan.sort_expr, plan.sort_offset
+
+    # 6. TWO-STAGE RANKING
+    #    Stage one pulls candidates from SQL in db-score order; stage two adds
+    #    interest/tag bonuses for the whole batch at once (rerank.py). A bonus
+    #    is at most `max_bonus`, so once the best unseen db score plus that cap
+    #    cannot beat the current page, no further candidate can reach it.
+    #    Candidates carry only what ranking needs; the page's columns are read afterwards.
+    reranker = CandidateReranker(WEIGHTS, interests, search_params.tags)
+    max_bonus = reranker.max_bonus
+    columns = [models.Fundraiser.id, models.Fundraiser.static_rank, plan.total_score.label("total_score")]
+    if max_bonus:
+        columns.extend(reranker.columns())
+    stmt = select(*columns).where(*plan.filters)
+    after = decode_cursor(cursor, 2) if cursor else None
+    if after is not None:
+        # final >= db score, so anything scoring above the cursor in SQL was on an earlier page
+        stmt = stmt.where(sort_expr <= after[0] - sort_offset + SCORE_EPSILON)
+    stmt = stmt.order_by(sort_expr.desc(), models.Fundraiser.id.desc())
+
+    wanted = offset + limit
+    pool = wanted * RERANK_POOL_FACTOR if max_bonus else wanted
+    ranked: List[Tuple[float, str]] = []
+    last_seen = None
+    while True:
+        chunk = stmt
+        if last_seen is not None:
+            chunk = chunk.where(or_(
+                sort_expr < last_seen[0],
+                and_(sort_expr == last_seen[0], models.Fundraiser.id < last_seen[1])
+            ))
+        rows = (await db.execute(chunk.limit(pool))).all()
+        if not rows:
+            break
+
+        db_totals = np.fromiter((float(r.total_score or 0) for r in rows), dtype=np.float64, count=len(rows))
+        if max_bonus:
+            db_totals = db_totals + reranker.bonuses(rows)
+        for row, final in zip(rows, db_totals.tolist()):
+            if after is not None and not (final < after[0] or (final == after[0] and row.id < after[1])):
+                continue
+            ranked.append((final, row.id))
+        ranked.sort(reverse=True)
+        del ranked[wanted:]
+
+        last = rows[-1]
+        last_seen = (float(last.total_score) if plan.keyword_query else last.static_rank, last.id)
+        if len(rows) < pool:
+            break
+        if len(ranked) >= wanted and float(last.total_score or 0) + max_bonus < ranked[-1][0]:
+            break
+
+    page = ranked[offset:]
+    next_page = None
+    if page and len(page) == limit:
+        next_page = encode_cursor(page[-1][0], page[-1][1])
+
+    # Only the rows that made the page are read in full, straight into response dicts
+    final_results = []
+    if page:
+        result = await db.execute(
+            select(*RESULT_COLUMNS).where(models.Fundraiser.id.in_([fid for _, fid in page]))
+        )
+        found = {row.id: row._mapping for row in result.all()}
+        for final_score, fid in page:
+            row = found.get(fid)
+            if row is None:
+                continue  # deleted since stage one
+            fs = dict(row)
+            fs["activated"] = bool(fs["activated"])
+            fs["match_score"] = final_score
+            final_results.append(fs)
+
+    return final_results, next_page
+
+
+def _keywords(text_query: Optional[str]) -> List[str]:
+    if not text_query:
+        return []
+    return [k.lower() for k in text_query.strip().split() if k.strip() and len(k) > 2]
+
+
+def _score_headroom(search_params: schemas.FundraiserSearchRequest, interests: List[str], keyword_count: int) -> float:
+    """Upper bound on what this query can add to a fundraiser's static_rank"""
+    headroom = keyword_count * (
+        WEIGHTS["text_match_title"] + WEIGHTS["text_match_desc"] + WEIGHTS["text_match_tags"]
+    )
+    if keyword_count:
+        headroom += WEIGHTS["semantic_match"]
+    if search_params.location:
+        headroom += WEIGHTS["location_match"]
+    if interests:
+        headroom += WEIGHTS["interest_overlap"] + len(interests) * WEIGHTS["per_tag_match"]
+    headroom += len(search_params.tags or []) * WEIGHTS["tag_point"]
+    return headroom
+
+
+async def invalidate_search_cache(db: AsyncSession, fundraiser_ids: List[str], text_changed: bool = False):
+    """Call after committing a write that touches these fundraisers"""
+    if not fundraiser_ids:
+        return
+    result = await db.execute(
+        select(models.Fundraiser.id, models.Fundraiser.static_rank, models.Fundraiser.status)
+        .where(models.Fundraiser.id.in_(fundraiser_ids))
+    )
+    found = {row.id: row for row in result.all()}
+    for fid in fundraiser_ids:
+        row = found.get(fid)
+        search_cache.invalidate(
+            fid,
+            row.static_rank if row else None,
+            active=bool(row and row.status == "active"),
+            text_changed=text_changed
+        )
+
+
+def static_rank_expr(now: Optional[datetime] = None):
+    """
+    Query-independent part of the search score: trust, recency and progress.
+    Recency depends on the clock, so rows crossing the 60-day boundary are
+    picked up by the periodic sweep (see main.static_rank_sweeper).
+    """
+    now = now or datetime.utcnow()
+    base_score_expr = func.coalesce(models.Fundraiser.trust_score, 0.0) * WEIGHTS["trust_weight"]
+
+    recent_cutoff = now - timedelta(days=RECENCY_WINDOW_DAYS)
     recency_expr = case(
         (models.Fundraiser.created_at >= recent_cutoff, WEIGHTS["recency_bonus"]), 
         else_=0
     )
 
-    # 5. PROGRESS (Show active projects)
+    # Show active projects
     progress_ratio = models.Fundraiser.amount_raised / func.nullif(models.Fundraiser.goal_amount, 0)
     progress_expr = case(
         ((models.Fundraiser.amount_raised > 0) & (progress_ratio > 0.0) & (progress_ratio < 1.0), 
          WEIGHTS["progress_bonus"]), 
         else_=0
     )
-
-    # 6. TOTAL DB SCORE CALCULATION
-    total_score_expr = base_score_expr + relevance_expr + location_expr + recency_expr + progress_expr
+    return base_score_expr + recency_expr + progress_expr
 
 
-    stmt = (
-        select(
-            models.Fundraiser, 
-            base_score_expr.label("trust_val"), 
-            total_score_expr.label("total_score")
-        )
-        .where(models.Fundraiser.status == "active")
+def progress_expr():
+    """Share of the goal raised; 0 without a goal"""
+    return func.coalesce(
+        models.Fundraiser.amount_raised / func.nullif(models.Fundraiser.goal_amount, 0), 0.0
     )
 
 
-    # A. Text Search
-    if keywords:
-        or_conditions = []
-        for k in keywords:
-            k_pat = f"%{k}%"
-            or_conditions.append(or_(
-                models.Fundraiser.title.ilike(k_pat),
-                models.Fundraiser.short_description.ilike(k_pat),
-                models.Fundraiser.tags.ilike(k_pat)
-            ))
-        if or_conditions:
-            stmt = stmt.where(or_(*or_conditions))
-
-    # B. Location Filter
-    if getattr(search_params, "location", None):
-        loc_q = f"%{search_params.location.strip().lower()}%"
-        stmt = stmt.where(or_(
-            models.Fundraiser.country.ilike(loc_q),
-            models.Fundraiser.city.ilike(loc_q)
-        ))
+async def refresh_static_rank(
+    db: AsyncSession,
+    fundraiser_ids: Optional[List[str]] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> int:
+    """
+    Recompute static_rank (and progress) in the database for the given fundraisers (or a
+    created_at window, or everything). Does not commit.
+    """
+    stmt = update(models.Fundraiser).values(static_rank=static_rank_expr(), progress=progress_expr())
+    if fundraiser_ids is not None:
+        stmt = stmt.where(models.Fundraiser.id.in_(fundraiser_ids))
+    if created_after is not None:
+        stmt = stmt.where(models.Fundraiser.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(models.Fundraiser.created_at < created_before)
+    result = await db.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount
+
+
+def _scale_relevance(text_hits: Dict[str, float], keyword_count: int) -> Dict[str, float]:
+    """
+    Map raw backend scores (BM25, bm25(), ts_rank) onto the point scale the other WEIGHTS use:
+    the best hit gets the full title+desc+tags value for every keyword.
+    """
+    top = max(text_hits.values()) or 1.0
+    ceiling = keyword_count * (
+        WEIGHTS["text_match_title"] + WEIGHTS["text_match_desc"] + WEIGHTS["text_match_tags"]
+    )
+    return {fid: round(score / top * ceiling, 4) for fid, score in text_hits.items()}
+
+
+def _scale_semantic(semantic_hits: Dict[str, float]) -> Dict[str, float]:
+    """Cosine similarity -> points, from 0 at vector_index.MIN_SIMILARITY to the full weight at 1"""
+    span = 1.0 - MIN_SIMILARITY
+    return {
+        fid: round(max(sim - MIN_SIMILARITY, 0.0) / span * WEIGHTS["semantic_match"], 4)
+        for fid, sim in semantic_hits.items()
+    }
+
+
+def _like_relevance_expr(alternatives: List[List[str]]):
+    """
+    Substring scoring used only when the text backend is unavailable.
+    One group per typed keyword (the word plus its typo corrections);
+    a group scores once however many of its spellings match.
+    """
+    keyword_scores = []
+    for group in alternatives:
+        def any_match(column):
+            return or_(*(column.ilike(f"%{k}%") for k in group))
+
+        # Add up matches in Title (High value) vs Desc (Low value)
+        keyword_scores.append(
+            case((any_match(models.Fundraiser.title), WEIGHTS["text_match_title"]), else_=0) +
+            case((any_match(models.Fundraiser.short_description), WEIGHTS["text_match_desc"]), else_=0) +
+            case((models.Fundraiser.id.in_(_tagged(*group)), WEIGHTS["text_match_tags"]), else_=0)
+        )
+    return sum(keyword_scores, literal_column("0"))
 
-    # Order by total_score desc
-    stmt = stmt.order_by(desc("total_score")).limit(limit).offset(offset)
 
-    result = await db.execute(stmt)
-    rows = result.all()
+def _like_filter(alternatives: List[List[str]]):
+    return or_(*[
+        or_(
+            models.Fundraiser.title.ilike(f"%{k}%"),
+            models.Fundraiser.short_description.ilike(f"%{k}%"),
+            models.Fundraiser.id.in_(_tagged(k))
+        )
+        for group in alternatives
+        for k in group
+    ])
+
+
+def _location_filter(location: str, places: Optional[Tuple[List[str], List[str]]]):
+    """Indexed IN (...) over country/continent when the gazetteer knows the place, else substring match"""
+    if places:
+        countries, continents = places
+        clauses = [models.Fundraiser.country.in_(countries)]
+        if continents:
+            clauses.append(models.Fundraiser.continent.in_(continents))
+        return or_(*clauses)
+    loc_q = f"%{location.strip().lower()}%"
+    return or_(
+        models.Fundraiser.country.ilike(loc_q),
+        models.Fundraiser.city.ilike(loc_q)
+    )
 
-    final_results = []
-    
-    for row in rows:
-        fundraiser: models.Fundraiser = row[0]
-        trust_val = float(row[1] or 0) 
-        db_total = float(row[2] or 0)
-
-        # 1. Personalization (Interests)
-        affinity = 0.0
-        if interests:
-            affinity = _calculate_affinity_score(fundraiser, interests)
-
-        # 2. Explicit Tag Filter Scoring
-        tag_match = _calculate_tag_match(fundraiser, getattr(search_params, "tags", None))
-
-        final_score = db_total + affinity + tag_match
-
-        # 3. Format Response
-        fs = {
-            # Copy all fundraiser fields
-            c.name: getattr(fundraiser, c.name) for c in fundraiser.__table__.columns
-        }
-        
-        # Add computed fields for the frontend
-        fs.update({
-            "match_score": final_score, 
-            "trust_score": getattr(fundraiser, "trust_score", 0.0) 
-        })
-        
-        try:
-            final_results.append(schemas.FundraiserScoreResponse(**fs).model_dump())
-        except Exception as e:
-            print(f"Skipping row due to schema error: {e}")
-
-    final_results.sort(key=lambda x: x.get("match_score"), reverse=True)
-    return final_results
-
-
-def _calculate_affinity_score(fundraiser: models.Fundraiser, interests: List[str]) -> float:
-    """Calculate personalization score based on user interests"""
-    if not interests:
-        return 0.0
-
-    score = 0.0
-    user_interests = set(i.lower() for i in interests)
-
-    # Get fundraiser tags
-    f_tags = normalize_tags_field(getattr(fundraiser, "tags", None))
-    
-    # Calculate intersection
-    matching_tags = user_interests.intersection(f_tags)
-    
-    if matching_tags:
-        score += WEIGHTS.get("interest_overlap", 0)
-    
-    # Add points per matched tag
-    score += len(matching_tags) * WEIGHTS.get("per_tag_match", 5.0)
-    
-    return score
-
-def _calculate_tag_match(fundraiser: models.Fundraiser, search_tags: Optional[List[str]]) -> float:
-    """Calculate explicit tag match score"""
-    if not search_tags:
-        return 0.0
-    
-    f_tags = normalize_tags_field(getattr(fundraiser, "tags", None))
-    s_tags = set(t.lower() for t in search_tags)
-    
-    return len(f_tags.intersection(s_tags)) * WEIGHTS["tag_point"]
 
+def _tagged(*tags: str):
+    """Subquery of fundraiser ids carrying any of `tags` (exact, lowercase)"""
+    return select(models.FundraiserTag.fundraiser_id).where(models.FundraiserTag.tag.in_(tags))
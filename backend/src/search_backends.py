@@ -0,0 +1,220 @@
+# src/search_backends.py
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from .search_index import FundraiserIndex, TOKEN_RE, tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class SearchBackend(ABC):
+    """
+    Produces the text-match candidate set for search_and_rank_fundraisers.
+    `candidates` returns {fundraiser_id: raw_relevance} (higher is better),
+    or None when the backend is not usable and the caller should fall back.
+    """
+    name = "base"
+
+    def __init__(self, field_weights: Dict[str, float]):
+        self.field_weights = field_weights
+        self.ready = False
+
+    @abstractmethod
+    async def setup(self, engine: AsyncEngine):
+        """Create/load whatever the backend needs. Must be idempotent."""
+
+    @abstractmethod
+    async def candidates(self, db: AsyncSession, text_query: str, limit: int) -> Optional[Dict[str, float]]:
+        """Text matches for text_query, at most `limit` of them"""
+
+    def index(self, fundraiser):
+        """Called after a fundraiser is created or edited. Native backends sync via the DB."""
+        pass
+
+
+class MemoryBM25Backend(SearchBackend):
+    """Per-process inverted index (see search_index.FundraiserIndex)"""
+    name = "memory"
+
+    def __init__(self, field_weights: Dict[str, float]):
+        super().__init__(field_weights)
+        self.fundraiser_index = FundraiserIndex(field_weights)
+
+    async def setup(self, engine: AsyncEngine):
+        async with AsyncSession(engine) as session:
+            await self.fundraiser_index.build(session)
+        self.ready = True
+        logger.info(f"Search index built ({len(self.fundraiser_index)} fundraisers)")
+
+    async def candidates(self, db, text_query, limit):
+        if not self.ready:
+            return None
+        return self.fundraiser_index.search(tokenize(text_query), limit=limit)
+
+    def index(self, fundraiser):
+        if self.ready:
+            self.fundraiser_index.add(fundraiser)
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """External-content FTS5 table over `fundraisers`, kept in sync by triggers"""
+    name = "sqlite_fts5"
+
+    COLUMNS = ("title", "short_description", "long_description", "tags")
+
+    def _ddl(self):
+        cols = ", ".join(self.COLUMNS)
+        new_vals = ", ".join(f"new.{c}" for c in self.COLUMNS)
+        old_vals = ", ".join(f"old.{c}" for c in self.COLUMNS)
+        return [
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS fundraisers_fts USING fts5(
+                {cols}, content='fundraisers', content_rowid='rowid', tokenize='porter unicode61'
+            )""",
+            f"""CREATE TRIGGER IF NOT EXISTS fundraisers_fts_ai AFTER INSERT ON fundraisers BEGIN
+                INSERT INTO fundraisers_fts(rowid, {cols}) VALUES (new.rowid, {new_vals});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS fundraisers_fts_ad AFTER DELETE ON fundraisers BEGIN
+                INSERT INTO fundraisers_fts(fundraisers_fts, rowid, {cols}) VALUES ('delete', old.rowid, {old_vals});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS fundraisers_fts_au AFTER UPDATE OF {cols} ON fundraisers BEGIN
+                INSERT INTO fundraisers_fts(fundraisers_fts, rowid, {cols}) VALUES ('delete', old.rowid, {old_vals});
+                INSERT INTO fundraisers_fts(rowid, {cols}) VALUES (new.rowid, {new_vals});
+            END""",
+        ]
+
+    async def setup(self, engine: AsyncEngine):
+        async with engine.begin() as conn:
+            existed = (await conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fundraisers_fts'"
+            ))).first() is not None
+            for stmt in self._ddl():
+                await conn.execute(text(stmt))
+            if not existed:
+                # Backfill rows written before the triggers existed
+                await conn.execute(text("INSERT INTO fundraisers_fts(fundraisers_fts) VALUES ('rebuild')"))
+        self.ready = True
+
+    async def candidates(self, db, text_query, limit):
+        if not self.ready:
+            return None
+        terms = TOKEN_RE.findall(text_query.lower())
+        if not terms:
+            return {}
+        match = " OR ".join(f'"{t}"' for t in terms)
+        weights = ", ".join(str(float(self.field_weights[c])) for c in self.COLUMNS)
+        result = await db.execute(
+            text(f"""
+                SELECT f.id, bm25(fundraisers_fts, {weights}) AS rank
+                FROM fundraisers_fts
+                JOIN fundraisers f ON f.rowid = fundraisers_fts.rowid
+                WHERE fundraisers_fts MATCH :match
+                ORDER BY rank
+                LIMIT :limit
+            """),
+            {"match": match, "limit": limit}
+        )
+        # bm25() is "lower is better"; flip it so it adds like the other scores
+        return {row[0]: -float(row[1]) for row in result.all()}
+
+
+class PostgresTSVectorBackend(SearchBackend):
+    """Generated, weighted `search_vector` column with a GIN index"""
+    name = "postgres_tsvector"
+
+    # ts_rank only has four weight classes; ordered A..D by default field weight
+    CLASSES = (("title", "A"), ("short_description", "B"), ("tags", "C"), ("long_description", "D"))
+
+    async def setup(self, engine: AsyncEngine):
+        parts = " || ".join(
+            f"setweight(to_tsvector('english', coalesce({col}::text, '')), '{cls}')"
+            for col, cls in self.CLASSES
+        )
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                f"ALTER TABLE fundraisers ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({parts}) STORED"
+            ))
+            await conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_fundraisers_search_vector ON fundraisers USING GIN (search_vector)"
+            ))
+        self.ready = True
+
+    def _rank_weights(self) -> str:
+        # ts_rank expects {D, C, B, A}, each in [0, 1]
+        top = max(self.field_weights.values())
+        by_class = {cls: self.field_weights[col] / top for col, cls in self.CLASSES}
+        return "{" + ",".join(f"{by_class[c]:.4f}" for c in "DCBA") + "}"
+
+    async def candidates(self, db, text_query, limit):
+        if not self.ready:
+            return None
+        terms = TOKEN_RE.findall(text_query.lower())
+        if not terms:
+            return {}
+        result = await db.execute(
+            text("""
+                SELECT id, ts_rank(CAST(:weights AS float4[]), search_vector, q) AS rank
+                FROM fundraisers, to_tsquery('english', :tsquery) AS q
+                WHERE search_vector @@ q
+                ORDER BY rank DESC
+                LIMIT :limit
+            """),
+            {"weights": self._rank_weights(), "tsquery": " | ".join(terms), "limit": limit}
+        )
+        return {row[0]: float(row[1]) for row in result.all()}
+
+
+class FallbackBackend(SearchBackend):
+    """
+    A native backend that hands over to the in-memory index when its setup
+    fails (e.g. SQLite compiled without FTS5, or no rights to alter tables).
+    """
+
+    def __init__(self, primary: SearchBackend, fallback: SearchBackend):
+        super().__init__(primary.field_weights)
+        self.primary = primary
+        self.fallback = fallback
+        self.active = primary
+
+    @property
+    def name(self):
+        return self.active.name
+
+    async def setup(self, engine: AsyncEngine):
+        try:
+            await self.primary.setup(engine)
+            self.active = self.primary
+        except Exception as e:
+            logger.warning(f"{self.primary.name} search setup failed, using the in-memory index: {e}")
+            await self.fallback.setup(engine)
+            self.active = self.fallback
+        self.ready = self.active.ready
+
+    async def candidates(self, db, text_query, limit):
+        return await self.active.candidates(db, text_query, limit)
+
+    def index(self, fundraiser):
+        self.active.index(fundraiser)
+
+
+NATIVE_BACKENDS = {
+    "sqlite": SQLiteFTS5Backend,
+    "postgresql": PostgresTSVectorBackend,
+}
+
+
+def get_search_backend(engine: AsyncEngine, field_weights: Dict[str, float], preference: str = "auto") -> SearchBackend:
+    """
+    Pick a backend for the engine's dialect.
+    preference: "auto" (native if the dialect has one, with the in-memory
+    BM25F index as fallback if native setup fails; memory otherwise) or
+    "memory" (always the in-memory index).
+    """
+    dialect = engine.dialect.name
+    if preference == "auto" and dialect in NATIVE_BACKENDS:
+        return FallbackBackend(NATIVE_BACKENDS[dialect](field_weights), MemoryBM25Backend(field_weights))
+    return MemoryBM25Backend(field_weights)
@@ -0,0 +1,131 @@
+# src/search_cache.py
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional, Set, Tuple
+
+from .search_filters import filter_key
+
+
+@dataclass
+class CacheEntry:
+    results: List[dict]
+    next_cursor: Optional[str]
+    ids: Set[str]
+    # Lowest match_score on the page; -inf when the page was not full
+    floor: float
+    # Most a fundraiser can score on top of its static_rank for this query
+    headroom: float
+    keyword_query: bool
+    offset: int
+    expires_at: float
+    size_bytes: int
+
+
+class SearchCache:
+    """
+    LRU + TTL cache for search pages.
+
+    Writes call `invalidate` with the fundraiser's new static_rank. An entry
+    is dropped only if that fundraiser is on the page, or could now score
+    above the page's floor (static_rank + headroom >= floor). Text edits
+    also drop keyword queries, since BM25 scores are rescaled per query.
+    The TTL bounds staleness from writes made by other worker processes.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(search_params, interests, limit, offset, cursor) -> Tuple:
+        """Normalize the request so equivalent searches share an entry"""
+        text_query = " ".join((search_params.text_query or "").lower().split())
+        location = (search_params.location or "").strip().lower()
+        tags = tuple(sorted({t.strip().lower() for t in (search_params.tags or []) if t.strip()}))
+        interests = tuple(sorted({i.strip().lower() for i in (interests or []) if i.strip()}))
+        return (
+            text_query, location, tags,
+            filter_key(search_params),
+            interests, limit, offset, cursor
+        )
+
+    def get(self, key: Tuple) -> Optional[Tuple[List[dict], Optional[str]]]:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers are free to mutate the rows they get back
+        return [dict(r) for r in entry.results], entry.next_cursor
+
+    def put(
+        self,
+        key: Tuple,
+        results: List[dict],
+        next_cursor: Optional[str],
+        limit: int,
+        headroom: float,
+        keyword_query: bool,
+        offset: int = 0,
+    ):
+        full_page = len(results) >= limit
+        floor = min(r["match_score"] for r in results) if full_page and results else float("-inf")
+        self._entries[key] = CacheEntry(
+            results=[dict(r) for r in results],
+            next_cursor=next_cursor,
+            ids={r["id"] for r in results},
+            floor=floor,
+            headroom=headroom,
+            keyword_query=keyword_query,
+            offset=offset,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            size_bytes=len(json.dumps(results, default=str)),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, fundraiser_id: str, static_rank: Optional[float], active: bool, text_changed: bool = False):
+        """Drop every entry whose page this fundraiser's new state could change"""
+        stale = []
+        for key, entry in self._entries.items():
+            if (
+                fundraiser_id in entry.ids
+                or entry.offset > 0
+                or static_rank is None
+                or (text_changed and entry.keyword_query)
+                or (active and static_rank + entry.headroom >= entry.floor)
+            ):
+                stale.append(key)
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "approx_bytes": sum(e.size_bytes for e in self._entries.values()),
+        }
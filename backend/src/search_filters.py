@@ -0,0 +1,162 @@
+# src/search_filters.py
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .gazetteer import gazetteer
+
+# Below this estimated selectivity the filter's range index beats walking
+# the static_rank index in ORDER BY order and discarding non-matches
+SELECTIVE_ENOUGH = 0.1
+
+
+@dataclass
+class FilterField:
+    """One declarative filter: request field -> column, comparison, and the index that serves it"""
+    column: Any
+    op: str
+    index: str
+
+
+FILTERS: Dict[str, FilterField] = {
+    "min_trust_score": FilterField(models.Fundraiser.trust_score, ">=", "idx_fundraisers_status_trust"),
+    "max_trust_score": FilterField(models.Fundraiser.trust_score, "<=", "idx_fundraisers_status_trust"),
+    "min_progress": FilterField(models.Fundraiser.progress, ">=", "idx_fundraisers_status_progress"),
+    "max_progress": FilterField(models.Fundraiser.progress, "<=", "idx_fundraisers_status_progress"),
+    "min_goal": FilterField(models.Fundraiser.goal_amount, ">=", "idx_fundraisers_status_goal"),
+    "max_goal": FilterField(models.Fundraiser.goal_amount, "<=", "idx_fundraisers_status_goal"),
+    "created_after": FilterField(models.Fundraiser.created_at, ">=", "idx_fundraisers_status_created"),
+    "created_before": FilterField(models.Fundraiser.created_at, "<", "idx_fundraisers_status_created"),
+    "continents": FilterField(models.Fundraiser.continent, "in", "idx_fundraisers_status_continent"),
+}
+
+FILTER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_progress ON fundraisers(status, progress)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_goal ON fundraisers(status, goal_amount)",
+    "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_continent ON fundraisers(status, continent)",
+]
+
+
+@dataclass
+class CompiledFilter:
+    field: str
+    predicate: Any
+    index: str
+    selectivity: float
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class FilterStats:
+    """
+    Sorted column values of active fundraisers, so a range filter's
+    selectivity is one searchsorted away. Rebuilt at startup and by the
+    hourly sweep; estimates only decide whether search hints the planner
+    off the static_rank index (see SELECTIVE_ENOUGH).
+    """
+
+    def __init__(self):
+        self.values: Dict[str, np.ndarray] = {}
+        self.continents: Dict[str, int] = {}
+        self.total = 0
+
+    async def refresh(self, db: AsyncSession):
+        result = await db.execute(
+            select(
+                models.Fundraiser.trust_score,
+                models.Fundraiser.progress,
+                models.Fundraiser.goal_amount,
+                models.Fundraiser.created_at,
+                models.Fundraiser.continent,
+            ).where(models.Fundraiser.status == "active")
+        )
+        rows = result.all()
+        columns = list(zip(*rows)) if rows else [()] * 5
+        self.total = len(rows)
+        for key, values in zip(("trust_score", "progress", "goal_amount"), columns[:3]):
+            self.values[key] = np.sort(np.array([v for v in values if v is not None], dtype=np.float64))
+        self.values["created_at"] = np.sort(np.array(
+            [_timestamp(v) for v in columns[3] if v is not None], dtype=np.float64
+        ))
+        self.continents = {}
+        for continent in columns[4]:
+            if continent:
+                self.continents[continent] = self.continents.get(continent, 0) + 1
+
+    def estimate(self, field: FilterField, value) -> float:
+        """Fraction of active fundraisers the filter keeps (1.0 when unknown)"""
+        if not self.total:
+            return 1.0
+        if field.op == "in":
+            return sum(self.continents.get(v, 0) for v in value) / self.total
+        values = self.values.get(field.column.key)
+        if values is None or not len(values):
+            return 1.0
+        if isinstance(value, datetime):
+            value = _timestamp(value)
+        if field.op == ">=":
+            kept = len(values) - np.searchsorted(values, value, side="left")
+        elif field.op == "<=":
+            kept = np.searchsorted(values, value, side="right")
+        else:
+            kept = np.searchsorted(values, value, side="left")
+        return float(kept) / self.total
+
+
+filter_stats = FilterStats()
+
+
+def _normalize_continents(values: List[str]) -> List[str]:
+    gazetteer._ensure()
+    out = set()
+    for v in values:
+        key = " ".join(v.lower().split())
+        out.update(gazetteer.continents.get(key, [key]))
+    return sorted(out)
+
+
+def compile_filters(search_params) -> List[CompiledFilter]:
+    """
+    Turn the structured filters on a search request into sargable
+    predicates (bare column vs constant, each served by a (status, column)
+    index). Their order does not matter: both SQLite and Postgres choose
+    the index and evaluation order of a WHERE conjunction themselves.
+    """
+    compiled = []
+    for name, field in FILTERS.items():
+        value = getattr(search_params, name, None)
+        if value is None or value == [] or (name == "min_trust_score" and not value):
+            continue
+        if field.op == "in":
+            value = _normalize_continents(value)
+            predicate = field.column.in_(value)
+        elif field.op == ">=":
+            predicate = field.column >= value
+        elif field.op == "<=":
+            predicate = field.column <= value
+        else:
+            predicate = field.column < value
+        compiled.append(CompiledFilter(name, predicate, field.index, filter_stats.estimate(field, value)))
+    return compiled
+
+
+def filter_key(search_params) -> tuple:
+    """The filter part of a search cache key"""
+    key = []
+    for name in FILTERS:
+        value = getattr(search_params, name, None)
+        if isinstance(value, list):
+            value = tuple(sorted(v.strip().lower() for v in value))
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        key.append(value or None)
+    return tuple(key)
@@ -0,0 +1,237 @@
+# src/search_index.py
+import bisect
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+MIN_TOKEN_LENGTH = 3
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Re-derive all impacts once average field lengths drift this far from the
+# values that were used when the postings were written.
+REWEIGHT_DRIFT = 0.2
+
+
+def _stem(token: str) -> str:
+    """Very light plural folding so 'kids' finds 'kid' and 'charities' finds 'charity'"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop short tokens, fold plurals"""
+    if not text:
+        return []
+    return [_stem(t) for t in TOKEN_RE.findall(text.lower()) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def _tags_text(tags) -> str:
+    if not tags:
+        return ""
+    if isinstance(tags, (list, tuple)):
+        return " ".join(str(t) for t in tags)
+    return str(tags)
+
+
+class FundraiserIndex:
+    """
+    In-memory inverted index over fundraiser text with BM25F scoring.
+
+    Postings store a precomputed per-document impact (the BM25F term-frequency
+    component), kept sorted per term, so a top-k query can stop early
+    instead of touching every matching row (see search).
+    The index is per-process: each worker builds its own copy at startup.
+    """
+
+    def __init__(self, field_boosts: Dict[str, float]):
+        # Relative field boosts (BM25F), scaled so the strongest field is 1.0
+        top = max(field_boosts.values())
+        self.boosts = {f: w / top for f, w in field_boosts.items()}
+        self._reset()
+
+    def _reset(self):
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._doc_fields: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._doc_lengths: Dict[str, Dict[str, int]] = {}
+        self._length_totals: Dict[str, int] = {f: 0 for f in self.boosts}
+        self._avg_snapshot: Dict[str, float] = {f: 1.0 for f in self.boosts}
+        self._sorted: Dict[str, List[tuple]] = {}
+
+    def __len__(self):
+        return len(self._doc_fields)
+
+    # ---------- building ----------
+
+    async def build(self, db: AsyncSession):
+        """Load every fundraiser (text columns only) and rebuild the index"""
+        result = await db.execute(
+            select(
+                models.Fundraiser.id,
+                models.Fundraiser.title,
+                models.Fundraiser.short_description,
+                models.Fundraiser.long_description,
+                models.Fundraiser.tags,
+            )
+        )
+        self._reset()
+        for row in result.all():
+            self._store(row.id, self._field_terms(row))
+        self._reweight()
+
+    def add(self, fundraiser):
+        """Insert or replace a single fundraiser (ORM object or row with text columns)"""
+        self.remove(fundraiser.id)
+        self._store(fundraiser.id, self._field_terms(fundraiser))
+        if self._drifted():
+            self._reweight()
+        else:
+            self._write_postings(fundraiser.id)
+
+    def remove(self, fundraiser_id: str):
+        fields = self._doc_fields.pop(fundraiser_id, None)
+        if fields is None:
+            return
+        for f, n in self._doc_lengths.pop(fundraiser_id).items():
+            self._length_totals[f] -= n
+        for term in {t for tfs in fields.values() for t in tfs}:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            impact = postings.pop(fundraiser_id, None)
+            ranked = self._sorted.get(term)
+            if ranked is not None and impact is not None:
+                i = bisect.bisect_left(ranked, (-impact, fundraiser_id))
+                if i < len(ranked) and ranked[i][1] == fundraiser_id:
+                    del ranked[i]
+            if not postings:
+                del self._postings[term]
+                self._sorted.pop(term, None)
+
+    def _field_terms(self, fundraiser) -> Dict[str, Dict[str, int]]:
+        texts = {
+            "title": getattr(fundraiser, "title", None),
+            "short_description": getattr(fundraiser, "short_description", None),
+            "long_description": getattr(fundraiser, "long_description", None),
+            "tags": _tags_text(getattr(fundraiser, "tags", None)),
+        }
+        fields = {}
+        for f, text in texts.items():
+            tfs: Dict[str, int] = defaultdict(int)
+            for t in tokenize(text):
+                tfs[t] += 1
+            fields[f] = dict(tfs)
+        return fields
+
+    def _store(self, doc_id: str, fields: Dict[str, Dict[str, int]]):
+        self._doc_fields[doc_id] = fields
+        lengths = {f: sum(tfs.values()) for f, tfs in fields.items()}
+        self._doc_lengths[doc_id] = lengths
+        for f, n in lengths.items():
+            self._length_totals[f] += n
+
+    def _averages(self) -> Dict[str, float]:
+        n = max(len(self._doc_fields), 1)
+        return {f: max(total / n, 1.0) for f, total in self._length_totals.items()}
+
+    def _drifted(self) -> bool:
+        for f, avg in self._averages().items():
+            if abs(avg - self._avg_snapshot[f]) / self._avg_snapshot[f] > REWEIGHT_DRIFT:
+                return True
+        return False
+
+    def _impact(self, doc_id: str, term: str) -> float:
+        fields = self._doc_fields[doc_id]
+        lengths = self._doc_lengths[doc_id]
+        weighted_tf = 0.0
+        for f, boost in self.boosts.items():
+            tf = fields[f].get(term)
+            if tf:
+                norm = 1 - B + B * lengths[f] / self._avg_snapshot[f]
+                weighted_tf += boost * tf / norm
+        return weighted_tf * (K1 + 1) / (weighted_tf + K1)
+
+    def _write_postings(self, doc_id: str):
+        for term in {t for tfs in self._doc_fields[doc_id].values() for t in tfs}:
+            impact = self._impact(doc_id, term)
+            self._postings[term][doc_id] = impact
+            ranked = self._sorted.get(term)
+            if ranked is not None:
+                bisect.insort(ranked, (-impact, doc_id))
+
+    def _reweight(self):
+        self._avg_snapshot = self._averages()
+        self._postings = defaultdict(dict)
+        self._sorted = {}
+        for doc_id in self._doc_fields:
+            self._write_postings(doc_id)
+
+    # ---------- querying ----------
+
+    def _idf(self, term: str) -> float:
+        n = len(self._doc_fields)
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _top_postings(self, term: str) -> List[tuple]:
+        """Postings of `term` as (-impact, doc_id), best first; kept sorted on writes"""
+        ranked = self._sorted.get(term)
+        if ranked is None:
+            ranked = sorted((-impact, doc_id) for doc_id, impact in self._postings[term].items())
+            self._sorted[term] = ranked
+        return ranked
+
+    def search(self, terms: Iterable[str], limit: int = 500) -> Dict[str, float]:
+        """
+        Return {fundraiser_id: bm25_score} for the best `limit` matches.
+        Threshold algorithm over the impact-ordered postings: walk all term
+        lists in step, score each newly seen document exactly (random access
+        into every term's postings), and stop once the `limit`-th best score
+        beats anything a document not yet seen could still reach.
+        """
+        lists = []
+        for term in dict.fromkeys(terms):
+            if term in self._postings:
+                lists.append((self._idf(term), self._postings[term], self._top_postings(term)))
+        if not lists or limit <= 0:
+            return {}
+
+        best: List[tuple] = []  # min-heap of (score, doc_id), at most `limit`
+        seen: Set[str] = set()
+        depth = 0
+        while True:
+            # Highest score an unseen document could have: every list's impact at this depth
+            threshold = 0.0
+            exhausted = True
+            for idf, _, ranked in lists:
+                if depth >= len(ranked):
+                    continue
+                exhausted = False
+                neg_impact, doc_id = ranked[depth]
+                threshold -= idf * neg_impact
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                score = sum(i * postings.get(doc_id, 0.0) for i, postings, _ in lists)
+                if len(best) < limit:
+                    heapq.heappush(best, (score, doc_id))
+                elif score > best[0][0]:
+                    heapq.heapreplace(best, (score, doc_id))
+            if exhausted or (len(best) >= limit and best[0][0] >= threshold):
+                break
+            depth += 1
+        return {doc_id: score for score, doc_id in best}
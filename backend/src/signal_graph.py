@@ -0,0 +1,93 @@
+# src/signal_graph.py
+import asyncio
+import logging
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Signal:
+    """
+    One node of a signal graph. `compute` gets the results of `deps` by
+    name. `timeout` covers the compute only; waiting for dependencies or
+    for the `slot` (a ScoringLimits attribute) does not count against it.
+    """
+    name: str
+    compute: Callable[[Dict[str, Any]], Awaitable[Any]]
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    slot: Optional[str] = None
+
+
+@dataclass
+class GraphResult:
+    results: Dict[str, Any] = field(default_factory=dict)
+    # name -> why there is no result (timed out, failed, or a dependency missing)
+    missing: Dict[str, str] = field(default_factory=dict)
+
+
+def _check(signals: List[Signal]):
+    by_name = {s.name: s for s in signals}
+    if len(by_name) != len(signals):
+        raise ValueError("Duplicate signal names")
+    state: Dict[str, str] = {}
+
+    def visit(name: str):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Signal dependency cycle through {name}")
+        state[name] = "visiting"
+        for dep in by_name[name].deps:
+            if dep not in by_name:
+                raise ValueError(f"Signal {name} depends on unknown signal {dep}")
+            visit(dep)
+        state[name] = "done"
+
+    for name in by_name:
+        visit(name)
+
+
+async def run_signals(signals: List[Signal], limits=None) -> GraphResult:
+    """
+    Run every signal as soon as its dependencies have finished, independent
+    ones concurrently. A signal that times out or raises is recorded in
+    `missing` and so is everything that depends on it; the rest still run.
+    """
+    _check(signals)
+    out = GraphResult()
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(signal: Signal):
+        await asyncio.gather(*(tasks[dep] for dep in signal.deps))
+        absent = [dep for dep in signal.deps if dep in out.missing]
+        if absent:
+            out.missing[signal.name] = f"needs {', '.join(absent)}"
+            return
+        inputs = {dep: out.results[dep] for dep in signal.deps}
+        slot = getattr(limits, signal.slot) if limits is not None and signal.slot else nullcontext()
+        try:
+            async with slot:
+                out.results[signal.name] = await asyncio.wait_for(signal.compute(inputs), signal.timeout)
+        except asyncio.TimeoutError:
+            out.missing[signal.name] = f"timed out after {signal.timeout:g}s" if signal.timeout else "timed out"
+        except Exception as e:
+            logger.error(f"Signal {signal.name} failed: {type(e).__name__}: {e}")
+            out.missing[signal.name] = f"failed: {type(e).__name__}"
+
+    # Dependencies first, so every task a signal waits on already exists
+    pending = list(signals)
+    while pending:
+        for signal in list(pending):
+            if all(dep in tasks for dep in signal.deps):
+                tasks[signal.name] = asyncio.create_task(run(signal))
+                pending.remove(signal)
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    return out
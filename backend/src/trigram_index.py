@@ -0,0 +1,184 @@
+# src/trigram_index.py
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .search_index import TOKEN_RE, MIN_TOKEN_LENGTH
+
+# Same default as PostgreSQL pg_trgm.similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+
+def trigrams(value: str) -> Set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space"""
+    grams = set()
+    for word in value.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class _Vocabulary:
+    """Distinct values with reference counts and a trigram -> values posting map"""
+
+    def __init__(self):
+        self.refs: Counter = Counter()
+        self.grams: Dict[str, Set[str]] = {}
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+
+    def add(self, value: str):
+        self.refs[value] += 1
+        if self.refs[value] == 1:
+            grams = trigrams(value)
+            self.grams[value] = grams
+            for g in grams:
+                self.postings[g].add(value)
+
+    def discard(self, value: str):
+        if not self.refs.get(value):
+            return
+        self.refs[value] -= 1
+        if self.refs[value] == 0:
+            del self.refs[value]
+            for g in self.grams.pop(value):
+                self.postings[g].discard(value)
+                if not self.postings[g]:
+                    del self.postings[g]
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.refs
+
+    def has_substring(self, value: str) -> bool:
+        """True if some value contains `value`, checked via postings of its inner trigrams"""
+        inner = {w[i:i + 3] for w in value.split() for i in range(len(w) - 2)}
+        if not inner:
+            return True
+        candidates = None
+        for g in inner:
+            found = self.postings.get(g)
+            if not found:
+                return False
+            candidates = set(found) if candidates is None else candidates & found
+            if not candidates:
+                return False
+        return any(value in c for c in candidates)
+
+    def similar(self, value: str, threshold: float, limit: int) -> List[Tuple[str, float]]:
+        """Values whose trigram Jaccard similarity with `value` is at least `threshold`"""
+        query = trigrams(value)
+        if not query:
+            return []
+        shared: Counter = Counter()
+        for g in query:
+            for candidate in self.postings.get(g, ()):
+                shared[candidate] += 1
+        matches = []
+        for candidate, common in shared.items():
+            score = common / (len(query) + len(self.grams[candidate]) - common)
+            if score >= threshold:
+                matches.append((candidate, score))
+        matches.sort(key=lambda m: (-m[1], m[0]))
+        return matches[:limit]
+
+
+class TrigramIndex:
+    """
+    Typo-tolerant lookup over the words people type into the search box.
+    Indexes the distinct vocabulary (not rows): words from titles, display
+    names and tags, and whole city/country/continent values.
+    Per-process, like the in-memory BM25 index.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.words = _Vocabulary()
+        self.locations = _Vocabulary()
+        self._doc_words: Dict[str, Set[str]] = {}
+        self._doc_locations: Dict[str, Set[str]] = {}
+        self.ready = False
+
+    async def build(self, db: AsyncSession):
+        result = await db.execute(
+            select(
+                models.Fundraiser.id,
+                models.Fundraiser.title,
+                models.Fundraiser.display_name,
+                models.Fundraiser.tags,
+                models.Fundraiser.city,
+                models.Fundraiser.country,
+                models.Fundraiser.continent,
+            )
+        )
+        self.words = _Vocabulary()
+        self.locations = _Vocabulary()
+        self._doc_words = {}
+        self._doc_locations = {}
+        for row in result.all():
+            self.add(row)
+        self.ready = True
+
+    def add(self, fundraiser):
+        """Insert or replace a fundraiser's vocabulary"""
+        self.remove(fundraiser.id)
+        tags = getattr(fundraiser, "tags", None) or []
+        if isinstance(tags, str):
+            tags = [tags]
+        text = " ".join([
+            getattr(fundraiser, "title", None) or "",
+            getattr(fundraiser, "display_name", None) or "",
+            " ".join(str(t) for t in tags),
+        ]).lower()
+        words = {w for w in TOKEN_RE.findall(text) if len(w) >= MIN_TOKEN_LENGTH}
+        places = {
+            p.strip().lower()
+            for p in (
+                getattr(fundraiser, "city", None),
+                getattr(fundraiser, "country", None),
+                getattr(fundraiser, "continent", None),
+            )
+            if p and p.strip()
+        }
+        for w in words:
+            self.words.add(w)
+        for p in places:
+            self.locations.add(p)
+        self._doc_words[fundraiser.id] = words
+        self._doc_locations[fundraiser.id] = places
+
+    def remove(self, fundraiser_id: str):
+        for w in self._doc_words.pop(fundraiser_id, ()):
+            self.words.discard(w)
+        for p in self._doc_locations.pop(fundraiser_id, ()):
+            self.locations.discard(p)
+
+    def correct_keywords(self, keywords: Iterable[str], per_word: int = 2) -> Dict[str, List[str]]:
+        """
+        Extra spellings to search alongside each keyword: for words missing
+        from the vocabulary, their closest indexed words (up to `per_word`).
+        The typed word always stays in the query, since the vocabulary only
+        covers titles, names and tags while text backends also match descriptions.
+        """
+        corrections: Dict[str, List[str]] = {}
+        for k in keywords:
+            if not self.ready or k in self.words or k in corrections:
+                continue
+            matches = self.words.similar(k, self.threshold, per_word)
+            if matches:
+                corrections[k] = [m for m, _ in matches]
+        return corrections
+
+    def correct_location(self, location: Optional[str]) -> Optional[str]:
+        """
+        Closest known city/country/continent for a misspelled location.
+        Anything that already substring-matches a known place is left alone.
+        """
+        if not location or not self.ready:
+            return location
+        loc = location.strip().lower()
+        if loc in self.locations or self.locations.has_substring(loc):
+            return loc
+        matches = self.locations.similar(loc, self.threshold, 1)
+        return matches[0][0] if matches else loc
@@ -0,0 +1,324 @@
+"""
+What-if re-weighting of trust scores.
+
+Every scoring run stores its raw check outcomes (counts and verdicts,
+not score contributions) as one trust_signal_rows row per fundraiser.
+simulate() applies candidate WEIGHTS / MAX_ACCEPTABLE_* values to that
+whole matrix with NumPy, without scraping or calling the LLM again.
+
+Run from backend/:
+
+    python -m src.trust_matrix --set duplicate_image_penalty=-0.5
+    python -m src.trust_matrix --set max_goal_edits=4 --commit
+
+--commit writes the simulated scores; change trust_rules to match, or the
+next rescore of each fundraiser puts its old score back. It refuses when
+the candidate weights open the LLM gate for fundraisers that have no LLM
+verdict: those need a real rescore under the new trust_rules. Running
+servers pick the new scores up as their search cache entries expire
+(SEARCH_CACHE_TTL_SECONDS).
+"""
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models, trust_rules
+from .database import AsyncSessionLocal, engine
+from .search import refresh_static_rank
+
+# Matrix columns, one trust_signal_rows column each; NULL / NaN where the check did not run
+FEATURES = [
+    "has_image",
+    "duplicate_images",
+    "wallet_edits",
+    "goal_edits",
+    "title_edits",
+    "update_count",
+    "unique_update_images",
+    "loaded_updates",
+    "social_valid",
+    "website_ok",
+    "llm_website_consistent",
+    "llm_title_consistent",
+    "llm_updates_quality",
+]
+
+THRESHOLDS = {
+    "max_goal_edits": "MAX_ACCEPTABLE_GOAL_EDITS",
+    "max_wallet_edits": "MAX_ACCEPTABLE_WALLET_EDITS",
+    "max_title_edits": "MAX_ACCEPTABLE_TITLE_EDITS",
+}
+PERCENTILES = [10, 25, 50, 75, 90]
+TOP_MOVERS = 10
+REPORT_BATCH = 500
+
+
+def _flag(value) -> Optional[float]:
+    return None if value is None else float(bool(value))
+
+
+def signal_row(fundraiser, results: dict) -> Dict[str, Optional[float]]:
+    """A fundraiser's matrix row from compute_trust_score's signal results"""
+    db = results.get("db")
+    website = results.get("website")
+    llm = results.get("llm")
+    row = dict.fromkeys(FEATURES)
+    row["has_image"] = _flag(fundraiser.image_hash or fundraiser.image_phash)
+    row["loaded_updates"] = float(len(fundraiser.updates or []))
+    if db is not None:
+        row.update(
+            duplicate_images=db.duplicate_images,
+            wallet_edits=db.wallet_edits,
+            goal_edits=db.goal_edits,
+            title_edits=db.title_edits,
+            update_count=db.update_count,
+            unique_update_images=db.unique_update_images,
+        )
+    if "social" in results:
+        row["social_valid"] = _flag(results["social"]["valid"])
+    if website is not None:
+        row["website_ok"] = _flag(website.ok)
+    if llm is not None:
+        row.update(
+            llm_website_consistent=_flag(llm.get("is_website_consistent")),
+            llm_title_consistent=_flag(llm.get("is_title_consistent")),
+            llm_updates_quality=_flag(llm.get("are_updates_high_quality")),
+        )
+    return row
+
+
+async def save_signal_row(db: AsyncSession, fundraiser_id: str, row: Dict[str, Optional[float]]):
+    """Replace a fundraiser's stored matrix row. Does not commit."""
+    await db.execute(delete(models.TrustSignalRow).where(models.TrustSignalRow.fundraiser_id == fundraiser_id))
+    await db.execute(insert(models.TrustSignalRow).values(fundraiser_id=fundraiser_id, scored_at=datetime.utcnow(), **row))
+
+
+def current_params() -> Dict[str, float]:
+    """trust_rules' WEIGHTS plus its MAX_ACCEPTABLE_* thresholds, under THRESHOLDS names"""
+    params = dict(trust_rules.WEIGHTS)
+    params.update({name: getattr(trust_rules, constant) for name, constant in THRESHOLDS.items()})
+    return params
+
+
+@dataclass
+class SignalMatrix:
+    ids: List[str]
+    X: np.ndarray  # len(ids) x len(FEATURES), float64 with NaN for missing checks
+    stored: np.ndarray  # trust_score as last written
+
+    def column(self, name: str) -> np.ndarray:
+        return self.X[:, FEATURES.index(name)]
+
+    @classmethod
+    async def load(cls, db: AsyncSession) -> "SignalMatrix":
+        R = models.TrustSignalRow
+        result = await db.execute(
+            select(R.fundraiser_id, models.Fundraiser.trust_score, *(getattr(R, f) for f in FEATURES))
+            .join(models.Fundraiser, models.Fundraiser.id == R.fundraiser_id)
+            .order_by(R.fundraiser_id)
+        )
+        rows = result.all()
+        X = np.array([row[2:] for row in rows], dtype=np.float64).reshape(len(rows), len(FEATURES))
+        return cls(
+            ids=[row[0] for row in rows],
+            X=X,
+            stored=np.array([row[1] for row in rows], dtype=np.float64),
+        )
+
+
+def score_matrix(matrix: SignalMatrix, params: Dict[str, float]):
+    """
+    Vectorized trust_rules (rule_score plus llm_score). Returns (scores on
+    the 0-100 scale, mask of fundraisers whose LLM gate these params open
+    but that have no stored LLM verdict; they get no LLM bonus here).
+    """
+    c = matrix.column
+    w = params
+    zero = 0.0
+    updates = c("update_count")
+    unique = c("unique_update_images")
+    loaded = c("loaded_updates")
+
+    score = np.full(len(matrix.ids), w["base_score"])
+    score += np.where((c("has_image") == 1) & (c("duplicate_images") > 0), w["duplicate_image_penalty"], zero)
+    score += np.where(c("wallet_edits") > w["max_wallet_edits"], w["wallet_swap_penalty"], zero)
+    score += np.where(c("goal_edits") > w["max_goal_edits"], w["instability_penalty_minor"], zero)
+    score += np.where(c("title_edits") > w["max_title_edits"], w["instability_penalty_major"], zero)
+    score += np.where(c("social_valid") == 1, w["social_verified_bonus"], zero)
+    score += np.where(unique >= 3, np.fmin(unique, 5) * w["unique_update_images_bonus"], zero)
+    score += np.where(updates == 0, w["zero_updates_penalty"], zero)
+    score += np.where(c("website_ok") == 0, w["no_website_content_penalty"], zero)
+
+    gate = score > 0.0
+    has_llm = ~np.isnan(c("llm_title_consistent"))
+    llm = gate & has_llm
+    score += np.where(llm & (c("website_ok") == 1) & (c("llm_website_consistent") == 1), w["website_match_bonus"], zero)
+    score += np.where(llm & (c("llm_title_consistent") == 1), w["title_desc_match_bonus"], zero)
+    score += np.where(
+        llm & (c("llm_updates_quality") == 1) & (loaded > 0),
+        np.fmin(loaded, 4) * w["update_quality_bonus"],
+        zero,
+    )
+    return np.clip(score, 0.0, 1.0) * 100, gate & ~has_llm
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    """1 = highest score; ties keep id order"""
+    ranks = np.empty(len(scores), dtype=np.int64)
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(1, len(scores) + 1)
+    return ranks
+
+
+def _distribution(scores: np.ndarray) -> dict:
+    if not len(scores):
+        return {}
+    histogram, _ = np.histogram(scores, bins=10, range=(0, 100))
+    return {
+        "mean": round(float(scores.mean()), 2),
+        **{f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(scores, PERCENTILES))},
+        # Fundraisers per 10-point band, 0-10 first
+        "histogram": histogram.tolist(),
+    }
+
+
+def simulate(
+    matrix: SignalMatrix, overrides: Optional[Dict[str, float]] = None
+) -> Tuple[dict, np.ndarray, np.ndarray]:
+    """
+    Score the matrix with current_params() updated by `overrides` and compare
+    against the stored scores. Returns the report, the new score array and
+    the needs-LLM mask from score_matrix.
+    """
+    params = current_params()
+    unknown = set(overrides or {}) - set(params)
+    if unknown:
+        raise ValueError(f"Unknown weights: {', '.join(sorted(unknown))}")
+    params.update(overrides or {})
+
+    started = time.perf_counter()
+    baseline, _ = score_matrix(matrix, current_params())
+    scores, needs_llm = score_matrix(matrix, params)
+    old_ranks = _ranks(matrix.stored)
+    new_ranks = _ranks(scores)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    shift = new_ranks - old_ranks
+    movers = np.argsort(-np.abs(shift), kind="stable")[:TOP_MOVERS]
+    report = {
+        "fundraisers": len(matrix.ids),
+        # Stored scores the current weights reproduce; low means the matrix is stale
+        "reproduced": int(np.sum(np.isclose(baseline, matrix.stored))),
+        "changed": int(np.sum(~np.isclose(scores, matrix.stored))),
+        "mean_change": round(float(np.mean(scores - matrix.stored)), 2) if len(scores) else 0.0,
+        "needs_llm": int(needs_llm.sum()),
+        "current": _distribution(matrix.stored),
+        "candidate": _distribution(scores),
+        "ranks": {
+            "moved": int(np.count_nonzero(shift)),
+            "mean_abs_shift": round(float(np.abs(shift).mean()), 2) if len(shift) else 0.0,
+            "top_movers": [
+                {
+                    "fundraiser_id": matrix.ids[i],
+                    "old_rank": int(old_ranks[i]),
+                    "new_rank": int(new_ranks[i]),
+                    "old_score": round(float(matrix.stored[i]), 2),
+                    "new_score": round(float(scores[i]), 2),
+                }
+                for i in movers if shift[i]
+            ],
+        },
+        "elapsed_ms": round(elapsed_ms, 2),
+    }
+    return report, scores, needs_llm
+
+
+async def commit_scores(db: AsyncSession, matrix: SignalMatrix, scores: np.ndarray, needs_llm: np.ndarray) -> int:
+    """
+    Write simulated scores, and the score in each trust_score_report, with
+    one executemany UPDATE (changed rows only), then refresh static_rank.
+    The reports keep the flags of the last full scoring run. Raises
+    ValueError if any fundraiser needs an LLM verdict it does not have.
+    """
+    if needs_llm.any():
+        raise ValueError(f"{int(needs_llm.sum())} fundraisers need an LLM verdict; rescore them instead")
+    changed = [matrix.ids[i] for i in np.flatnonzero(~np.isclose(scores, matrix.stored))]
+    new_scores = dict(zip(matrix.ids, scores.tolist()))
+    params = []
+    for start in range(0, len(changed), REPORT_BATCH):
+        result = await db.execute(
+            select(models.Fundraiser.id, models.Fundraiser.trust_score_report)
+            .where(models.Fundraiser.id.in_(changed[start:start + REPORT_BATCH]))
+        )
+        for fid, report in result.all():
+            params.append({
+                "fid": fid,
+                "new_score": new_scores[fid],
+                "new_report": {**(report or {}), "score": new_scores[fid]},
+            })
+    if params:
+        table = models.Fundraiser.__table__
+        await db.execute(
+            update(table).where(table.c.id == bindparam("fid")).values(
+                trust_score=bindparam("new_score"),
+                trust_score_report=bindparam("new_report"),
+            ),
+            params,
+        )
+        await refresh_static_rank(db)
+    await db.commit()
+    return len(params)
+
+
+def _parse_override(text: str):
+    name, _, value = text.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError(f"expected name=value, got {text!r}")
+    return name.strip(), float(value)
+
+
+async def _main(args) -> int:
+    overrides = dict(args.set or [])
+    async with AsyncSessionLocal() as db:
+        matrix = await SignalMatrix.load(db)
+        without = await db.scalar(select(func.count()).select_from(models.Fundraiser)) - len(matrix.ids)
+        try:
+            report, scores, needs_llm = simulate(matrix, overrides)
+        except ValueError as e:
+            print(e)
+            await engine.dispose()
+            return 2
+        report["without_signals"] = without
+        print(json.dumps(report, indent=2))
+        if args.commit:
+            try:
+                written = await commit_scores(db, matrix, scores, needs_llm)
+            except ValueError as e:
+                print(f"Not committed: {e}")
+                await engine.dispose()
+                return 1
+            print(f"Wrote {written} trust scores")
+    await engine.dispose()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--set", action="append", type=_parse_override, metavar="NAME=VALUE",
+        help="Override a WEIGHTS entry or a threshold (max_goal_edits, max_wallet_edits, max_title_edits)",
+    )
+    parser.add_argument("--commit", action="store_true", help="Write the simulated scores")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Trust-score rules: the weights, thresholds and the arithmetic that turns
+signal results into a score. score_util applies them to one fundraiser's
+signals; trust_matrix mirrors them with NumPy over the stored matrix.
+"""
+
+WEIGHTS = {
+    "base_score": 0.5, 
+    "social_verified_bonus": 0.15,
+    "website_match_bonus": 0.15, 
+    "update_quality_bonus": 0.10,
+    "unique_update_images_bonus": 0.05,
+    "title_desc_match_bonus": 0.05, 
+    "zero_updates_penalty": -0.05,
+    "no_website_content_penalty": -0.05,
+    "duplicate_image_penalty": -0.40, 
+    "wallet_swap_penalty": -0.30,
+    "instability_penalty_minor": -0.10,
+    "instability_penalty_major": -0.20,
+}
+
+MAX_ACCEPTABLE_GOAL_EDITS = 2
+MAX_ACCEPTABLE_DESC_EDITS = 3
+MAX_ACCEPTABLE_WALLET_EDITS = 1
+MAX_ACCEPTABLE_TITLE_EDITS = 2
+
+
+def rule_score(fundraiser, results: dict, flags: list) -> float:
+    """Score from the finished non-LLM signals in `results`, appending their flags"""
+    score = WEIGHTS["base_score"]
+    db = results.get("db")
+
+    if db is not None:
+        # CHECK 1: Duplicate Main Image
+        if fundraiser.image_hash or fundraiser.image_phash:
+            dupes = db.duplicate_images
+            if dupes > 0:
+                score += WEIGHTS["duplicate_image_penalty"]
+                flags.append(f"CRITICAL: Image used in {dupes} other fundraiser(s)")
+        else:
+            flags.append("Warning: No image available for duplicate check")
+
+
+        # CHECK 2: Audit Log Analysis (Wallet/Goal changes)
+        # Wallet swapping (CRITICAL)
+        if db.wallet_edits > MAX_ACCEPTABLE_WALLET_EDITS:
+            score += WEIGHTS["wallet_swap_penalty"]
+            flags.append(f"CRITICAL: Wallet changed {db.wallet_edits} times")
+
+        # Goal instability
+        if db.goal_edits > MAX_ACCEPTABLE_GOAL_EDITS:
+            score += WEIGHTS["instability_penalty_minor"]
+            flags.append(f"Penalty: Goal changed {db.goal_edits} times")
+
+        # Title changes
+        if db.title_edits > MAX_ACCEPTABLE_TITLE_EDITS:
+            score += WEIGHTS["instability_penalty_major"]
+            flags.append(f"Warning: Title changed {db.title_edits} times")
+
+
+    # CHECK 3: Social Verification
+    if "social" in results:
+        if results["social"]["valid"]:
+            score += WEIGHTS["social_verified_bonus"]
+            flags.append(" Verified: Valid social profiles")
+        else:
+            flags.append("No valid social media links found")
+
+
+    if db is not None:
+        # CHECK 5: Update Image Uniqueness
+        unique_images = db.unique_update_images
+        if unique_images >= 3:
+            bonus = min(unique_images, 5) * WEIGHTS["unique_update_images_bonus"]
+            score += bonus
+            flags.append(f"Bonus: {unique_images} unique update images (+{bonus:.2f})")
+
+        # CHECK 6: Missing Updates
+        if db.update_count == 0:
+            score += WEIGHTS["zero_updates_penalty"]
+            flags.append("Penalty: No updates posted")
+
+
+    # CHECK 7: Website Issues
+    website = results.get("website")
+    if website is not None and not website.ok:
+        score += WEIGHTS["no_website_content_penalty"]
+        flags.append(f"Penalty: {website.text}")
+
+    return score
+
+
+def llm_score(fundraiser, results: dict, flags: list) -> float:
+    """Bonus from the LLM audit in `results` (none when it did not run), appending its flags"""
+    score = 0.0
+    updates_list = fundraiser.updates or []
+    website_success = "website" in results and results["website"].ok
+
+    if "llm" in results and results["llm"] is None:
+        flags.append("ℹLLM analysis skipped due to low initial score")
+    elif "llm" in results:
+        analysis = results["llm"]
+
+        # Website consistency (only if website was successfully fetched)
+        if website_success and analysis.get("is_website_consistent"):
+            score += WEIGHTS["website_match_bonus"]
+            flags.append("Verified: Website matches description")
+        elif website_success:
+            flags.append("Warning: Website content inconsistent with description")
+
+        # Title-description alignment
+        if analysis.get("is_title_consistent"):
+            score += WEIGHTS["title_desc_match_bonus"]
+            flags.append("Verified: Title and description consistent")
+        else:
+            flags.append("Warning: Title doesn't match description")
+
+        # Update quality
+        if analysis.get("are_updates_high_quality") and len(updates_list) > 0:
+            valid_updates = min(len(updates_list), 4)
+            bonus = valid_updates * WEIGHTS["update_quality_bonus"]
+            score += bonus
+            flags.append(f"Verified: {valid_updates} quality updates (+{bonus:.2f})")
+        elif len(updates_list) > 0:
+            flags.append("Warning: Updates flagged as low quality")
+
+    return score
@@ -0,0 +1,84 @@
+# src/trust_signals.py
+from dataclasses import dataclass
+from typing import Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from . import models
+from .image_index import image_index
+
+# Fundraisers per aggregated query; keeps IN lists well under driver limits
+BATCH_SIZE = 500
+
+
+@dataclass
+class DbSignals:
+    """Everything trust scoring derives from the database for one fundraiser"""
+    duplicate_images: int = 0
+    goal_edits: int = 0
+    wallet_edits: int = 0
+    title_edits: int = 0
+    description_edits: int = 0
+    update_count: int = 0
+    unique_update_images: int = 0
+
+
+def _signals_query(fundraiser_ids: List[str]):
+    F = models.Fundraiser
+    U = models.CauseUpdate
+    other = aliased(F)
+
+    # Exact image copies, same rule as before: other fundraisers' main images plus any update image
+    dup_fundraisers = (
+        select(func.count()).select_from(other)
+        .where(other.image_hash == F.image_hash, other.id != F.id)
+        .correlate(F).scalar_subquery()
+    )
+    dup_updates = (
+        select(func.count()).select_from(U)
+        .where(U.image_hash == F.image_hash)
+        .correlate(F).scalar_subquery()
+    )
+    return (
+        select(
+            F.id,
+            F.image_hash,
+            F.image_phash,
+            dup_fundraisers.label("dup_fundraisers"),
+            dup_updates.label("dup_updates"),
+            F.goal_edit_count,
+            F.wallet_edit_count,
+            F.title_edit_count,
+            F.description_edit_count,
+            F.update_count,
+            F.unique_update_image_count,
+        )
+        .where(F.id.in_(fundraiser_ids))
+    )
+
+
+async def extract_db_signals(db: AsyncSession, fundraiser_ids: List[str]) -> Dict[str, DbSignals]:
+    """
+    DB-derived trust signals for many fundraisers: one query per BATCH_SIZE
+    ids (duplicate image counts plus the activity counters stored on the
+    row), plus near-duplicate images from the in-memory perceptual hash index.
+    """
+    signals: Dict[str, DbSignals] = {}
+    for start in range(0, len(fundraiser_ids), BATCH_SIZE):
+        result = await db.execute(_signals_query(fundraiser_ids[start:start + BATCH_SIZE]))
+        for row in result.all():
+            duplicates = row.dup_fundraisers + row.dup_updates if row.image_hash else 0
+            if row.image_phash:
+                duplicates += image_index.near_not_exact(row.image_phash, row.image_hash, exclude_fundraiser=row.id)
+            signals[row.id] = DbSignals(
+                duplicate_images=duplicates,
+                goal_edits=row.goal_edit_count,
+                wallet_edits=row.wallet_edit_count,
+                title_edits=row.title_edit_count,
+                description_edits=row.description_edit_count,
+                update_count=row.update_count,
+                unique_update_images=row.unique_update_image_count,
+            )
+    return signals
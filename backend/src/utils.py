@@ -1,10 +1,12 @@
 # src/utils.py
+import asyncio
 import hashlib
 import cloudinary
 import cloudinary.uploader
 from fastapi import UploadFile, HTTPException
 from typing import Optional, Tuple
 from .config  import  settings
+from .image_index import dhash
 import pycountry_convert as pc
 
 # Configure Cloudinary
@@ -18,7 +20,7 @@ cloudinary.config(
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/jpg", "image/webp", "image/gif"}
 MAX_IMAGE_SIZE = 10 * 1024 * 1024  
 
-async def process_image_upload(file: Optional[UploadFile], folder: str = "fundraisers") -> Tuple[Optional[str], Optional[str]]:
+async def process_image_upload(file: Optional[UploadFile], folder: str = "fundraisers") -> Tuple[Optional[str], Optional[str], Optional[str]]:
     """
     Process image upload with validation, hashing, and Cloudinary storage.
     
@@ -27,10 +29,10 @@ async def process_image_upload(file: Optional[UploadFile], folder: str = "fundra
         folder: Cloudinary folder path
     
     Returns:
-        Tuple of (image_url, image_hash) or (None, None) if no file
+        Tuple of (image_url, image_hash, image_phash) or (None, None, None) if no file
     """
     if not file:
-        return None, None
+        return None, None, None
 
     try:
         # Validate file type
@@ -51,6 +53,8 @@ async def process_image_upload(file: Optional[UploadFile], folder: str = "fundra
             )
         
         image_hash = hashlib.sha256(content).hexdigest()
+        # Perceptual hash survives re-encoding and resizing, unlike the SHA-256
+        image_phash = await asyncio.to_thread(dhash, content)
         
         await file.seek(0)
         
@@ -69,7 +73,7 @@ async def process_image_upload(file: Optional[UploadFile], folder: str = "fundra
         if not image_url:
             raise HTTPException(status_code=500, detail="Cloudinary upload failed")
         
-        return image_url, image_hash
+        return image_url, image_hash, image_phash
 
     except HTTPException:
         raise
@@ -0,0 +1,282 @@
+# src/vector_index.py
+import hashlib
+import json
+import logging
+import math
+import os
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Random-indexing width and the latent (LSA) dimensionality kept after fitting
+RAW_DIM = 512
+LATENT_DIM = 128
+# Refit the projection once the corpus has grown this much since the last fit
+REFIT_GROWTH = 2.0
+# Calibrated on held-out synthetic corpora (4 and 8 causes, 400-3000 docs):
+# same-cause docs score >= 0.45, different-cause docs <= 0.3 (bar causes that
+# really share words, like disaster relief and orphanages on "shelter")
+MIN_SIMILARITY = 0.4
+ENCODE_CHUNK = 4096
+# Bumped whenever fit() changes, so stale projections on disk are refitted
+ENCODER_VERSION = 2
+# Words in more than this share of fundraisers carry no topic
+MAX_DF_FRACTION = 0.5
+# Run through tokenize so they match the folded tokens ("this" -> "thi")
+STOPWORDS = frozenset(tokenize("""
+    about after all also and any are because been but can could did does for from
+    had has have her here his how into its just more most much need needs not now
+    off one only other our out over please she should some such than that the their
+    them then there these they this those through too very was way were what when
+    where which while who why will with would year years you your
+    help helping support donate donation donations every people project community
+"""))
+
+
+def _doc_text(fundraiser) -> str:
+    tags = getattr(fundraiser, "tags", None) or []
+    if isinstance(tags, str):
+        tags = [tags]
+    title = getattr(fundraiser, "title", None) or ""
+    return " ".join([
+        title, title,  # title counts double
+        " ".join(str(t) for t in tags),
+        getattr(fundraiser, "short_description", None) or "",
+        getattr(fundraiser, "long_description", None) or "",
+    ])
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+class HashedLSAEncoder:
+    """
+    Offline text encoder: every token gets a fixed pseudo-random vector
+    (seeded from its hash), documents are the TF-IDF-weighted sum of their
+    token vectors, and a projection fitted on the corpus covariance (LSA)
+    maps that into a small latent space where co-occurring words
+    ("kids", "school", "learn") end up close. No network, no model files.
+    """
+
+    def __init__(self, raw_dim: int = RAW_DIM, latent_dim: int = LATENT_DIM):
+        self.raw_dim = raw_dim
+        self.latent_dim = latent_dim
+        self.df: Dict[str, int] = {}
+        self.doc_count = 0
+        self.projection: Optional[np.ndarray] = None
+        self._token_vectors: Dict[str, np.ndarray] = {}
+
+    def _token_vector(self, token: str) -> np.ndarray:
+        vec = self._token_vectors.get(token)
+        if vec is None:
+            seed = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vec = np.random.default_rng(seed).standard_normal(self.raw_dim).astype(np.float32)
+            vec /= math.sqrt(self.raw_dim)
+            self._token_vectors[token] = vec
+        return vec
+
+    def _raw(self, tokens: List[str]) -> np.ndarray:
+        """
+        TF-IDF sum of token vectors. Stopwords, words in more than
+        MAX_DF_FRACTION of the corpus and words the corpus never had are
+        skipped: the projection knows nothing about an unseen word, and its
+        random vector would otherwise land somewhere in the topic space.
+        """
+        out = np.zeros(self.raw_dim, dtype=np.float32)
+        n = self.doc_count
+        for token, tf in Counter(tokens).items():
+            df = self.df.get(token, 0)
+            if token in STOPWORDS or df == 0 or df > MAX_DF_FRACTION * n:
+                continue
+            idf = math.log((n + 1) / (df + 1)) + 1.0
+            out += ((1.0 + math.log(tf)) * idf) * self._token_vector(token)
+        return out
+
+    def fit(self, token_lists: List[List[str]]):
+        """Learn document frequencies and the latent projection from the corpus"""
+        self.doc_count = len(token_lists)
+        df: Counter = Counter()
+        for tokens in token_lists:
+            df.update(set(tokens))
+        self.df = dict(df)
+
+        # Streamed X^T X, so the full N x RAW_DIM matrix never has to exist
+        cov = np.zeros((self.raw_dim, self.raw_dim), dtype=np.float64)
+        for start in range(0, len(token_lists), ENCODE_CHUNK):
+            chunk = np.stack([self._raw(t) for t in token_lists[start:start + ENCODE_CHUNK]])
+            cov += chunk.T.astype(np.float64) @ chunk
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        # X^T X is not mean-centred, so its top component is the corpus mean
+        # direction every document shares; keeping it made every document
+        # similar to every query. Drop it and keep the next latent_dim.
+        eigvals = np.clip(eigvals[::-1][1:self.latent_dim + 1], 0, None)
+        eigvecs = eigvecs[:, ::-1][:, 1:self.latent_dim + 1]
+        # Singular-value weighting (sqrt of the variance share), as in LSA, so
+        # topics outweigh one-off words without one component dominating
+        top = eigvals[0] if len(eigvals) and eigvals[0] > 0 else 1.0
+        scale = np.sqrt(eigvals / top)
+        projection = np.zeros((self.raw_dim, self.latent_dim), dtype=np.float32)
+        projection[:, :len(scale)] = eigvecs * scale
+        self.projection = np.ascontiguousarray(projection)
+
+    def encode(self, tokens: List[str]) -> np.ndarray:
+        vec = self._raw(tokens) @ self.projection
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else vec
+
+    def save(self, path: str):
+        np.save(os.path.join(path, "projection.npy"), self.projection)
+        with open(os.path.join(path, "vocab.json"), "w") as f:
+            json.dump({"version": ENCODER_VERSION, "doc_count": self.doc_count, "df": self.df}, f)
+
+    def load(self, path: str) -> bool:
+        try:
+            projection = np.load(os.path.join(path, "projection.npy"))
+            with open(os.path.join(path, "vocab.json")) as f:
+                vocab = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if projection.shape != (self.raw_dim, self.latent_dim) or vocab.get("version") != ENCODER_VERSION:
+            return False
+        self.projection = projection
+        self.doc_count = vocab["doc_count"]
+        self.df = vocab["df"]
+        return True
+
+
+class VectorIndex:
+    """
+    Fundraiser embeddings as one contiguous float32 matrix (row per
+    fundraiser), memory-mapped from `path`. A query is a single
+    matrix-vector product plus argpartition for the top-k.
+
+    The file is rewritten at startup and opened copy-on-write, so workers
+    share its pages; edits made afterwards stay private to the process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.encoder = HashedLSAEncoder()
+        self.matrix: Optional[np.ndarray] = None
+        self.ids: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self._used = 0
+        self.ready = False
+
+    def __len__(self):
+        return self._used
+
+    async def build(self, db: AsyncSession):
+        result = await db.execute(
+            select(
+                models.Fundraiser.id,
+                models.Fundraiser.title,
+                models.Fundraiser.short_description,
+                models.Fundraiser.long_description,
+                models.Fundraiser.tags,
+            )
+        )
+        rows = result.all()
+        os.makedirs(self.path, exist_ok=True)
+        token_lists = [tokenize(_doc_text(r)) for r in rows]
+
+        reusable = self.encoder.load(self.path)
+        if not reusable or len(rows) > self.encoder.doc_count * REFIT_GROWTH:
+            self.encoder.fit(token_lists)
+            self.encoder.save(self.path)
+            reusable = False
+            logger.info(f"Vector encoder fitted on {len(rows)} fundraisers")
+
+        # Reuse stored rows whose text has not changed since the last build
+        previous = self._load_previous() if reusable else {}
+        hashes = [_text_hash(_doc_text(r)) for r in rows]
+        capacity = len(rows) + max(1024, len(rows) // 4)
+        matrix = np.zeros((capacity, self.encoder.latent_dim), dtype=np.float32)
+        reused = 0
+        for i, (row, tokens, h) in enumerate(zip(rows, token_lists, hashes)):
+            old = previous.get(row.id)
+            if old is not None and old[0] == h:
+                matrix[i] = old[1]
+                reused += 1
+            else:
+                matrix[i] = self.encoder.encode(tokens)
+
+        self._write(matrix, [r.id for r in rows], hashes)
+        self._open(capacity, [r.id for r in rows])
+        self.ready = True
+        logger.info(f"Vector index built ({len(rows)} fundraisers, {reused} reused)")
+
+    def _load_previous(self) -> Dict[str, tuple]:
+        try:
+            with open(os.path.join(self.path, "ids.json")) as f:
+                meta = json.load(f)
+            stored = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return {}
+        if stored.shape[1] != self.encoder.latent_dim:
+            return {}
+        return {
+            fid: (h, stored[i])
+            for i, (fid, h) in enumerate(zip(meta["ids"], meta["hashes"]))
+            if fid is not None
+        }
+
+    def _write(self, matrix: np.ndarray, ids: List[str], hashes: List[str]):
+        tmp = os.path.join(self.path, f"vectors.{os.getpid()}.tmp.npy")
+        np.save(tmp, matrix)
+        os.replace(tmp, os.path.join(self.path, "vectors.npy"))
+        tmp = os.path.join(self.path, f"ids.{os.getpid()}.tmp.json")
+        with open(tmp, "w") as f:
+            json.dump({"ids": ids, "hashes": hashes}, f)
+        os.replace(tmp, os.path.join(self.path, "ids.json"))
+
+    def _open(self, capacity: int, ids: List[str]):
+        self.matrix = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="c")
+        self.ids = list(ids) + [None] * (capacity - len(ids))
+        self.rows = {fid: i for i, fid in enumerate(ids)}
+        self._used = len(ids)
+
+    def add(self, fundraiser):
+        """Insert or re-encode one fundraiser"""
+        if not self.ready:
+            return
+        vec = self.encoder.encode(tokenize(_doc_text(fundraiser)))
+        row = self.rows.get(fundraiser.id)
+        if row is None:
+            if self._used == self.matrix.shape[0]:
+                grown = np.zeros((self.matrix.shape[0] * 2, self.matrix.shape[1]), dtype=np.float32)
+                grown[:self._used] = self.matrix[:self._used]
+                self.matrix = grown
+                self.ids.extend([None] * (grown.shape[0] - len(self.ids)))
+            row = self._used
+            self._used += 1
+            self.rows[fundraiser.id] = row
+            self.ids[row] = fundraiser.id
+        self.matrix[row] = vec
+
+    def search(self, text_query: str, limit: int = 100, min_similarity: float = MIN_SIMILARITY) -> Dict[str, float]:
+        """{fundraiser_id: cosine similarity} for the closest `limit` fundraisers"""
+        tokens = tokenize(text_query)
+        if not self.ready or not tokens or self._used == 0:
+            return {}
+        query = self.encoder.encode(tokens)
+        if not query.any():
+            # Only stopwords or words no fundraiser uses
+            return {}
+        scores = self.matrix[:self._used] @ query
+        k = min(limit, self._used)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return {
+            self.ids[i]: float(scores[i])
+            for i in top
+            if scores[i] >= min_similarity and self.ids[i] is not None
+        }
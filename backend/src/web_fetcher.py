@@ -0,0 +1,215 @@
+# src/web_fetcher.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from .browser_pool import browser_pool, USER_AGENT
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+STATIC, BROWSER = "static", "browser"
+# Less visible text than this and the page is probably rendered client-side
+MIN_STATIC_CHARS = 200
+# A <noscript> "enable JavaScript" notice only means a shell on a thin page
+NOSCRIPT_SHELL_CHARS = 1000
+MOUNT_IDS = {"root", "app", "__next", "__nuxt", "___gatsby", "svelte"}
+NON_TEXT_TAGS = ["script", "style", "noscript", "template", "svg"]
+# Statuses bot walls answer plain HTTP clients with; a real browser may get through
+ESCALATE_STATUSES = {403, 429, 503}
+MAX_BODY_BYTES = 2 * 1024 * 1024
+DOMAIN_MEMORY_SIZE = 10000
+# Re-probe the static tier for "browser" domains after this long
+DOMAIN_MEMORY_TTL = 24 * 3600
+
+
+def _domain(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def extract_text(html: str) -> tuple[str, bool]:
+    """(visible text, looks like a JS shell) for an HTML document"""
+    soup = BeautifulSoup(html, "html.parser")
+    noscript = " ".join(n.get_text(" ") for n in soup.find_all("noscript")).lower()
+    mounts = soup.find_all(id=lambda v: v in MOUNT_IDS)
+    for tag in soup(NON_TEXT_TAGS):
+        tag.decompose()
+    body = soup.body or soup
+    text = " ".join(body.get_text(" ").split())
+
+    shell = (
+        len(text) < MIN_STATIC_CHARS
+        or ("javascript" in noscript and len(text) < NOSCRIPT_SHELL_CHARS)
+        or any(not m.get_text(strip=True) for m in mounts)
+    )
+    return text, shell
+
+
+@dataclass
+class FetchResult:
+    """Page text (or why there is none) plus the validators for the next conditional GET"""
+    text: str
+    ok: bool
+    not_modified: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class TieredFetcher:
+    """
+    Website text in the cheapest way that works. A pooled aiohttp GET plus
+    BeautifulSoup goes first; the shared headless browser is used only when
+    the static page looks like a JS shell or a bot wall. The tier that
+    worked is remembered per domain, so known SPA sites go straight to the
+    browser.
+    """
+
+    def __init__(self, timeout: float = 15.0, max_connections: int = 20):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._domains: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self.counts = {STATIC: 0, BROWSER: 0, "not_modified": 0, "escalated": 0, "failed": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections, limit_per_host=4, ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def tier_for(self, url: str) -> Optional[str]:
+        entry = self._domains.get(_domain(url))
+        if entry is None:
+            return None
+        tier, seen = entry
+        if time.monotonic() - seen > DOMAIN_MEMORY_TTL:
+            self._domains.pop(_domain(url), None)
+            return None
+        return tier
+
+    def _remember(self, url: str, tier: str):
+        domain = _domain(url)
+        self._domains[domain] = (tier, time.monotonic())
+        self._domains.move_to_end(domain)
+        while len(self._domains) > DOMAIN_MEMORY_SIZE:
+            self._domains.popitem(last=False)
+
+    async def _fetch_static(
+        self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> tuple[FetchResult, bool]:
+        """(result, worth escalating to the browser)"""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        async with self._get_session().get(url, headers=headers, allow_redirects=True) as response:
+            validators = {
+                "etag": response.headers.get("ETag") or (etag if response.status == 304 else None),
+                "last_modified": response.headers.get("Last-Modified") or (last_modified if response.status == 304 else None),
+            }
+            if response.status == 304:
+                return FetchResult("", True, not_modified=True, **validators), False
+            if response.status >= 400:
+                message = f"Website returned error {response.status}."
+                return FetchResult(message, False), response.status in ESCALATE_STATUSES
+            content_type = response.headers.get("Content-Type", "").lower()
+            if content_type and "html" not in content_type and not content_type.startswith("text/"):
+                return FetchResult(f"Website returned non-text content ({content_type.split(';')[0]}).", False), False
+            body = await response.content.read(MAX_BODY_BYTES)
+            html = body.decode(response.charset or "utf-8", errors="replace")
+
+        text, shell = await asyncio.to_thread(extract_text, html)
+        if shell:
+            return FetchResult("Website content is rendered by JavaScript.", False, **validators), True
+        return FetchResult(text, True, **validators), False
+
+    async def _fetch_browser(self, url: str) -> tuple[Optional[str], str]:
+        async with browser_pool.page() as page:
+            response = await page.goto(url, timeout=30000, wait_until="load")
+            if not response:
+                return None, "Website did not respond."
+            if response.status >= 400:
+                return None, f"Website returned error {response.status}."
+            try:
+                # Let client-side rendering settle, but don't wait out analytics beacons
+                await page.wait_for_load_state("networkidle", timeout=5000)
+            except Exception:
+                pass
+            text = await page.locator("body").inner_text()
+        return " ".join(text.split()), ""
+
+    async def fetch(
+        self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> FetchResult:
+        """
+        Visible text of a web page; on failure the text says why.
+        With validators from an earlier fetch the static request is
+        conditional, and a 304 comes back as not_modified. Pages that need
+        the browser are always rendered and come back without validators:
+        an SPA shell's ETag stays the same while the content it renders
+        changes, so a 304 for it says nothing.
+        """
+        if self.tier_for(url) != BROWSER:
+            try:
+                result, escalate = await self._fetch_static(url, etag, last_modified)
+            except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeError, LookupError) as e:
+                logger.warning(f"Static fetch failed for {url}: {type(e).__name__}: {e}")
+                self.counts["failed"] += 1
+                return FetchResult(f"Failed to fetch: {type(e).__name__}", False)
+            if result.not_modified:
+                self.counts["not_modified"] += 1
+                return result
+            if result.ok:
+                self._remember(url, STATIC)
+                self.counts[STATIC] += 1
+                return result
+            if not escalate:
+                logger.warning(f"Static fetch of {url}: {result.text}")
+                self.counts["failed"] += 1
+                return result
+            logger.info(f"Escalating {url} to headless browser: {result.text}")
+            self.counts["escalated"] += 1
+
+        try:
+            text, message = await self._fetch_browser(url)
+        except Exception as e:
+            logger.error(f"Website scrape failed for {url}: {type(e).__name__}: {str(e)}")
+            self.counts["failed"] += 1
+            return FetchResult(f"Failed to scrape: {type(e).__name__}", False)
+        if text is None:
+            logger.warning(f"Browser fetch of {url}: {message}")
+            self.counts["failed"] += 1
+            return FetchResult(message, False)
+        self._remember(url, BROWSER)
+        self.counts[BROWSER] += 1
+        return FetchResult(text, True)
+
+    def stats(self) -> dict:
+        tiers = [tier for tier, _ in self._domains.values()]
+        return {
+            **self.counts,
+            "domains_static": tiers.count(STATIC),
+            "domains_browser": tiers.count(BROWSER),
+        }
+
+
+web_fetcher = TieredFetcher(settings.WEB_FETCH_TIMEOUT_SECONDS, settings.WEB_FETCH_MAX_CONNECTIONS)
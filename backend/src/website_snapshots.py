@@ -0,0 +1,117 @@
+# src/website_snapshots.py
+import hashlib
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .web_fetcher import web_fetcher
+
+logger = logging.getLogger(__name__)
+
+# A snapshot confirmed this recently is used without touching the site
+REVALIDATE_AFTER = timedelta(days=1)
+# Older than this, refetch unconditionally in case the validators lie.
+# Browser-rendered pages are stored without validators, so they are
+# re-rendered (and compared by content hash) every REVALIDATE_AFTER.
+MAX_SNAPSHOT_AGE = timedelta(days=30)
+MAX_SNAPSHOT_CHARS = 200_000
+
+
+@dataclass
+class WebsiteText:
+    """
+    Text of a fundraiser's website. `unchanged` means it is the same
+    content as the stored snapshot, so analysis of it can be reused.
+    """
+    text: str
+    ok: bool
+    unchanged: bool = False
+    content_hash: Optional[str] = None
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _compress(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def _decompress(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("utf-8")
+
+
+async def _save(db: AsyncSession, url: str, values: dict):
+    try:
+        await db.execute(delete(models.WebsiteSnapshot).where(models.WebsiteSnapshot.url == url))
+        await db.execute(insert(models.WebsiteSnapshot).values(url=url, **values))
+        await db.commit()
+    except IntegrityError:
+        # Another scoring run stored the same URL at the same moment; theirs is as good
+        await db.rollback()
+
+
+async def get_website_text(db: AsyncSession, url: str) -> WebsiteText:
+    """
+    Website text through the snapshot store. Fresh snapshots are served
+    as-is; older ones are revalidated with a conditional GET, and a 304 or
+    an identical content hash keeps the stored copy, as does a failed fetch
+    while the snapshot is under MAX_SNAPSHOT_AGE. Commits its own writes.
+    """
+    snapshot = await db.scalar(select(models.WebsiteSnapshot).where(models.WebsiteSnapshot.url == url))
+    now = datetime.utcnow()
+
+    if snapshot is not None and now - snapshot.checked_at < REVALIDATE_AFTER:
+        logger.info(f"Using stored snapshot of {url}")
+        return WebsiteText(_decompress(snapshot.content), True, True, snapshot.content_hash)
+
+    conditional = snapshot is not None and now - snapshot.fetched_at < MAX_SNAPSHOT_AGE
+    result = await web_fetcher.fetch(
+        url,
+        etag=snapshot.etag if conditional else None,
+        last_modified=snapshot.last_modified if conditional else None,
+    )
+    if not result.ok:
+        if conditional:
+            # A transient outage shouldn't cost a site its content; checked_at stays put so it is retried
+            logger.warning(f"Fetching {url} failed ({result.text}), using snapshot from {snapshot.fetched_at}")
+            return WebsiteText(_decompress(snapshot.content), True, True, snapshot.content_hash)
+        return WebsiteText(result.text, False)
+
+    if result.not_modified:
+        await db.execute(
+            update(models.WebsiteSnapshot)
+            .where(models.WebsiteSnapshot.url == url)
+            .values(checked_at=now, etag=result.etag, last_modified=result.last_modified)
+        )
+        await db.commit()
+        logger.info(f"{url} not modified since {snapshot.fetched_at}")
+        return WebsiteText(_decompress(snapshot.content), True, True, snapshot.content_hash)
+
+    text = result.text.strip()[:MAX_SNAPSHOT_CHARS]
+    digest = content_hash(text)
+    unchanged = snapshot is not None and snapshot.content_hash == digest
+    if unchanged:
+        await db.execute(
+            update(models.WebsiteSnapshot)
+            .where(models.WebsiteSnapshot.url == url)
+            .values(checked_at=now, etag=result.etag, last_modified=result.last_modified)
+        )
+        await db.commit()
+    else:
+        await _save(db, url, {
+            "content": _compress(text),
+            "content_hash": digest,
+            "etag": result.etag,
+            "last_modified": result.last_modified,
+            "fetched_at": now,
+            "checked_at": now,
+        })
+    return WebsiteText(text, True, unchanged, digest)
@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+# Settings are read at import time; point everything at a throwaway SQLite file
+_DB_DIR = tempfile.mkdtemp(prefix="zspa-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_DB_DIR}/test.db")
+for name in (
+    "SECRET_KEY", "NEAR_TEE_ENDPOINT", "NEAR_AI_API_KEY",
+    "CLOUDINARY_CLOUD_NAME", "CLOUDINARY_API_SECRET", "CLOUDINARY_API_KEY",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("CORS_ORIGINS", '["*"]')
+
+import pytest
+from sqlalchemy import text
+
+from src import models
+from src.database import AsyncSessionLocal, Base, engine
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """A session on freshly created tables"""
+    async with engine.begin() as conn:
+        # Not in the metadata; its triggers go with the fundraisers table
+        await conn.execute(text("DROP TABLE IF EXISTS fundraisers_fts"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def user(db):
+    obj = models.User(id="owner", email="owner@example.com", hashed_password="x")
+    db.add(obj)
+    await db.commit()
+    return obj
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import select, update
+
+from src import crud, models, schemas
+from src.activity_counters import COUNTERS, verify_counters
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def active(db, user):
+    """A fundraiser with some of everything, recorded through crud"""
+    db.add(models.Fundraiser(id="f1", user_id=user.id, display_name="d", title="Well", wallet_address="w0"))
+    db.add(models.Fundraiser(id="quiet", user_id=user.id, display_name="d", title="Quiet"))
+    await db.commit()
+
+    await crud.update_fundraiser(db, "f1", schemas.FundraiserUpdate(title="Wells", wallet_address="w1"))
+    await crud.update_fundraiser(db, "f1", schemas.FundraiserUpdate(wallet_address="w2", display_name="e"))
+    for content, image_hash in [("dug", "a"), ("same photo", "a"), ("text only", None), ("pumped", "b")]:
+        await crud.add_update(db, "f1", schemas.UpdateCreate(content=content, image_hash=image_hash))
+    for amount in (1.0, 2.5):
+        await crud.create_donation(db, schemas.DonationCreate(fundraiser_id="f1", amount=amount, amount_zec=amount))
+    return db
+
+
+async def counters(db, fundraiser_id):
+    columns = [getattr(models.Fundraiser, column) for column in COUNTERS]
+    row = (await db.execute(select(*columns).where(models.Fundraiser.id == fundraiser_id))).one()
+    return dict(zip(COUNTERS, row))
+
+
+async def test_counters_match_source_tables(active):
+    assert await counters(active, "f1") == {
+        "goal_edit_count": 0,
+        "wallet_edit_count": 2,
+        "title_edit_count": 1,
+        "description_edit_count": 0,
+        "update_count": 4,
+        # A repeated hash counts once and a missing one not at all
+        "unique_update_image_count": 2,
+        "donation_count": 2,
+    }
+    assert await verify_counters(active, fix=False) == {}
+
+
+async def test_verify_repairs_drift(active):
+    await active.execute(
+        update(models.Fundraiser)
+        .where(models.Fundraiser.id == "f1")
+        .values(unique_update_image_count=3, donation_count=0)
+    )
+    await active.execute(update(models.Fundraiser).where(models.Fundraiser.id == "quiet").values(update_count=5))
+    await active.commit()
+
+    assert await verify_counters(active, fix=False) == {
+        "f1": {"unique_update_image_count": (3, 2), "donation_count": (0, 2)},
+        "quiet": {"update_count": (5, 0)},
+    }
+    assert (await counters(active, "f1"))["donation_count"] == 0
+
+    assert set(await verify_counters(active)) == {"f1", "quiet"}
+    assert await verify_counters(active, fix=False) == {}
+    assert (await counters(active, "f1"))["unique_update_image_count"] == 2
+    assert (await counters(active, "quiet"))["update_count"] == 0
@@ -0,0 +1,26 @@
+import pytest
+
+from src import crud, models, schemas
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def fundraiser(db, user):
+    obj = models.Fundraiser(
+        id="f1", user_id=user.id, display_name="d", title="Well",
+        country="nigeria", continent="africa", status="active",
+    )
+    db.add(obj)
+    await db.commit()
+    return obj
+
+
+@pytest.mark.parametrize("country, expected", [
+    ("India", ("india", "asia")),
+    ("", (None, None)),
+    (None, (None, None)),
+])
+async def test_country_change_recomputes_continent(db, fundraiser, country, expected):
+    updated = await crud.update_fundraiser(db, "f1", schemas.FundraiserUpdate(country=country))
+    assert (updated.country, updated.continent) == expected
@@ -0,0 +1,78 @@
+import io
+import random
+
+import pytest
+from PIL import Image, ImageDraw, ImageFilter
+
+from src.image_index import NEAR_DUPLICATE_DISTANCE, MultiIndexHash, dhash, hamming
+
+
+def near(rng: random.Random, value: int, flips: int) -> int:
+    for bit in rng.sample(range(64), flips):
+        value ^= 1 << bit
+    return value
+
+
+@pytest.mark.parametrize("radius", [0, 3, NEAR_DUPLICATE_DISTANCE, 15])
+def test_search_matches_brute_force(radius):
+    rng = random.Random(radius)
+    # Clusters of near copies, so every radius has hits to find
+    seeds = [rng.getrandbits(64) for _ in range(100)]
+    values = seeds + [near(rng, rng.choice(seeds), rng.randint(1, 20)) for _ in range(1900)]
+    index = MultiIndexHash()
+    for i, value in enumerate(values):
+        index.add(value, i)
+
+    hits = 0
+    for _ in range(200):
+        query = near(rng, rng.choice(seeds), rng.randint(0, 12)) if rng.random() < 0.8 else rng.getrandbits(64)
+        expected = sorted((i, hamming(query, v)) for i, v in enumerate(values) if hamming(query, v) <= radius)
+        assert sorted(index.search(query, radius)) == expected
+        hits += len(expected)
+    assert hits > 0
+
+
+def test_discard_removes_only_that_key():
+    index = MultiIndexHash()
+    index.add(0b1011, "a")
+    index.add(0b1011, "b")
+    index.discard(0b1011, "a")
+    assert index.search(0b1011, 0) == [("b", 0)]
+    index.discard(0b1011, "b")
+    assert index.search(0b1011, 4) == []
+    assert all(not table for table in index.tables)
+
+
+def photo(seed: int) -> Image.Image:
+    rng = random.Random(seed)
+    image = Image.new("RGB", (640, 480), tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    for _ in range(25):
+        x, y = rng.randrange(640), rng.randrange(480)
+        box = (x, y, x + rng.randrange(40, 240), y + rng.randrange(40, 200))
+        draw.ellipse(box, fill=tuple(rng.randrange(256) for _ in range(3)))
+    return image.filter(ImageFilter.GaussianBlur(3))
+
+
+def encode(image: Image.Image, fmt: str, **options) -> bytes:
+    out = io.BytesIO()
+    image.save(out, fmt, **options)
+    return out.getvalue()
+
+
+def distance(a: bytes, b: bytes) -> int:
+    return hamming(int(dhash(a), 16), int(dhash(b), 16))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_reencoded_resized_copy_is_a_near_duplicate(seed):
+    original = photo(seed)
+    resized = original.resize((320, 240), Image.BILINEAR)
+    cropped = original.crop((6, 5, 634, 475)).resize((400, 300), Image.BILINEAR)
+    assert distance(encode(original, "PNG"), encode(resized, "JPEG", quality=60)) <= NEAR_DUPLICATE_DISTANCE
+    assert distance(encode(original, "PNG"), encode(cropped, "JPEG", quality=50)) <= NEAR_DUPLICATE_DISTANCE
+    assert distance(encode(original, "PNG"), encode(photo(seed + 100), "PNG")) > NEAR_DUPLICATE_DISTANCE
+
+
+def test_undecodable_image_has_no_hash():
+    assert dhash(b"not an image") is None
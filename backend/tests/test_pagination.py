@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from src import crud, models
+from src.pagination import next_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+async def walk(list_page, limit):
+    """Every id list_page returns, following next_cursor until the last page"""
+    pages, cursor = [], None
+    while True:
+        items = await list_page(limit=limit, cursor=cursor)
+        pages.append([item.id for item in items])
+        cursor = next_cursor(items, limit, "created_at")
+        if cursor is None or len(pages) > 20:
+            return pages
+
+
+async def test_pages_with_shared_server_timestamps(db, user):
+    # created_at from server_default: whole seconds, stored without a fraction
+    for i in range(7):
+        db.add(models.Fundraiser(id=f"f{i}", user_id=user.id, display_name="d", title="t"))
+    await db.commit()
+    await db.execute(text("UPDATE fundraisers SET created_at = '2026-01-01 10:00:00' WHERE id IN ('f0', 'f1', 'f2', 'f3')"))
+    await db.execute(text("UPDATE fundraisers SET created_at = '2026-01-01 10:00:01' WHERE id IN ('f4', 'f5', 'f6')"))
+    await db.commit()
+
+    pages = await walk(lambda **kw: crud.list_fundraisers(db, **kw), limit=2)
+    assert pages == [["f6", "f5"], ["f4", "f3"], ["f2", "f1"], ["f0"]]
+
+
+async def test_pages_with_microsecond_timestamps(db, user):
+    db.add(models.Fundraiser(id="f", user_id=user.id, display_name="d", title="t"))
+    for i, micro in enumerate([0, 0, 250000, 250000, 999999]):
+        db.add(models.Donation(
+            id=f"d{i}", fundraiser_id="f", amount=1.0, amount_zec=1.0, status="confirmed",
+            created_at=datetime(2026, 1, 1, 10, 0, 0, micro),
+        ))
+    await db.commit()
+
+    pages = await walk(lambda **kw: crud.list_donations(db, **kw), limit=2)
+    assert pages == [["d4", "d3"], ["d2", "d1"], ["d0"]]
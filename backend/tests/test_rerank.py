@@ -0,0 +1,46 @@
+import pytest
+
+from src import crud, models, schemas
+from src.search import WEIGHTS, search_cache, search_fundraisers_page
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def catalog(db, user):
+    tags = {"both": ["Water", "health"], "water": ["water"], "none": ["solar"]}
+    for fid, fundraiser_tags in tags.items():
+        # Tags as the legacy JSON text column holds them; ranking reads fundraiser_tags only
+        db.add(models.Fundraiser(id=fid, user_id=user.id, display_name="d", title="t", status="active", tags=fundraiser_tags))
+        await crud.set_fundraiser_tags(db, fid, fundraiser_tags)
+    await db.commit()
+    search_cache.clear()
+    return db
+
+
+async def scores(db, interests=(), tags=None):
+    results, _ = await search_fundraisers_page(
+        db, schemas.FundraiserSearchRequest(tags=tags), interests=list(interests), limit=10
+    )
+    return {r["id"]: r["match_score"] for r in results}
+
+
+async def test_interest_overlap_bonus(catalog):
+    base = await scores(catalog)
+    ranked = await scores(catalog, interests=[" WATER", "health", "music"])
+    bonus = {fid: round(ranked[fid] - base[fid], 6) for fid in base}
+    per_tag = WEIGHTS["per_tag_match"]
+    assert bonus == {
+        "both": pytest.approx(WEIGHTS["interest_overlap"] + 2 * per_tag),
+        "water": pytest.approx(WEIGHTS["interest_overlap"] + per_tag),
+        "none": 0,
+    }
+    assert max(ranked, key=ranked.get) == "both"
+
+
+async def test_tag_point_per_requested_tag(catalog):
+    base = await scores(catalog)
+    ranked = await scores(catalog, tags=["water", "Health"])
+    assert set(ranked) == {"both", "water"}
+    assert ranked["both"] - base["both"] == pytest.approx(2 * WEIGHTS["tag_point"])
+    assert ranked["water"] - base["water"] == pytest.approx(WEIGHTS["tag_point"])
@@ -0,0 +1,62 @@
+from argparse import Namespace
+from datetime import datetime, timedelta
+
+import pytest
+
+from src import models
+from src.rescore import Checkpoint, run, select_targets
+
+pytestmark = pytest.mark.anyio
+
+STARTED = datetime(2026, 10, 1, 12, 0, 0)
+
+
+@pytest.fixture
+async def scored(db, user):
+    """Fundraiser id -> last_score_update, relative to a run started at STARTED"""
+    last_scored = {
+        "never-b": None,
+        "never-a": None,
+        "week-old": STARTED - timedelta(days=7),
+        "day-old": STARTED - timedelta(days=1),
+        "hour-old": STARTED - timedelta(hours=1),
+        # Finished by the interrupted run, after it started
+        "rescored": STARTED + timedelta(minutes=5),
+    }
+    for fid, last in last_scored.items():
+        status = "draft" if fid == "day-old" else "active"
+        db.add(models.Fundraiser(id=fid, user_id=user.id, display_name="d", title="t", status=status, last_score_update=last))
+    await db.commit()
+    return last_scored
+
+
+async def test_never_scored_first_then_stalest(scored):
+    targets = await select_targets(STARTED)
+    assert targets == ["never-a", "never-b", "week-old", "day-old", "hour-old"]
+
+    # --older-than-hours counts back from now; the tighter of the two cutoffs wins
+    three_days_before_start = datetime.utcnow() - (STARTED - timedelta(days=3))
+    assert await select_targets(STARTED, older_than=three_days_before_start) == ["never-a", "never-b", "week-old"]
+    assert await select_targets(STARTED, status="active", limit=3) == ["never-a", "never-b", "week-old"]
+    assert await select_targets(STARTED, ids=["hour-old", "rescored", "week-old"]) == ["week-old", "hour-old"]
+
+
+async def test_resume_takes_cutoff_from_the_checkpoint(scored, tmp_path, capsys):
+    path = str(tmp_path / "checkpoint.json")
+    Checkpoint(path, {
+        "started_at": STARTED.isoformat(),
+        "params": {"status": "active", "ids": None, "older_than_hours": None, "limit": None},
+        "done": 1,
+        "failed": ["hour-old"],
+    }).save()
+
+    args = Namespace(checkpoint=path, resume=True, dry_run=True)
+    assert await run(args) == 0
+    listed = [line.strip() for line in capsys.readouterr().out.splitlines() if line.startswith("  ")]
+    # The stored params still apply (day-old is a draft), and the run's own work is not redone
+    assert listed == ["never-a", "never-b", "week-old", "hour-old"]
+
+
+async def test_resume_without_checkpoint_fails(tmp_path):
+    args = Namespace(checkpoint=str(tmp_path / "missing.json"), resume=True, dry_run=True)
+    assert await run(args) == 1
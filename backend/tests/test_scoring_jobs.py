@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+import anyio
+import pytest
+from sqlalchemy import select, update
+
+from src import models, scoring_jobs
+from src.scoring_jobs import Job, ScoringWorker
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def job(db, user):
+    db.add(models.Fundraiser(id="f1", user_id=user.id, display_name="d", title="t"))
+    await db.commit()
+    await scoring_jobs.enqueue(db, "f1", delay=0)
+    return db
+
+
+async def test_failed_run_with_rerun_is_queued_once(job, monkeypatch):
+    db = job
+    runs = []
+
+    async def update_trust_score(session, fundraiser_id):
+        runs.append(fundraiser_id)
+        # Re-requested while this run is in flight
+        await scoring_jobs.enqueue(session, fundraiser_id, delay=0)
+        if len(runs) == 1:
+            raise RuntimeError("llm down")
+
+    monkeypatch.setattr(scoring_jobs.score_util, "update_trust_score", update_trust_score)
+    worker = ScoringWorker()
+    assert await worker.claim(1) == ["f1"]
+    await worker.run("f1")
+
+    row = (await db.execute(select(Job.rerun, Job.attempts, Job.locked_by))).one()
+    assert (row.rerun, row.attempts, row.locked_by) == (False, 1, None)
+
+    # The retry succeeds; nothing is left to run after it
+    await db.execute(update(Job).values(run_after=Job.requested_at))
+    await db.commit()
+    monkeypatch.setattr(scoring_jobs.score_util, "update_trust_score", _succeed)
+    assert await worker.claim(1) == ["f1"]
+    await worker.run("f1")
+    assert await db.scalar(select(Job.fundraiser_id)) is None
+
+
+async def _succeed(session, fundraiser_id):
+    pass
+
+
+async def test_enqueue_coalesces_and_never_delays(job):
+    db = job
+    first = await db.scalar(select(Job.run_after))
+    await scoring_jobs.enqueue(db, "f1", delay=600)
+    await scoring_jobs.enqueue(db, "f1")
+
+    rows = (await db.execute(select(Job.fundraiser_id, Job.run_after))).all()
+    assert [r.fundraiser_id for r in rows] == ["f1"]
+    assert rows[0].run_after == first
+
+    # A sooner request pulls a backed-off job forward
+    await db.execute(update(Job).values(run_after=first + timedelta(hours=1)))
+    await db.commit()
+    await scoring_jobs.enqueue(db, "f1", delay=60)
+    assert await db.scalar(select(Job.run_after)) < first + timedelta(minutes=5)
+
+
+async def test_stop_releases_claimed_jobs(job, monkeypatch):
+    db = job
+    started = anyio.Event()
+
+    async def update_trust_score(session, fundraiser_id):
+        started.set()
+        await anyio.sleep(60)
+
+    monkeypatch.setattr(scoring_jobs.score_util, "update_trust_score", update_trust_score)
+    monkeypatch.setattr(scoring_jobs, "POLL_INTERVAL", 0.01)
+    worker = ScoringWorker()
+    worker.start()
+    with anyio.fail_after(5):
+        await started.wait()
+    await worker.stop()
+
+    row = (await db.execute(select(Job.locked_by, Job.locked_at))).one()
+    assert (row.locked_by, row.locked_at) == (None, None)
+    assert await ScoringWorker().claim(1) == ["f1"]
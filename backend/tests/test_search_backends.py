@@ -0,0 +1,95 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.search_backends import FallbackBackend, MemoryBM25Backend, SearchBackend, get_search_backend
+from src.search_index import FundraiserIndex, tokenize
+
+pytestmark = pytest.mark.anyio
+
+WEIGHTS = {"title": 3.0, "short_description": 2.0, "long_description": 1.0, "tags": 1.5}
+
+
+def doc(fid, title, description=""):
+    return SimpleNamespace(id=fid, title=title, short_description=None, long_description=description, tags=None)
+
+
+def exhaustive(index, terms, limit):
+    scores = {}
+    for term in dict.fromkeys(terms):
+        for doc_id, impact in index._postings.get(term, {}).items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + index._idf(term) * impact
+    return dict(sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:limit])
+
+
+def test_backend_base_is_abstract():
+    with pytest.raises(TypeError):
+        SearchBackend(WEIGHTS)
+
+
+def test_multi_term_scores_are_exact_past_the_limit():
+    index = FundraiserIndex(WEIGHTS)
+    # 'water' is strong in docs 0-9, 'well' in 10-19; doc 'both' is mediocre
+    # in each and would fall outside a per-term cut of 10 on both terms
+    for i in range(10):
+        index.add(doc(f"w{i}", "water water water", "water"))
+        index.add(doc(f"l{i}", "well well well", "well"))
+    index.add(doc("both", "water well", "clinic"))
+    for i in range(50):
+        index.add(doc(f"x{i}", "unrelated filler", "text"))
+
+    terms = tokenize("water well")
+    hits = index.search(terms, limit=10)
+    want = exhaustive(index, terms, 10)
+    assert sorted(hits.values(), reverse=True) == pytest.approx(list(want.values()))
+    # Matches both terms, so it outranks every single-term document
+    assert max(hits, key=hits.get) == "both"
+    assert hits["both"] == pytest.approx(want["both"])
+
+
+def test_search_matches_exhaustive_on_random_corpus():
+    rng = random.Random(7)
+    words = ["school", "water", "clinic", "books", "solar", "farm", "kids", "food"]
+    index = FundraiserIndex(WEIGHTS)
+    for i in range(300):
+        index.add(doc(
+            f"d{i}",
+            " ".join(rng.choices(words, k=rng.randint(1, 4))),
+            " ".join(rng.choices(words, k=rng.randint(0, 30))),
+        ))
+    for query in ("school water", "clinic books solar", "farm", "kids food water school"):
+        terms = tokenize(query)
+        for limit in (1, 5, 40):
+            got = index.search(terms, limit=limit)
+            want = exhaustive(index, terms, limit)
+            assert sorted(got.values(), reverse=True) == pytest.approx(list(want.values()))
+
+
+class BrokenBackend(MemoryBM25Backend):
+    name = "broken"
+
+    async def setup(self, engine):
+        raise RuntimeError("no fts5 here")
+
+
+async def test_native_setup_failure_falls_back_to_memory(db, user):
+    from src import models
+    from src.database import engine
+
+    db.add(models.Fundraiser(id="f1", user_id=user.id, display_name="d", title="Clean water well"))
+    await db.commit()
+
+    backend = FallbackBackend(BrokenBackend(WEIGHTS), MemoryBM25Backend(WEIGHTS))
+    await backend.setup(engine)
+    assert backend.name == "memory"
+    assert set(await backend.candidates(db, "water", 10)) == {"f1"}
+
+
+def test_auto_picks_native_with_memory_fallback():
+    sqlite = create_async_engine("sqlite+aiosqlite:///:memory:")
+    backend = get_search_backend(sqlite, WEIGHTS, "auto")
+    assert isinstance(backend, FallbackBackend)
+    assert backend.name == "sqlite_fts5"
+    assert isinstance(get_search_backend(sqlite, WEIGHTS, "memory"), MemoryBM25Backend)
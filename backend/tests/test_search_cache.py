@@ -0,0 +1,68 @@
+import pytest
+
+from src import crud, models, schemas, search_cache as search_cache_module
+from src.database import engine
+from src.search import search_backend, search_cache, search_fundraisers_page
+from src.search_cache import SearchCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def catalog(db, user):
+    for fid, title in [("school", "Village school roof"), ("clinic", "Rural clinic beds")]:
+        db.add(models.Fundraiser(id=fid, user_id=user.id, display_name="d", title=title, status="active"))
+    await db.commit()
+    await search_backend.setup(engine)
+    search_cache.clear()
+    return db
+
+
+async def search(db, text=None):
+    results, _ = await search_fundraisers_page(db, schemas.FundraiserSearchRequest(text_query=text), limit=20)
+    return {r["id"]: r for r in results}
+
+
+async def test_edit_evicts_pages_showing_the_fundraiser(catalog):
+    assert "school" in await search(catalog, "school")
+    assert search_cache.stats()["entries"] == 1
+
+    await crud.update_fundraiser(catalog, "school", schemas.FundraiserUpdate(title="Village library books"))
+
+    assert search_cache.stats()["entries"] == 0
+    assert "school" not in await search(catalog, "school")
+
+
+async def test_create_with_matching_text_invalidates_keyword_pages(catalog):
+    assert set(await search(catalog, "clinic")) == {"clinic"}
+
+    await crud.create_fundraiser(catalog, "owner", schemas.FundraiserCreate(display_name="d", title="Mobile clinic van"))
+
+    assert len(await search(catalog, "clinic")) == 2
+
+
+async def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(search_cache_module.time, "monotonic", lambda: now[0])
+    cache = SearchCache(ttl_seconds=60)
+    cache.put(("key",), [{"id": "a", "match_score": 1.0}], None, limit=20, headroom=0, keyword_query=False)
+
+    now[0] += 59
+    assert cache.get(("key",)) is not None
+    now[0] += 2
+    assert cache.get(("key",)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_unrelated_write_keeps_full_pages():
+    cache = SearchCache()
+    page = [{"id": str(i), "match_score": 90.0} for i in range(2)]
+    cache.put(("key",), page, None, limit=2, headroom=10, keyword_query=True)
+
+    # Cannot reach the page's floor and no text change: the page stays
+    cache.invalidate("other", static_rank=50.0, active=True)
+    assert cache.stats()["entries"] == 1
+    # Could now outrank the page's last row
+    cache.invalidate("other", static_rank=85.0, active=True)
+    assert cache.stats()["entries"] == 0
+
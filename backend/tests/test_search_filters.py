@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import sqlite
+
+from src import models, schemas
+from src.database import engine
+from src.search import _compile_search
+from src.search_filters import FILTER_INDEXES, filter_stats
+
+pytestmark = pytest.mark.anyio
+
+# From main.py's startup indexes; main needs the full server stack to import
+STATIC_RANK_INDEX = "CREATE INDEX IF NOT EXISTS idx_fundraisers_status_static_rank ON fundraisers(status, static_rank DESC, id)"
+
+
+@pytest.fixture
+async def catalog(db, user):
+    await db.execute(insert(models.Fundraiser), [
+        {
+            "id": f"f{i:05d}", "user_id": user.id, "display_name": "d", "title": "t",
+            "status": "active", "goal_amount": float(i), "static_rank": float(i % 100),
+        }
+        for i in range(5000)
+    ])
+    for stmt in [*FILTER_INDEXES, STATIC_RANK_INDEX, "ANALYZE"]:
+        await db.execute(text(stmt))
+    await db.commit()
+    await filter_stats.refresh(db)
+    return db
+
+
+async def query_plan(db, **filters) -> str:
+    plan = await _compile_search(db, schemas.FundraiserSearchRequest(**filters))
+    stmt = (
+        select(models.Fundraiser.id)
+        .where(*plan.filters)
+        .order_by(plan.sort_expr.desc(), models.Fundraiser.id.desc())
+        .limit(20)
+    )
+    sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    rows = (await db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+async def test_selective_filter_uses_its_index(catalog):
+    plan = await query_plan(catalog, min_goal=4900)
+    assert "idx_fundraisers_status_goal" in plan
+
+
+async def test_unfiltered_search_walks_static_rank_index(catalog):
+    plan = await query_plan(catalog)
+    assert "idx_fundraisers_status_static_rank" in plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from src.signal_graph import Signal, run_signals
+
+pytestmark = pytest.mark.anyio
+
+
+def returning(value, delay=0.0, log=None, name=None):
+    async def compute(inputs):
+        if log is not None:
+            log.append((name, "start", sorted(inputs)))
+        await asyncio.sleep(delay)
+        if log is not None:
+            log.append((name, "end"))
+        return value(inputs) if callable(value) else value
+    return compute
+
+
+async def test_dependents_wait_for_their_inputs():
+    log = []
+    graph = await run_signals([
+        Signal("sum", returning(lambda i: i["a"] + i["b"], log=log, name="sum"), deps=("a", "b")),
+        Signal("a", returning(1, delay=0.02, log=log, name="a")),
+        Signal("b", returning(2, delay=0.01, log=log, name="b")),
+    ])
+    assert graph.results == {"a": 1, "b": 2, "sum": 3}
+    assert graph.missing == {}
+    # a and b overlap; sum starts after both ended, with both results
+    assert log[:2] == [("a", "start", []), ("b", "start", [])]
+    assert log[-2:] == [("sum", "start", ["a", "b"]), ("sum", "end")]
+
+
+async def test_timeout_is_missing_and_skips_dependents():
+    graph = await run_signals([
+        Signal("slow", returning(1, delay=1), timeout=0.02),
+        Signal("after", returning(2), deps=("slow",)),
+        Signal("other", returning(3)),
+    ])
+    assert graph.results == {"other": 3}
+    assert graph.missing == {"slow": "timed out after 0.02s", "after": "needs slow"}
+
+
+async def test_failure_propagates_through_the_graph():
+    async def broken(inputs):
+        raise ValueError("bad row")
+
+    graph = await run_signals([
+        Signal("broken", broken),
+        Signal("middle", returning(1), deps=("broken",)),
+        Signal("last", returning(2), deps=("middle", "ok")),
+        Signal("ok", returning(3)),
+    ])
+    assert graph.results == {"ok": 3}
+    assert graph.missing == {
+        "broken": "failed: ValueError",
+        "middle": "needs broken",
+        "last": "needs middle",
+    }
+
+
+@pytest.mark.parametrize("signals", [
+    [Signal("a", returning(1), deps=("b",)), Signal("b", returning(1), deps=("a",))],
+    [Signal("a", returning(1), deps=("nope",))],
+    [Signal("a", returning(1)), Signal("a", returning(2))],
+])
+async def test_invalid_graphs_are_rejected(signals):
+    with pytest.raises(ValueError):
+        await run_signals(signals)
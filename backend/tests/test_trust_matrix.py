@@ -0,0 +1,137 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from src import models, trust_rules
+from src.trust_matrix import (
+    FEATURES, SignalMatrix, commit_scores, current_params, save_signal_row, score_matrix, signal_row, simulate,
+)
+from src.trust_signals import DbSignals
+from src.website_snapshots import WebsiteText
+
+
+def synthetic_run(rng: random.Random):
+    """A fundraiser and the signal results compute_trust_score could have ended with"""
+    fundraiser = SimpleNamespace(
+        image_hash=rng.choice([None, "h"]),
+        image_phash=None,
+        updates=[object()] * rng.randint(0, 6),
+    )
+    results = {}
+    if rng.random() < 0.9:
+        results["db"] = DbSignals(
+            duplicate_images=rng.choice([0, 0, 1, 3]),
+            goal_edits=rng.randint(0, 4),
+            wallet_edits=rng.randint(0, 2),
+            title_edits=rng.randint(0, 4),
+            update_count=rng.randint(0, 6),
+            unique_update_images=rng.randint(0, 7),
+        )
+    results["social"] = {"valid": rng.random() < 0.5}
+    if rng.random() < 0.9:
+        results["website"] = WebsiteText("site text", rng.random() < 0.6)
+    # The LLM runs only when the rule score leaves room, and may itself time out
+    if "db" in results and "website" in results and rng.random() < 0.9:
+        if trust_rules.rule_score(fundraiser, results, []) > 0:
+            results["llm"] = {
+                "is_website_consistent": rng.random() < 0.5,
+                "is_title_consistent": rng.random() < 0.5,
+                "are_updates_high_quality": rng.random() < 0.5,
+            }
+        else:
+            results["llm"] = None
+    return fundraiser, results
+
+
+def expected_score(fundraiser, results) -> float:
+    score = trust_rules.rule_score(fundraiser, results, []) + trust_rules.llm_score(fundraiser, results, [])
+    return max(0.0, min(score, 1.0)) * 100
+
+
+@pytest.fixture
+def matrix():
+    rng = random.Random(7)
+    runs = [synthetic_run(rng) for _ in range(2000)]
+    X = np.array(
+        [[np.nan if v is None else v for v in (signal_row(f, r)[name] for name in FEATURES)] for f, r in runs],
+        dtype=np.float64,
+    )
+    stored = np.array([expected_score(f, r) for f, r in runs])
+    return SignalMatrix(ids=[f"f{i:04d}" for i in range(len(runs))], X=X, stored=stored)
+
+
+def test_current_weights_reproduce_rule_scores(matrix):
+    scores, _ = score_matrix(matrix, current_params())
+    np.testing.assert_allclose(scores, matrix.stored, atol=1e-9)
+
+    report, _, _ = simulate(matrix)
+    assert report["reproduced"] == report["fundraisers"] == 2000
+    assert report["changed"] == 0
+
+
+def test_override_moves_only_affected_scores(matrix):
+    report, scores, _ = simulate(matrix, {"wallet_swap_penalty": 0.0})
+    swapped = matrix.column("wallet_edits") > trust_rules.MAX_ACCEPTABLE_WALLET_EDITS
+    assert report["changed"] > 0
+    assert np.all(scores[~swapped] == pytest.approx(matrix.stored[~swapped]))
+
+
+def test_unknown_override_is_rejected(matrix):
+    with pytest.raises(ValueError):
+        simulate(matrix, {"no_such_weight": 1.0})
+
+
+@pytest.fixture
+async def scored(db, user):
+    """Two fundraisers as a full scoring run would have stored them"""
+    no_llm = {"is_website_consistent": False, "is_title_consistent": False, "are_updates_high_quality": False}
+    runs = {
+        # Wallet swaps; still above the LLM gate
+        "swapper": (SimpleNamespace(image_hash=None, image_phash=None, updates=[]), DbSignals(wallet_edits=3), no_llm),
+        # Duplicate image and goal edits on top; the LLM never ran
+        "dupe": (SimpleNamespace(image_hash="h", image_phash=None, updates=[]), DbSignals(duplicate_images=2, goal_edits=3, wallet_edits=3), None),
+    }
+    for fid, (fundraiser, signals, llm) in runs.items():
+        results = {"db": signals, "social": {"valid": False}, "website": WebsiteText("No website provided.", False), "llm": llm}
+        score = expected_score(fundraiser, results)
+        db.add(models.Fundraiser(
+            id=fid, user_id=user.id, display_name="d", title="t", status="active",
+            trust_score=score, trust_score_report={"score": score, "flags": ["kept"]},
+        ))
+        await db.flush()
+        await save_signal_row(db, fid, signal_row(fundraiser, results))
+    await db.commit()
+    return db
+
+
+async def stored(db):
+    rows = await db.execute(select(models.Fundraiser.id, models.Fundraiser.trust_score, models.Fundraiser.trust_score_report))
+    return {row.id: (row.trust_score, row.trust_score_report) for row in rows}
+
+
+@pytest.mark.anyio
+async def test_commit_writes_score_and_report(scored):
+    matrix = await SignalMatrix.load(scored)
+    report, scores, needs_llm = simulate(matrix, {"wallet_swap_penalty": 0.0})
+    assert (report["changed"], report["needs_llm"]) == (1, 0)
+
+    assert await commit_scores(scored, matrix, scores, needs_llm) == 1
+    after = await stored(scored)
+    assert after["swapper"][0] == pytest.approx(40.0)
+    assert after["swapper"][1] == {"score": pytest.approx(40.0), "flags": ["kept"]}
+    assert after["dupe"] == (0.0, {"score": 0.0, "flags": ["kept"]})
+
+
+@pytest.mark.anyio
+async def test_commit_refuses_scores_that_need_an_llm_verdict(scored):
+    matrix = await SignalMatrix.load(scored)
+    before = await stored(scored)
+    report, scores, needs_llm = simulate(matrix, {"wallet_swap_penalty": 0.0, "duplicate_image_penalty": 0.0})
+    assert report["needs_llm"] == 1
+
+    with pytest.raises(ValueError):
+        await commit_scores(scored, matrix, scores, needs_llm)
+    assert await stored(scored) == before
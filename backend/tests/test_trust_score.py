@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, update
+
+from src import crud, models, score_util
+from src.score_util import IncompleteScoreError, compute_trust_score, update_trust_score
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def fundraiser(db, user):
+    db.add(models.Fundraiser(id="f1", user_id=user.id, display_name="d", title="Clean water", status="active"))
+    await db.commit()
+    return (await crud.get_fundraisers_for_scoring(db, ["f1"]))["f1"]
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Stands in for the LLM audit; records the descriptions it was shown"""
+    calls = []
+
+    async def analyze_text_with_llm(title, desc, website_text, updates_text):
+        calls.append(desc)
+        return {"is_website_consistent": False, "is_title_consistent": True, "are_updates_high_quality": False}
+
+    monkeypatch.setattr(score_util, "analyze_text_with_llm", analyze_text_with_llm)
+    return calls
+
+
+@pytest.fixture
+def slow_db_signals(monkeypatch):
+    async def extract_db_signals(session, ids):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(score_util, "extract_db_signals", extract_db_signals)
+    monkeypatch.setitem(score_util.SIGNAL_TIMEOUTS, "db", 0.02)
+
+
+async def test_db_signal_timeout_is_not_persisted(db, fundraiser, slow_db_signals):
+    with pytest.raises(IncompleteScoreError):
+        await update_trust_score(db, "f1", fundraiser=fundraiser)
+
+    stored = (await db.execute(select(models.Fundraiser.last_score_update, models.Fundraiser.activated))).one()
+    assert (stored.last_score_update, stored.activated) == (None, False)
+    assert await db.scalar(select(models.TrustSignalRow.fundraiser_id)) is None
+
+
+async def test_db_signal_timeout_is_flagged(db, fundraiser, slow_db_signals):
+    report = await compute_trust_score(fundraiser)
+    assert report.missing == ["db", "llm"]
+    assert "Incomplete: db check timed out after 0.02s, scored without it" in report.flags
+
+
+async def test_scoring_leaves_the_callers_transaction_alone(db, fundraiser, llm):
+    db.add(models.User(id="pending", email="pending@example.com", hashed_password="x"))
+    await compute_trust_score(fundraiser)
+    await db.rollback()
+    assert await db.get(models.User, "pending") is None
+
+
+async def test_rescore_reuses_the_llm_verdict_until_inputs_change(db, user, llm):
+    db.add(models.Fundraiser(id="f2", user_id=user.id, display_name="d", title="Solar", long_description="Panels", status="active"))
+    await db.commit()
+
+    async def rescore():
+        db.expire_all()
+        await update_trust_score(db, "f2")
+        return await db.scalar(select(models.Fundraiser.trust_score_report).where(models.Fundraiser.id == "f2"))
+
+    first = await rescore()
+    second = await rescore()
+    assert llm == ["Panels"]
+    assert second["signals"]["llm"] == first["signals"]["llm"]
+    assert second["score"] == first["score"]
+
+    await db.execute(update(models.Fundraiser).where(models.Fundraiser.id == "f2").values(long_description="Batteries"))
+    await db.commit()
+    third = await rescore()
+    assert llm == ["Panels", "Batteries"]
+    assert third["signals"]["llm"]["fingerprint"] != first["signals"]["llm"]["fingerprint"]
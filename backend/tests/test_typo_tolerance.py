@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src import models, schemas
+from src.database import engine
+from src.search import fuzzy_index, search_backend, search_cache, search_fundraisers_page
+from src.trigram_index import TrigramIndex
+
+pytestmark = pytest.mark.anyio
+
+
+def vocabulary(*titles):
+    index = TrigramIndex()
+    for i, title in enumerate(titles):
+        index.add(SimpleNamespace(id=str(i), title=title, display_name="", tags=[]))
+    index.ready = True
+    return index
+
+
+def test_corrections_only_for_unknown_words():
+    index = vocabulary("Private school fees", "Medical surgery")
+    corrections = index.correct_keywords(["school", "scholl", "surgeon"])
+    assert "school" not in corrections
+    assert corrections["scholl"][0] == "school"
+    assert "surgery" in corrections["surgeon"]
+
+
+@pytest.fixture
+async def catalog(db, user):
+    rows = [
+        ("school", "Private school fees", "Tuition for the term"),
+        ("surgery", "Medical surgery", "Hospital costs"),
+        # 'surgeon' and 'privacy' only appear in descriptions, outside the typo vocabulary
+        ("clinic", "Village clinic", "A visiting surgeon operates twice a month"),
+        ("vpn", "Digital rights", "Privacy tools for journalists"),
+    ]
+    for fid, title, description in rows:
+        db.add(models.Fundraiser(
+            id=fid, user_id=user.id, display_name="d", title=title,
+            long_description=description, status="active",
+        ))
+    await db.commit()
+    await search_backend.setup(engine)
+    await fuzzy_index.build(db)
+    search_cache.clear()
+    return db
+
+
+async def search(db, text):
+    results, _ = await search_fundraisers_page(db, schemas.FundraiserSearchRequest(text_query=text), limit=20)
+    return {r["id"]: r for r in results}
+
+
+async def test_valid_description_words_still_match(catalog):
+    assert "clinic" in await search(catalog, "surgeon")
+    assert "vpn" in await search(catalog, "privacy")
+
+
+async def test_typo_finds_the_corrected_word(catalog):
+    assert "school" in await search(catalog, "scholl")
+
+
+async def test_typo_scores_like_one_keyword(catalog):
+    typed = await search(catalog, "scholl")
+    correct = await search(catalog, "school")
+    assert typed["school"]["match_score"] == pytest.approx(correct["school"]["match_score"])
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from src import models
+from src.vector_index import VectorIndex
+
+pytestmark = pytest.mark.anyio
+
+CAUSES = {
+    "education": "school students teachers classroom books library literacy scholarship learning kids tuition",
+    "health": "clinic hospital medical surgery medicine vaccines malaria maternal nurses treatment patients",
+    "water": "water well borehole clean sanitation drinking pump village hygiene toilets rainwater",
+    "energy": "solar power electricity lights panels energy grid lamps batteries",
+}
+FILLER = "please help our community this year every donation goes directly to the people who need it most"
+
+
+@pytest.fixture
+async def vectors(db, user, tmp_path):
+    # Seeded apart from the corpora MIN_SIMILARITY was calibrated on
+    rng = random.Random(11)
+    filler = FILLER.split()
+    for i in range(400):
+        cause = list(CAUSES)[i % len(CAUSES)]
+        words = CAUSES[cause].split()
+        db.add(models.Fundraiser(
+            id=f"{cause}-{i}", user_id=user.id, display_name="d",
+            title=" ".join(rng.sample(words, 3)),
+            long_description=" ".join(rng.sample(words, 5) + rng.sample(filler, 6)),
+            status="active",
+        ))
+    await db.commit()
+    index = VectorIndex(str(tmp_path))
+    await index.build(db)
+    return index
+
+
+@pytest.mark.parametrize("query", ["bitcoin mining hardware", "help our community", "football tickets"])
+async def test_unrelated_query_finds_nothing(vectors, query):
+    assert vectors.search(query, limit=400) == {}
+
+
+@pytest.mark.parametrize("query, cause", [
+    ("kids school books", "education"),
+    ("malaria vaccines", "health"),
+    ("clean drinking water", "water"),
+    ("solar panels", "energy"),
+])
+async def test_query_finds_only_its_cause(vectors, query, cause):
+    hits = vectors.search(query, limit=400)
+    assert len(hits) >= 50
+    assert all(fid.startswith(cause) for fid in hits)
+
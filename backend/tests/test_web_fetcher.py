@@ -0,0 +1,129 @@
+import pytest
+from aiohttp import web
+
+from src import web_fetcher as web_fetcher_module
+from src.web_fetcher import BROWSER, DOMAIN_MEMORY_TTL, STATIC, TieredFetcher, extract_text
+
+pytestmark = pytest.mark.anyio
+
+ARTICLE = "<p>" + "We dig wells in rural villages so families have clean water. " * 10 + "</p>"
+STATIC_PAGE = f"<html><body><h1>Clean water</h1>{ARTICLE}</body></html>"
+SPA_SHELL = (
+    '<html><body><noscript>You need to enable JavaScript to run this app.</noscript>'
+    '<div id="root"></div><script src="/bundle.js"></script></body></html>'
+)
+RENDERED = "Rendered clean water campaign"
+ETAG = '"v1"'
+
+
+@pytest.fixture
+async def site():
+    hits = {"static": 0, "spa": 0, "etag": 0}
+
+    async def static(request):
+        hits["static"] += 1
+        return web.Response(text=STATIC_PAGE, content_type="text/html")
+
+    async def spa(request):
+        hits["spa"] += 1
+        # The shell never changes, so its ETag does not either
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304, headers={"ETag": ETAG})
+        return web.Response(text=SPA_SHELL, content_type="text/html", headers={"ETag": ETAG})
+
+    async def etag(request):
+        hits["etag"] += 1
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304, headers={"ETag": ETAG})
+        return web.Response(text=STATIC_PAGE, content_type="text/html", headers={"ETag": ETAG})
+
+    app = web.Application()
+    app.router.add_get("/static", static)
+    app.router.add_get("/spa", spa)
+    app.router.add_get("/etag", etag)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    yield {"base": f"http://127.0.0.1:{port}", "hits": hits}
+    await runner.cleanup()
+
+
+@pytest.fixture
+async def fetcher(monkeypatch):
+    fetcher = TieredFetcher(timeout=5)
+    renders = []
+
+    async def fake_browser(url):
+        renders.append(url)
+        return RENDERED, ""
+
+    # No headless browser in tests; the browser tier is this stub
+    monkeypatch.setattr(fetcher, "_fetch_browser", fake_browser)
+    fetcher.renders = renders
+    yield fetcher
+    await fetcher.close()
+
+
+def test_js_shell_detection():
+    assert extract_text(SPA_SHELL)[1]
+    assert extract_text('<html><body><div id="app"></div>' + ARTICLE + "</body></html>")[1]
+    text, shell = extract_text(STATIC_PAGE)
+    assert not shell
+    assert text.startswith("Clean water We dig wells")
+
+
+async def test_static_page_stays_on_static_tier(site, fetcher):
+    result = await fetcher.fetch(f"{site['base']}/static")
+    assert result.ok and not result.not_modified
+    assert "clean water" in result.text
+    assert fetcher.tier_for(site["base"]) == STATIC
+    assert fetcher.renders == []
+
+
+async def test_spa_shell_escalates_and_domain_is_remembered(site, fetcher):
+    result = await fetcher.fetch(f"{site['base']}/spa")
+    assert (result.ok, result.text, result.not_modified) == (True, RENDERED, False)
+    # The shell's ETag says nothing about the rendered content
+    assert (result.etag, result.last_modified) == (None, None)
+    assert fetcher.tier_for(site["base"]) == BROWSER
+    assert fetcher.counts["escalated"] == 1
+
+    # Known browser domain: straight to the browser, no static GET
+    await fetcher.fetch(f"{site['base']}/spa")
+    assert site["hits"]["spa"] == 1
+    assert len(fetcher.renders) == 2
+
+
+async def test_browser_domain_reprobes_static_after_ttl(site, fetcher, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(web_fetcher_module.time, "monotonic", lambda: now[0])
+    await fetcher.fetch(f"{site['base']}/spa")
+    assert fetcher.tier_for(site["base"]) == BROWSER
+
+    now[0] += DOMAIN_MEMORY_TTL + 1
+    result = await fetcher.fetch(f"{site['base']}/static")
+    assert site["hits"] == {"static": 1, "spa": 1, "etag": 0}
+    assert result.text.startswith("Clean water")
+    assert fetcher.tier_for(site["base"]) == STATIC
+
+
+async def test_304_passes_through_with_validators(site, fetcher):
+    first = await fetcher.fetch(f"{site['base']}/etag")
+    assert (first.ok, first.not_modified, first.etag) == (True, False, ETAG)
+
+    again = await fetcher.fetch(f"{site['base']}/etag", etag=first.etag)
+    assert (again.ok, again.not_modified, again.etag, again.text) == (True, True, ETAG, "")
+    assert fetcher.counts["not_modified"] == 1
+    assert site["hits"]["etag"] == 2
+
+
+async def test_browser_domain_ignores_validators(site, fetcher):
+    await fetcher.fetch(f"{site['base']}/spa")
+
+    # Validators stored before rendered pages stopped keeping them
+    result = await fetcher.fetch(f"{site['base']}/spa", etag=ETAG)
+    assert (result.ok, result.not_modified, result.text) == (True, False, RENDERED)
+    assert site["hits"]["spa"] == 1
+    assert fetcher.counts["not_modified"] == 0
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from src import models, website_snapshots
+from src.web_fetcher import FetchResult
+from src.website_snapshots import MAX_SNAPSHOT_AGE, REVALIDATE_AFTER, content_hash, get_website_text
+
+pytestmark = pytest.mark.anyio
+
+URL = "https://example.org/water"
+PAGE = "We dig wells in rural villages."
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """Scripted fetch results, plus the validators each fetch was sent"""
+    site = {"responses": [], "calls": []}
+
+    async def fetch(url, etag=None, last_modified=None):
+        site["calls"].append((etag, last_modified))
+        return site["responses"].pop(0)
+
+    monkeypatch.setattr(website_snapshots.web_fetcher, "fetch", fetch)
+    return site
+
+
+async def snapshot(db):
+    """The stored row as plain values, so later reads can't refresh it"""
+    S = models.WebsiteSnapshot
+    return (await db.execute(
+        select(S.content_hash, S.etag, S.fetched_at, S.checked_at).where(S.url == URL)
+    )).one()
+
+
+async def age(db, by):
+    """Move the stored snapshot `by` into the past"""
+    stored = await snapshot(db)
+    await db.execute(
+        update(models.WebsiteSnapshot)
+        .where(models.WebsiteSnapshot.url == URL)
+        .values(fetched_at=stored.fetched_at - by, checked_at=stored.checked_at - by)
+    )
+    await db.commit()
+
+
+@pytest.fixture
+async def stored(db, site):
+    site["responses"].append(FetchResult(f"  {PAGE}\n", True, etag='"v1"', last_modified="Mon, 05 Oct 2026 10:00:00 GMT"))
+    first = await get_website_text(db, URL)
+    assert (first.text, first.ok, first.unchanged) == (PAGE, True, False)
+    await age(db, REVALIDATE_AFTER)
+    site["calls"].clear()
+    return db
+
+
+async def test_first_fetch_is_saved_and_served_while_fresh(db, site):
+    site["responses"].append(FetchResult(PAGE, True, etag='"v1"'))
+    await get_website_text(db, URL)
+    row = await snapshot(db)
+    assert (row.content_hash, row.etag) == (content_hash(PAGE), '"v1"')
+
+    again = await get_website_text(db, URL)
+    assert (again.text, again.unchanged, again.content_hash) == (PAGE, True, content_hash(PAGE))
+    assert len(site["calls"]) == 1
+
+
+async def test_not_modified_keeps_the_snapshot(stored, site):
+    before = await snapshot(stored)
+    site["responses"].append(FetchResult("", True, not_modified=True, etag='"v1"'))
+    result = await get_website_text(stored, URL)
+
+    assert site["calls"] == [('"v1"', "Mon, 05 Oct 2026 10:00:00 GMT")]
+    assert (result.text, result.ok, result.unchanged) == (PAGE, True, True)
+    after = await snapshot(stored)
+    assert after.checked_at > before.checked_at
+    assert after.fetched_at == before.fetched_at
+
+
+async def test_identical_content_hash_counts_as_unchanged(stored, site):
+    before = await snapshot(stored)
+    # A browser-rendered page comes back without validators
+    site["responses"].append(FetchResult(PAGE, True))
+    result = await get_website_text(stored, URL)
+
+    assert (result.unchanged, result.content_hash) == (True, before.content_hash)
+    after = await snapshot(stored)
+    assert (after.fetched_at, after.etag) == (before.fetched_at, None)
+    assert after.checked_at > before.checked_at
+
+
+async def test_changed_content_replaces_the_snapshot(stored, site):
+    site["responses"].append(FetchResult("New campaign text", True, etag='"v2"'))
+    result = await get_website_text(stored, URL)
+
+    assert (result.text, result.unchanged) == ("New campaign text", False)
+    row = await snapshot(stored)
+    assert (row.content_hash, row.etag) == (content_hash("New campaign text"), '"v2"')
+    assert datetime.utcnow() - row.fetched_at < REVALIDATE_AFTER
+
+
+async def test_failed_fetch_falls_back_to_a_recent_snapshot(stored, site):
+    before = await snapshot(stored)
+    site["responses"].append(FetchResult("Website returned status 503", False))
+    result = await get_website_text(stored, URL)
+
+    assert (result.text, result.ok, result.unchanged) == (PAGE, True, True)
+    # Not marked as checked, so the next run tries the site again
+    assert (await snapshot(stored)).checked_at == before.checked_at
+
+
+async def test_failed_fetch_ignores_an_expired_snapshot(stored, site):
+    await age(stored, MAX_SNAPSHOT_AGE)
+    site["responses"].append(FetchResult("Website returned status 503", False))
+    result = await get_website_text(stored, URL)
+
+    assert site["calls"] == [(None, None)]
+    assert (result.text, result.ok) == ("Website returned status 503", False)